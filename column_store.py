@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Magasin de Colonnes Projetées en Mémoire
+========================================
+
+Dispose les colonnes d'un dataset (fraude ou marketing) sur disque sous
+forme de tableaux NumPy `.npy`, puis les projette en mémoire (`mmap`) en
+lecture seule. Tous les processus workers d'un dashboard partagent ainsi
+les mêmes pages du cache système : la mémoire résidente ne croît pas avec
+le nombre de workers, et un nouveau worker s'attache aux données en
+quelques millisecondes au lieu de relire le CSV.
+
+Le magasin réutilise l'invalidation du cache colonnaire (`data_cache`) :
+il est reconstruit automatiquement lorsque le fichier source change.
+"""
+
+import time
+
+import numpy as np
+
+import data_cache
+
+STORE_SUFFIX = ".mmap"
+
+
+def store_dir_for(path, cache_dir=None, **read_csv_kwargs):
+    """Répertoire du magasin projeté associé à un fichier et à ses options de lecture"""
+    return data_cache.cache_entry_dir(path, read_csv_kwargs, cache_dir) + STORE_SUFFIX
+
+
+def build_column_store(path, cache_dir=None, **read_csv_kwargs):
+    """
+    Crée (ou valide) le magasin de colonnes d'un fichier CSV et retourne son répertoire.
+
+    Le contenu est lu via le cache colonnaire, puis écrit colonne par colonne
+    au format `.npy`. L'écriture est atomique : des workers démarrés en même
+    temps peuvent tous appeler cette fonction sans corrompre le magasin.
+    """
+    store_dir = store_dir_for(path, cache_dir, **read_csv_kwargs)
+    if data_cache.is_entry_valid(store_dir, path):
+        return store_dir
+
+    source = data_cache.file_fingerprint(path)
+    df = data_cache.read_csv_cached(path, cache_dir=cache_dir, **read_csv_kwargs)
+    data_cache.write_entry(df, store_dir, source, read_csv_kwargs, fmt='npy')
+    return store_dir
+
+
+def attach_column_store(store_dir, usecols=None):
+    """
+    Projette un magasin existant en mémoire et retourne un DataFrame sans copie.
+
+    Avec `usecols`, seuls les fichiers des colonnes demandées sont ouverts.
+
+    Les colonnes numériques restent des vues en lecture seule sur les fichiers
+    `.npy` : toute modification doit passer par une nouvelle colonne (par
+    exemple `df = df.assign(...)`), jamais par une écriture en place.
+    """
+    manifest = data_cache.read_manifest(store_dir)
+    if manifest is None or manifest.get('format') != 'npy':
+        raise FileNotFoundError(f"Magasin de colonnes introuvable: {store_dir}")
+    names = data_cache.project_columns([entry['name'] for entry in manifest['columns']], usecols)
+    entries = [entry for entry in manifest['columns'] if entry['name'] in names]
+    return data_cache.read_npy_columns(store_dir, entries, mmap_mode='r')
+
+
+def open_column_store(path, cache_dir=None, usecols=None, **read_csv_kwargs):
+    """
+    Retourne le DataFrame projeté en mémoire d'un fichier CSV.
+
+    Si le magasin ne peut pas être écrit (répertoire en lecture seule...), le
+    chargement se replie sur le cache colonnaire classique, en mémoire privée.
+    """
+    try:
+        store_dir = build_column_store(path, cache_dir=cache_dir, **read_csv_kwargs)
+        return attach_column_store(store_dir, usecols=usecols)
+    except OSError as e:
+        print(f"⚠️ Magasin projeté indisponible ({e}), chargement en mémoire")
+        return data_cache.read_csv_cached(path, cache_dir=cache_dir, usecols=usecols, **read_csv_kwargs)
+
+
+def is_memory_mapped(df):
+    """Indique si toutes les colonnes numériques d'un DataFrame sont des projections mémoire"""
+    numeric = df.select_dtypes(include=[np.number])
+    if numeric.empty:
+        return False
+    for col in numeric.columns:
+        base = numeric[col].to_numpy()
+        while base is not None and not isinstance(base, np.memmap):
+            base = base.base
+        if base is None:
+            return False
+    return True
+
+
+def time_attach(store_dir, repeat=5):
+    """Mesure le temps d'attachement d'un worker au magasin (meilleur de `repeat`, en ms)"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        attach_column_store(store_dir)
+        timings.append((time.perf_counter() - start) * 1000)
+    return min(timings)
@@ -19,6 +19,22 @@ import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 from sklearn.preprocessing import StandardScaler
 from sklearn.decomposition import PCA
+from data_cache import file_fingerprint, read_csv_cached
+from data_loader import find_dataset, load_dataset, sniff_csv
+from exports import EXPORT_FORMATS, export_bytes
+from filter_memo import FilterMemo
+from fraud_cube import FraudCube
+from outlier_engine import OUTLIER_RULES, OutlierScan
+from plot_summaries import (KDE_GRID_SIZE, MAX_OVERLAY_POINTS, RASTER_SHAPE, bin_counts, binned_kde,
+                            box_summary, density_raster, histogram_edges, kde_from_counts, log_counts,
+                            silverman_bandwidth, spread_rows)
+from quantile_sketch import describe_values
+from range_index import RangeFilterIndex
+from rss_monitor import PeakRSS
+from sqlite_backend import open_store
+from streaming_profiler import profile_csv
+from time_aggregates import TimeAggregates
+import os
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -51,13 +67,38 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-@st.cache_data
+# Taille au-delà de laquelle le fichier de transactions est profilé en flux
+STREAMING_THRESHOLD_BYTES = 1024 ** 3
+
+# Colonnes utilisées par les onglets ; V1–V28 ne sont chargées qu'à la demande
+CORE_COLUMNS = ['Time', 'Amount', 'Class']
+
+# Libellés et couleurs des classes dans les graphiques
+CLASS_NAMES = {0: 'Transactions Normales', 1: 'Transactions Frauduleuses'}
+CLASS_COLORS = {0: '#87CEEB', 1: '#FA8072'}
+
+# Modes du graphique Montant vs Temps de l'onglet anomalies
+ANOMALY_VIEW_MODES = ["🌡️ Densité (toutes les transactions)", "🔵 Points (échantillon)"]
+
+def add_derived_columns(df):
+    """Temps en heures (Time_Hours) pour les filtres, calculé une seule fois au chargement"""
+    if 'Time' not in df.columns:
+        return df
+    return df.assign(Time_Hours=df['Time'] / 3600)
+
+@st.cache_resource
 def load_data():
-    """Charge les données de fraude depuis un fichier CSV"""
+    """
+    Charge les données de fraude depuis un fichier CSV (colonnes principales seulement).
+
+    Le DataFrame est partagé tel quel entre les exécutions (aucune copie par
+    interaction) : il ne doit jamais être modifié en place.
+    """
     try:
-        # Essayer de charger le fichier creditcard.csv
-        df = pd.read_csv("creditcard.csv")
-        return df
+        # Découverte partagée (creditcard.csv en priorité), une seule analyse en types compacts
+        # (copie colonnaire en cache après le premier chargement, lue colonne par colonne)
+        df, _, _ = load_dataset('fraud', reader=read_csv_cached, usecols=CORE_COLUMNS)
+        return add_derived_columns(df)
     except FileNotFoundError:
         st.error("❌ Fichier 'creditcard.csv' non trouvé dans le répertoire courant.")
         st.info("💡 Veuillez vous assurer que le fichier 'creditcard.csv' est présent dans le même dossier que ce script.")
@@ -66,8 +107,344 @@ def load_data():
         st.error(f"❌ Erreur lors du chargement des données: {str(e)}")
         return None
 
-def create_fraud_dashboard(df, target_col='Class'):
-    """Crée le tableau de bord principal pour l'analyse des fraudes"""
+@st.cache_resource
+def load_range_index():
+    """Index triés des colonnes filtrées par les curseurs (construits une fois par dataset)"""
+    df = load_data()
+    if df is None:
+        return None
+    return RangeFilterIndex.from_frame(df, ['Amount', 'Time_Hours'])
+
+@st.cache_resource
+def load_fraud_cube():
+    """Cube montant × heure × classe des comptages et sommes (construit une fois par dataset)"""
+    df = load_data()
+    if df is None or 'Time' not in df.columns:
+        return None
+    return FraudCube.from_frame(df, target_col='Class', range_index=load_range_index())
+
+@st.cache_resource
+def load_feature_columns():
+    """Charge à la demande les autres colonnes du fichier (V1–V28), alignées sur `load_data()`"""
+    path = find_dataset('fraud')
+    features = [col for col in sniff_csv(path)['columns'] if col not in CORE_COLUMNS]
+    df, _, _ = load_dataset('fraud', path=path, reader=read_csv_cached, usecols=features)
+    return df
+
+@st.cache_resource
+def load_filter_memo():
+    """Mémo LRU des calculs par état de filtres (partagé entre les sessions, budget mémoire borné)"""
+    return FilterMemo()
+
+def dataset_fingerprint(path):
+    """Identité du fichier chargé (chemin, taille, date de modification) pour les clés du mémo"""
+    if not path:
+        return None
+    return tuple(file_fingerprint(path, with_hash=False).values())
+
+@st.cache_resource
+def load_store(path):
+    """Base SQLite indexée du fichier (construite une fois, partagée entre les sessions)"""
+    return open_store(path)
+
+@st.cache_data
+def load_profile(path):
+    """Profile le fichier de transactions en une passe, par blocs (mémoire bornée)"""
+    return profile_csv(path, sep=sniff_csv(path)['delimiter'])
+
+def show_dataset_info(kpis):
+    """Affiche les KPIs globaux du dataset dans la barre latérale"""
+    st.sidebar.header("📊 Informations sur les Données")
+    st.sidebar.info(f"""
+    **Dataset chargé avec succès!**
+    - Nombre total de transactions: {kpis['total_transactions']:,}
+    - Nombre de fraudes: {kpis['fraud_count']:,}
+    - Taux de fraude: {kpis['fraud_rate']:.3f}%
+    - Période couverte: {kpis['period_hours']:.1f} heures
+    """)
+
+def hourly_figures(hourly_stats):
+    """Figures des fraudes et du taux de fraude par heure (colonnes Hour, Fraudes, Taux_Fraude)"""
+    # Graphique en barres des fraudes par heure
+    fig_bar = px.bar(
+        hourly_stats,
+        x='Hour',
+        y='Fraudes',
+        title="Nombre de Fraudes par Heure",
+        labels={'Hour': 'Heure de la journée', 'Fraudes': 'Nombre de Fraudes'},
+        color='Fraudes',
+        color_continuous_scale='Reds'
+    )
+    fig_bar.update_layout(showlegend=False)
+
+    # Courbe du taux de fraude par heure
+    fig_line = px.line(
+        hourly_stats,
+        x='Hour',
+        y='Taux_Fraude',
+        title="Taux de Fraude par Heure",
+        labels={'Hour': 'Heure de la journée', 'Taux_Fraude': 'Taux de Fraude'},
+        markers=True
+    )
+    fig_line.update_traces(line_color='#DC143C', line_width=3)
+    return fig_bar, fig_line
+
+def show_hourly_charts(figures):
+    """Affiche côte à côte les figures construites par `hourly_figures`"""
+    for column, fig in zip(st.columns(2), figures):
+        with column:
+            st.plotly_chart(fig, use_container_width=True)
+
+def fraud_heatmap_figure(pivot_data):
+    """Heatmap du nombre de fraudes (table pivotée Jour × Heure)"""
+    return px.imshow(
+        pivot_data,
+        title="Intensité des Fraudes par Jour et Heure",
+        labels={'x': 'Heure de la journée', 'y': 'Jour', 'color': 'Nombre de Fraudes'},
+        color_continuous_scale='Reds',
+        aspect='auto'
+    )
+
+def show_fraud_heatmap(fig_heatmap):
+    """Affiche la heatmap temporelle construite par `fraud_heatmap_figure`"""
+    st.subheader("🔥 Heatmap Temporelle des Fraudes")
+    st.plotly_chart(fig_heatmap, use_container_width=True)
+
+def amount_histogram_figure(edges, counts_by_class):
+    """Histogramme empilé des montants à partir des comptages par tranche {classe: comptages}"""
+    centers = (edges[:-1] + edges[1:]) / 2
+    fig_hist = go.Figure()
+    for cls, counts in counts_by_class.items():
+        fig_hist.add_trace(go.Bar(
+            x=centers, y=counts, width=np.diff(edges) * 0.9,
+            name=CLASS_NAMES[cls], marker_color=CLASS_COLORS[cls]
+        ))
+    fig_hist.update_layout(
+        title="Distribution des Montants par Type",
+        xaxis_title='Montant ($)', yaxis_title='Nombre de transactions',
+        legend_title='Type de Transaction', barmode='relative'
+    )
+    return fig_hist
+
+def amount_box_figure(boxes):
+    """Boîtes à moustaches précalculées {classe: box_summary} avec les points atypiques retenus"""
+    fig_box = go.Figure()
+    for cls, box in boxes.items():
+        fig_box.add_trace(go.Box(
+            x=[CLASS_NAMES[cls]], q1=[box['q1']], median=[box['median']], q3=[box['q3']],
+            mean=[box['mean']], lowerfence=[box['lowerfence']], upperfence=[box['upperfence']],
+            name=CLASS_NAMES[cls], marker_color=CLASS_COLORS[cls], boxpoints=False
+        ))
+        if len(box['outliers']) > 0:
+            fig_box.add_trace(go.Scatter(
+                x=[CLASS_NAMES[cls]] * len(box['outliers']), y=box['outliers'], mode='markers',
+                marker=dict(color=CLASS_COLORS[cls], size=4), showlegend=False,
+                name=f"{CLASS_NAMES[cls]} (atypiques)"
+            ))
+    fig_box.update_layout(
+        title="Distribution des Montants par Type",
+        yaxis_title='Montant ($)', legend_title='Type de Transaction', showlegend=True
+    )
+    return fig_box
+
+def amount_violin_figure(densities):
+    """Violons dessinés à partir des densités précalculées {classe: (grille, densité)}"""
+    fig_violin = go.Figure()
+    for position, (cls, (grid, density)) in enumerate(densities.items()):
+        half_width = density / density.max() * 0.45 if density.max() > 0 else density
+        fig_violin.add_trace(go.Scatter(
+            x=np.concatenate([position + half_width, (position - half_width)[::-1]]),
+            y=np.concatenate([grid, grid[::-1]]),
+            fill='toself', mode='lines', line=dict(color=CLASS_COLORS[cls], width=1),
+            name=CLASS_NAMES[cls]
+        ))
+    fig_violin.update_layout(
+        title="Densité des Montants par Type",
+        yaxis_title='Montant ($)', legend_title='Type de Transaction',
+        xaxis=dict(tickvals=list(range(len(densities))),
+                   ticktext=[CLASS_NAMES[cls] for cls in densities])
+    )
+    return fig_violin
+
+def zoom_window(label, low, high):
+    """Curseur de fenêtre de zoom entre les bornes des données filtrées"""
+    low, high = float(low), float(high)
+    if not high > low:
+        high = low + 1.0
+    return st.slider(label, min_value=low, max_value=high, value=(low, high))
+
+def anomaly_density_figure(x_edges, y_edges, counts, overlays):
+    """
+    Image de densité Montant × Temps (échelle log) avec des points superposés.
+
+    `overlays` associe un libellé à (temps, montants, couleur) ; ces points
+    peu nombreux sont tracés en WebGL (Scattergl).
+    """
+    z = log_counts(counts)
+    top = int(np.ceil(np.nanmax(z))) if np.isfinite(z).any() else 1
+    top = max(top, 1)
+    fig_density = go.Figure(go.Heatmap(
+        x=(x_edges[:-1] + x_edges[1:]) / 2,
+        y=(y_edges[:-1] + y_edges[1:]) / 2,
+        z=z,
+        zmin=0, zmax=top,
+        colorscale='Blues',
+        colorbar=dict(title='Transactions', tickvals=list(range(top + 1)),
+                      ticktext=[f"{10 ** k:,}" for k in range(top + 1)]),
+        hovertemplate="Temps: %{x:.0f} s<br>Montant: $%{y:.2f}<br>log₁₀(transactions): %{z:.2f}<extra></extra>",
+        name='Densité'
+    ))
+    for label, (times, amounts, color) in overlays.items():
+        fig_density.add_trace(go.Scattergl(
+            x=times, y=amounts, mode='markers', name=label,
+            marker=dict(color=color, size=5, opacity=0.8)
+        ))
+    fig_density.update_layout(
+        title="Densité Montant vs Temps (toutes les transactions filtrées, échelle log)",
+        xaxis_title='Temps (secondes)', yaxis_title='Montant ($)',
+        legend=dict(orientation='h', y=-0.2)
+    )
+    return fig_density
+
+def choose_outlier_rule():
+    """Choix de la règle de détection des valeurs atypiques"""
+    return st.radio("Règle de détection", list(OUTLIER_RULES),
+                    format_func=lambda rule: OUTLIER_RULES[rule][0], horizontal=True)
+
+def show_outlier_thresholds(rule, bounds, factor):
+    """Statistiques et seuils de la règle de détection appliquée aux montants"""
+    st.subheader("📋 Seuils de Détection d'Anomalies")
+    col1, col2 = st.columns(2)
+
+    with col1:
+        if rule == 'iqr':
+            st.info(f"""
+            **Méthode: Interquartile Range (IQR), {factor:g} × IQR**
+            - Q1 (25e percentile): ${bounds['q1']:.2f}
+            - Q3 (75e percentile): ${bounds['q3']:.2f}
+            - IQR: ${bounds['scale']:.2f}
+            """)
+        else:
+            center, scale = ("Moyenne", "Écart-type") if rule == 'zscore' else ("Médiane", "MAD normalisé")
+            st.info(f"""
+            **Méthode: {OUTLIER_RULES[rule][0]}, seuil {factor:g} × {scale}**
+            - {center}: ${bounds['center']:.2f}
+            - {scale}: ${bounds['scale']:.2f}
+            """)
+
+    with col2:
+        st.warning(f"""
+        **Seuils d'Anomalie:**
+        - Seuil inférieur: ${bounds['lower']:.2f}
+        - Seuil supérieur: ${bounds['upper']:.2f}
+        """)
+
+def show_feature_outlier_scan(scan, labels):
+    """Lift de fraude des valeurs atypiques de chaque variable et nombre de variables atypiques par transaction"""
+    lift = scan.fraud_lift(labels)
+    col1, col2 = st.columns(2)
+
+    with col1:
+        fig_lift = px.bar(
+            lift.dropna(subset=['Lift']),
+            x='Variable',
+            y='Lift',
+            title="Lift de Fraude des Outliers par Variable",
+            labels={'Lift': 'Taux de fraude des outliers / taux global'},
+            color='Lift',
+            color_continuous_scale='Reds'
+        )
+        st.plotly_chart(fig_lift, use_container_width=True)
+
+    with col2:
+        # Comptages par nombre de variables atypiques (un bincount, pas de points envoyés)
+        row_counts = scan.row_counts
+        per_count = np.bincount(row_counts, minlength=1)
+        fraud_per_count = np.bincount(row_counts, weights=np.asarray(labels) != 0, minlength=len(per_count))
+        fig_counts = go.Figure(go.Bar(x=np.arange(len(per_count)), y=per_count, marker_color='#87CEEB',
+                                      customdata=fraud_per_count,
+                                      hovertemplate="%{y:,} transactions, %{customdata:,.0f} fraudes<extra></extra>"))
+        fig_counts.update_layout(title="Transactions par Nombre de Variables Atypiques",
+                                 xaxis_title='Variables atypiques', yaxis_title='Transactions', yaxis_type='log')
+        st.plotly_chart(fig_counts, use_container_width=True)
+
+    st.dataframe(lift.round(2), use_container_width=True)
+
+def choose_export_format():
+    """Choix du format des fichiers d'export"""
+    return st.radio("Format d'export", list(EXPORT_FORMATS),
+                    format_func=lambda fmt: EXPORT_FORMATS[fmt][0], horizontal=True)
+
+def offer_export(label, make_frame, file_stem, export_format, key):
+    """
+    Export à la demande : `make_frame` n'est appelé et le fichier sérialisé
+    (par blocs) qu'après un clic sur le bouton de préparation, jamais à
+    chaque interaction avec les filtres.
+    """
+    format_name, extension, mime = EXPORT_FORMATS[export_format]
+    if st.button(f"{label} — préparer en {format_name}", key=f"prepare_{key}"):
+        st.download_button(
+            label=f"📥 Télécharger ({extension})",
+            data=export_bytes(make_frame(), export_format),
+            file_name=f"{file_stem}_{pd.Timestamp.now().strftime('%Y%m%d_%H%M%S')}.{extension}",
+            mime=mime,
+            key=f"download_{key}"
+        )
+
+def create_streaming_dashboard(profile):
+    """Vue allégée calculée en flux, pour les fichiers trop volumineux pour la mémoire"""
+    
+    st.markdown('<h1 class="main-header">🏦 Tableau de Bord - Détection de Fraudes Bancaires</h1>', 
+                unsafe_allow_html=True)
+    st.markdown("---")
+    
+    kpis = profile.kpis()
+    show_dataset_info(kpis)
+    st.sidebar.warning("⚠️ Fichier volumineux : statistiques calculées en flux, sans filtres interactifs.")
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("📊 Total Transactions", f"{kpis['total_transactions']:,}")
+    with col2:
+        st.metric("🚨 Fraudes Détectées", f"{kpis['fraud_count']:,}")
+    with col3:
+        st.metric("📈 Taux de Fraude", f"{kpis['fraud_rate']:.3f}%")
+    
+    st.markdown("---")
+    
+    # Analyse par heure
+    hourly_stats = profile.hourly_stats()
+    if len(hourly_stats) > 0:
+        st.header("⏰ Analyse Temporelle des Fraudes")
+        show_hourly_charts(hourly_figures(hourly_stats))
+    
+    # Statistiques descriptives (quartiles estimés par histogramme)
+    st.subheader("📈 Statistiques Descriptives")
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.write("**Transactions Normales**")
+        st.dataframe(profile.amount_describe(0).round(2))
+    
+    with col2:
+        st.write("**Transactions Frauduleuses**")
+        if kpis['fraud_count'] > 0:
+            st.dataframe(profile.amount_describe(1).round(2))
+        else:
+            st.info("Aucune transaction frauduleuse dans le fichier")
+
+def create_fraud_dashboard(df, target_col='Class', range_index=None, cube=None, memo=None, fingerprint=None):
+    """
+    Crée le tableau de bord principal pour l'analyse des fraudes.
+
+    Avec `range_index` (index triés de Amount et Time_Hours), les filtres
+    sont résolus par recherche dichotomique en numéros de lignes au lieu de
+    masques booléens sur tout le DataFrame. Avec `cube` (`FraudCube`), les
+    KPIs, la répartition des classes, les statistiques horaires et la
+    heatmap sont lus dans le cube pré-agrégé. Avec `memo` (`FilterMemo`),
+    les calculs d'un état de filtres déjà vu (pour le dataset identifié
+    par `fingerprint`) sont repris tels quels.
+    """
     
     # En-tête principal
     st.markdown('<h1 class="main-header">🏦 Tableau de Bord - Détection de Fraudes Bancaires</h1>', 
@@ -75,14 +452,12 @@ def create_fraud_dashboard(df, target_col='Class'):
     st.markdown("---")
     
     # Informations sur le dataset
-    st.sidebar.header("📊 Informations sur les Données")
-    st.sidebar.info(f"""
-    **Dataset chargé avec succès!**
-    - Nombre total de transactions: {len(df):,}
-    - Nombre de fraudes: {df[target_col].sum():,}
-    - Taux de fraude: {(df[target_col].sum() / len(df) * 100):.3f}%
-    - Période couverte: {df['Time'].max() / 3600:.1f} heures
-    """)
+    show_dataset_info({
+        'total_transactions': len(df),
+        'fraud_count': int(df[target_col].sum()),
+        'fraud_rate': df[target_col].sum() / len(df) * 100,
+        'period_hours': df['Time'].max() / 3600
+    })
     
     # Sidebar - Filtres et paramètres
     st.sidebar.header("🎛️ Filtres et Paramètres")
@@ -97,10 +472,9 @@ def create_fraud_dashboard(df, target_col='Class'):
         format="%.2f"
     )
     
-    # Filtre par temps
+    # Filtre par temps (Time_Hours précalculée au chargement)
     if 'Time' in df.columns:
-        df['Time_Hours'] = df['Time'] / 3600
-        max_hours = df['Time_Hours'].max()
+        max_hours = float(df['Time_Hours'].max())
         time_range = st.sidebar.slider(
             "⏰ Plage horaire",
             min_value=0.0,
@@ -108,40 +482,86 @@ def create_fraud_dashboard(df, target_col='Class'):
             value=(0.0, max_hours),
             step=1.0
         )
-        
-        # Application des filtres
-        df_filtered = df[
-            (df['Amount'] >= amount_range[0]) & 
-            (df['Amount'] <= amount_range[1]) &
-            (df['Time_Hours'] >= time_range[0]) & 
-            (df['Time_Hours'] <= time_range[1])
-        ].copy()
     else:
-        df_filtered = df[
-            (df['Amount'] >= amount_range[0]) & 
-            (df['Amount'] <= amount_range[1])
-        ].copy()
+        time_range = None
+    
+    def memoized(name, compute, *params):
+        """Calcul mémorisé pour l'état courant des filtres (recalculé à chaque exécution sans mémo)"""
+        if memo is None:
+            return compute()
+        return memo.get_or_compute((fingerprint, name, amount_range, time_range, *params), compute)
     
-    # Échantillonnage pour améliorer les performances
+    def select_rows():
+        if range_index is not None:
+            # Plages résolues en numéros de lignes (O(log n + k)), sans masque sur tout le DataFrame
+            return range_index.select({'Amount': amount_range, 'Time_Hours': time_range})
+        # Application des filtres
+        mask = (df['Amount'] >= amount_range[0]) & (df['Amount'] <= amount_range[1])
+        if time_range is not None:
+            mask &= (df['Time_Hours'] >= time_range[0]) & (df['Time_Hours'] <= time_range[1])
+        return np.flatnonzero(mask.to_numpy())
+    
+    rows = memoized('rows', select_rows)
+    # Tout est sélectionné : le DataFrame partagé sert directement, sans copie
+    df_filtered = df if len(rows) == len(df) else df.take(rows)
+    
+    # Échantillonnage du nuage de points (les distributions sont résumées sur toutes les lignes)
     sample_size = st.sidebar.selectbox(
-        "📈 Taille de l'échantillon pour les graphiques",
+        "📈 Taille de l'échantillon du nuage de points",
         options=[1000, 5000, 10000, 25000, "Toutes les données"],
         index=2
     )
     
     if sample_size != "Toutes les données" and len(df_filtered) > sample_size:
-        df_display = df_filtered.sample(n=sample_size, random_state=42)
+        # Échantillon tiré directement parmi les numéros de lignes filtrés
+        sample_rows = memoized(
+            'sample', lambda: np.sort(np.random.default_rng(42).choice(rows, size=sample_size, replace=False)),
+            sample_size
+        )
+        df_display = df.take(sample_rows)
         st.sidebar.warning(f"⚠️ Affichage d'un échantillon de {sample_size:,} transactions pour optimiser les performances.")
     else:
         df_display = df_filtered
     
+    # Montants filtrés par classe, résumés côté serveur pour les distributions
+    amount_values = df_filtered['Amount'].to_numpy()
+    class_values = df_filtered[target_col].to_numpy()
+    amounts_by_class = {cls: amount_values[class_values == cls] for cls in CLASS_NAMES}
+    amounts_by_class = {cls: values for cls, values in amounts_by_class.items() if len(values) > 0}
+    
+    def summarize_amounts():
+        """Histogramme, boîtes, densités et statistiques descriptives des montants par classe"""
+        edges = histogram_edges(np.nanmin(amount_values), np.nanmax(amount_values)) if len(amount_values) > 0 else None
+        return {
+            'edges': edges,
+            'counts': {cls: bin_counts(values, edges) for cls, values in amounts_by_class.items() if edges is not None},
+            'boxes': {cls: box_summary(values) for cls, values in amounts_by_class.items()},
+            'densities': {cls: binned_kde(values) for cls, values in amounts_by_class.items()},
+            'describe': {cls: describe_values(amounts_by_class.get(cls, np.empty(0)), name='Amount') for cls in CLASS_NAMES},
+        }
+    
+    amount_summaries = memoized('amount_summaries', summarize_amounts)
+    
     # Métriques principales
     col1, col2, col3, col4 = st.columns(4)
     
+    # Agrégats des curseurs lus dans le cube (tranches complètes + lignes des bornes)
+    if cube is not None and time_range is not None:
+        cube_slice = memoized('cube_slice', lambda: cube.query(amount_range, time_range))
+    else:
+        cube_slice = None
+    
+    def compute_kpis():
+        if cube_slice is not None:
+            cube_kpis = cube_slice.kpis()
+            return cube_kpis['fraud_count'], cube_kpis['avg_amount']
+        # Agrégats calculés sur les colonnes via le tableau d'indices
+        return (int(class_values.sum()),
+                amount_values.mean() if len(amount_values) > 0 else np.nan)
+    
     total_transactions = len(df_filtered)
-    fraud_count = int(df_filtered[target_col].sum())
+    fraud_count, avg_amount = memoized('kpis', compute_kpis)
     fraud_rate = (fraud_count / total_transactions * 100) if total_transactions > 0 else 0
-    avg_amount = df_filtered['Amount'].mean()
     
     with col1:
         st.metric("📊 Total Transactions", f"{total_transactions:,}")
@@ -173,31 +593,32 @@ def create_fraud_dashboard(df, target_col='Class'):
         
         with col1:
             # Graphique en secteurs
-            fraud_counts = df_filtered[target_col].value_counts()
-            labels = ['Transactions Normales', 'Transactions Frauduleuses']
+            def build_pie():
+                if cube_slice is not None:
+                    fraud_counts = cube_slice.class_counts()
+                    fraud_counts = fraud_counts[fraud_counts > 0]
+                else:
+                    fraud_counts = df_filtered[target_col].value_counts()
+                labels = ['Transactions Normales', 'Transactions Frauduleuses']
+                
+                fig_pie = px.pie(
+                    values=fraud_counts.values,
+                    names=labels,
+                    title="Répartition des Types de Transactions",
+                    color_discrete_sequence=['#87CEEB', '#FA8072']
+                )
+                fig_pie.update_traces(textposition='inside', textinfo='percent+label')
+                return fig_pie
             
-            fig_pie = px.pie(
-                values=fraud_counts.values,
-                names=labels,
-                title="Répartition des Types de Transactions",
-                color_discrete_sequence=['#87CEEB', '#FA8072']
-            )
-            fig_pie.update_traces(textposition='inside', textinfo='percent+label')
-            st.plotly_chart(fig_pie, use_container_width=True)
+            # Les figures Plotly coûtent plus cher à construire que les agrégats : mémorisées aussi
+            st.plotly_chart(memoized('fig_pie', build_pie), use_container_width=True)
         
         with col2:
-            # Histogramme des montants
-            fig_hist = px.histogram(
-                df_display,
-                x='Amount',
-                color=target_col,
-                nbins=50,
-                title="Distribution des Montants par Type",
-                labels={'Amount': 'Montant ($)', target_col: 'Type de Transaction'},
-                color_discrete_sequence=['#87CEEB', '#FA8072']
-            )
-            fig_hist.update_layout(bargap=0.1)
-            st.plotly_chart(fig_hist, use_container_width=True)
+            # Histogramme des montants (comptages par tranche calculés sur toutes les lignes filtrées)
+            if amount_summaries['edges'] is not None:
+                fig_hist = memoized('fig_hist', lambda: amount_histogram_figure(
+                    amount_summaries['edges'], amount_summaries['counts']))
+                st.plotly_chart(fig_hist, use_container_width=True)
         
         # Statistiques descriptives
         st.subheader("📈 Statistiques Descriptives")
@@ -205,77 +626,56 @@ def create_fraud_dashboard(df, target_col='Class'):
         
         with col1:
             st.write("**Transactions Normales**")
-            normal_stats = df_filtered[df_filtered[target_col] == 0]['Amount'].describe()
+            normal_stats = amount_summaries['describe'][0]
             st.dataframe(normal_stats.round(2))
         
         with col2:
             st.write("**Transactions Frauduleuses**")
             if fraud_count > 0:
-                fraud_stats = df_filtered[df_filtered[target_col] == 1]['Amount'].describe()
+                fraud_stats = amount_summaries['describe'][1]
                 st.dataframe(fraud_stats.round(2))
             else:
                 st.info("Aucune transaction frauduleuse dans les données filtrées")
+        
+        # Variables anonymisées : chargées seulement si cette vue est demandée
+        if st.checkbox("🧬 Corrélation des variables V1–V28 avec la fraude"):
+            features = load_feature_columns()
+            if len(features.columns) > 0 and len(df_filtered) > 1:
+                correlations = features.loc[df_filtered.index].corrwith(
+                    df_filtered[target_col].astype(float)
+                ).dropna()
+                correlations = correlations.reindex(correlations.abs().sort_values(ascending=False).index)
+                fig_corr = px.bar(
+                    x=correlations.index,
+                    y=correlations.values,
+                    title="Corrélation des Variables avec la Fraude (données filtrées)",
+                    labels={'x': 'Variable', 'y': 'Corrélation'},
+                    color=correlations.values,
+                    color_continuous_scale='RdBu_r'
+                )
+                st.plotly_chart(fig_corr, use_container_width=True)
+            else:
+                st.info("Aucune variable supplémentaire dans ce dataset")
     
     # Tab 2: Analyse Temporelle
     with tab2:
         if 'Time' in df.columns:
             st.header("⏰ Analyse Temporelle des Fraudes")
             
-            # Analyse par heure
-            df_filtered['Hour'] = (df_filtered['Time'] / 3600).astype(int) % 24
-            hourly_stats = df_filtered.groupby('Hour').agg({
-                target_col: ['count', 'sum', 'mean']
-            }).reset_index()
-            hourly_stats.columns = ['Hour', 'Total_Transactions', 'Fraudes', 'Taux_Fraude']
-            
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                # Graphique en barres des fraudes par heure
-                fig_bar = px.bar(
-                    hourly_stats,
-                    x='Hour',
-                    y='Fraudes',
-                    title="Nombre de Fraudes par Heure",
-                    labels={'Hour': 'Heure de la journée', 'Fraudes': 'Nombre de Fraudes'},
-                    color='Fraudes',
-                    color_continuous_scale='Reds'
-                )
-                fig_bar.update_layout(showlegend=False)
-                st.plotly_chart(fig_bar, use_container_width=True)
+            # Analyse par heure et heatmap : cube, sinon un seul comptage des lignes filtrées
+            def compute_time_tables():
+                if cube_slice is not None:
+                    time_aggregates = cube_slice
+                else:
+                    time_aggregates = TimeAggregates.from_arrays(df_filtered['Time'].to_numpy(), class_values)
+                return time_aggregates.hourly_stats(), time_aggregates.day_hour_frauds()
             
-            with col2:
-                # Courbe du taux de fraude par heure
-                fig_line = px.line(
-                    hourly_stats,
-                    x='Hour',
-                    y='Taux_Fraude',
-                    title="Taux de Fraude par Heure",
-                    labels={'Hour': 'Heure de la journée', 'Taux_Fraude': 'Taux de Fraude'},
-                    markers=True
-                )
-                fig_line.update_traces(line_color='#DC143C', line_width=3)
-                st.plotly_chart(fig_line, use_container_width=True)
+            hourly_stats, pivot_data = memoized('time_tables', compute_time_tables)
+            show_hourly_charts(memoized('fig_hourly', lambda: hourly_figures(hourly_stats)))
             
             # Heatmap temporelle
-            if len(df_filtered) > 0:
-                st.subheader("🔥 Heatmap Temporelle des Fraudes")
-                
-                df_filtered['Day'] = (df_filtered['Time'] / (3600 * 24)).astype(int)
-                heatmap_data = df_filtered.groupby(['Day', 'Hour'])[target_col].sum().reset_index()
-                
-                if len(heatmap_data) > 0:
-                    pivot_data = heatmap_data.pivot(index='Day', columns='Hour', values=target_col)
-                    pivot_data = pivot_data.fillna(0)
-                    
-                    fig_heatmap = px.imshow(
-                        pivot_data,
-                        title="Intensité des Fraudes par Jour et Heure",
-                        labels={'x': 'Heure de la journée', 'y': 'Jour', 'color': 'Nombre de Fraudes'},
-                        color_continuous_scale='Reds',
-                        aspect='auto'
-                    )
-                    st.plotly_chart(fig_heatmap, use_container_width=True)
+            if total_transactions > 0:
+                show_fraud_heatmap(memoized('fig_heatmap', lambda: fraud_heatmap_figure(pivot_data)))
         else:
             st.info("⚠️ Données temporelles non disponibles dans ce dataset")
     
@@ -286,114 +686,104 @@ def create_fraud_dashboard(df, target_col='Class'):
         col1, col2 = st.columns(2)
         
         with col1:
-            # Box plot interactif
-            fig_box = px.box(
-                df_display,
-                y='Amount',
-                color=target_col,
-                title="Distribution des Montants par Type",
-                labels={'Amount': 'Montant ($)', target_col: 'Type de Transaction'},
-                color_discrete_sequence=['#87CEEB', '#FA8072']
-            )
-            fig_box.update_layout(showlegend=True)
+            # Box plot : quartiles, moustaches et points atypiques (bornés) précalculés
+            fig_box = memoized('fig_box', lambda: amount_box_figure(amount_summaries['boxes']))
             st.plotly_chart(fig_box, use_container_width=True)
         
         with col2:
-            # Violin plot
-            fig_violin = px.violin(
-                df_display,
-                y='Amount',
-                color=target_col,
-                title="Densité des Montants par Type",
-                labels={'Amount': 'Montant ($)', target_col: 'Type de Transaction'},
-                color_discrete_sequence=['#87CEEB', '#FA8072']
-            )
+            # Violin plot : densité à noyau calculée par FFT sur une grille
+            fig_violin = memoized('fig_violin', lambda: amount_violin_figure(amount_summaries['densities']))
             st.plotly_chart(fig_violin, use_container_width=True)
         
         # Analyse comparative des montants
         st.subheader("📊 Comparaison des Montants")
         
         if fraud_count > 0:
-            normal_amounts = df_filtered[df_filtered[target_col] == 0]['Amount']
-            fraud_amounts = df_filtered[df_filtered[target_col] == 1]['Amount']
-            
-            comparison_data = {
+            # Mêmes statistiques que les tableaux descriptifs (médiane estimée au-delà du seuil)
+            metrics = ['mean', '50%', 'std', 'min', 'max']
+            comparison_df = pd.DataFrame({
                 'Métrique': ['Moyenne', 'Médiane', 'Écart-type', 'Min', 'Max'],
-                'Transactions Normales': [
-                    normal_amounts.mean(),
-                    normal_amounts.median(),
-                    normal_amounts.std(),
-                    normal_amounts.min(),
-                    normal_amounts.max()
-                ],
-                'Transactions Frauduleuses': [
-                    fraud_amounts.mean(),
-                    fraud_amounts.median(),
-                    fraud_amounts.std(),
-                    fraud_amounts.min(),
-                    fraud_amounts.max()
-                ]
-            }
-            
-            comparison_df = pd.DataFrame(comparison_data)
-            comparison_df['Transactions Normales'] = comparison_df['Transactions Normales'].round(2)
-            comparison_df['Transactions Frauduleuses'] = comparison_df['Transactions Frauduleuses'].round(2)
-            
+                'Transactions Normales': normal_stats[metrics].round(2).values,
+                'Transactions Frauduleuses': fraud_stats[metrics].round(2).values
+            })
             st.dataframe(comparison_df, use_container_width=True)
     
     # Tab 4: Détection d'Anomalies
     with tab4:
         st.header("🔍 Détection d'Anomalies")
         
-        # Calcul des outliers avec la méthode IQR
-        Q1 = df_filtered['Amount'].quantile(0.25)
-        Q3 = df_filtered['Amount'].quantile(0.75)
-        IQR = Q3 - Q1
-        lower_bound = Q1 - 1.5 * IQR
-        upper_bound = Q3 + 1.5 * IQR
+        # Outliers des montants selon la règle choisie (IQR par défaut)
+        outlier_rule = choose_outlier_rule()
+        amount_scan = memoized(
+            'outliers', lambda: OutlierScan.from_matrix(amount_values[np.newaxis], ['Amount'], rule=outlier_rule),
+            outlier_rule
+        )
+        amount_bounds = amount_scan.column_bounds('Amount')
+        lower_bound, upper_bound = amount_bounds['lower'], amount_bounds['upper']
         
-        outliers = df_filtered[
-            (df_filtered['Amount'] < lower_bound) | 
-            (df_filtered['Amount'] > upper_bound)
-        ]
+        # Masque des outliers : les lignes ne sont extraites que pour un export
+        outlier_mask = amount_scan.column_flags('Amount')
+        n_outliers = int(outlier_mask.sum())
         
         # Métriques des anomalies
         col1, col2, col3 = st.columns(3)
         
         with col1:
-            st.metric("🎯 Outliers Détectés", f"{len(outliers):,}")
+            st.metric("🎯 Outliers Détectés", f"{n_outliers:,}")
         
         with col2:
-            outlier_rate = (len(outliers) / len(df_filtered) * 100) if len(df_filtered) > 0 else 0
+            outlier_rate = (n_outliers / len(df_filtered) * 100) if len(df_filtered) > 0 else 0
             st.metric("📊 Taux d'Outliers", f"{outlier_rate:.2f}%")
         
         with col3:
-            if len(outliers) > 0:
-                outlier_fraud_rate = outliers[target_col].mean() * 100
+            if n_outliers > 0:
+                outlier_fraud_rate = class_values[outlier_mask].mean() * 100
                 st.metric("🚨 % Fraude dans Outliers", f"{outlier_fraud_rate:.1f}%")
             else:
                 st.metric("🚨 % Fraude dans Outliers", "0.0%")
         
-        # Scatter plot avec indication des outliers
-        if 'Time' in df_filtered.columns and len(df_display) > 0:
+        # Montant vs Temps : image de densité de toutes les lignes, ou nuage de l'échantillon
+        view_mode = ANOMALY_VIEW_MODES[1]
+        if 'Time' in df_filtered.columns and len(df_filtered) > 0:
             st.subheader("📈 Visualisation des Anomalies")
+            view_mode = st.radio("Mode d'affichage", ANOMALY_VIEW_MODES, horizontal=True)
+        
+        if view_mode == ANOMALY_VIEW_MODES[0]:
+            time_values = df_filtered['Time'].to_numpy()
+            with st.expander("🔎 Fenêtre de zoom (image recalculée sur le serveur)"):
+                time_window = zoom_window("⏱️ Temps (secondes)", np.nanmin(time_values), np.nanmax(time_values))
+                amount_window = zoom_window("💵 Montant ($)", np.nanmin(amount_values), np.nanmax(amount_values))
             
-            # Créer une colonne pour indiquer les outliers (convertir en numérique)
-            df_display_copy = df_display.copy()
-            df_display_copy['Is_Outlier'] = (
-                (df_display_copy['Amount'] < lower_bound) | 
-                (df_display_copy['Amount'] > upper_bound)
-            ).astype(int)  # Convertir boolean en int pour Plotly
+            def build_density():
+                x_edges, y_edges, counts = density_raster(time_values, amount_values, time_window, amount_window)
+                in_window = (
+                    (time_values >= time_window[0]) & (time_values <= time_window[1]) &
+                    (amount_values >= amount_window[0]) & (amount_values <= amount_window[1])
+                )
+                overlays = {}
+                for label, selected, color in [("🎯 Outliers", in_window & outlier_mask, '#FF8C00'),
+                                               ("🚨 Fraudes", in_window & (class_values == 1), '#DC143C')]:
+                    overlay_rows = spread_rows(np.nonzero(selected)[0])
+                    overlays[label] = (time_values[overlay_rows], amount_values[overlay_rows], color)
+                return anomaly_density_figure(x_edges, y_edges, counts, overlays), int(counts.sum())
             
-            # Créer des tailles de points basées sur les outliers
-            df_display_copy['Point_Size'] = df_display_copy['Is_Outlier'] * 10 + 5
+            fig_density, n_in_window = memoized('fig_density', build_density, outlier_rule, time_window, amount_window)
+            st.plotly_chart(fig_density, use_container_width=True)
+            st.caption(f"{n_in_window:,} transactions dans la fenêtre, "
+                       f"résumées en {RASTER_SHAPE[0]} × {RASTER_SHAPE[1]} cellules")
+        
+        elif 'Time' in df_filtered.columns and len(df_display) > 0:
+            # Tailles des points selon les outliers (tableau séparé, sans copie de l'échantillon)
+            amounts = df_display['Amount'].to_numpy()
+            is_outlier = ((amounts < lower_bound) | (amounts > upper_bound)).astype(int)
+            point_size = is_outlier * 10 + 5
             
             fig_scatter = px.scatter(
-                df_display_copy,
+                df_display,
                 x='Time',
                 y='Amount',
                 color=target_col,
-                size='Point_Size',
+                size=point_size,
                 title="Montant vs Temps (Points plus gros = Outliers)",
                 labels={
                     'Time': 'Temps (secondes)', 
@@ -407,86 +797,290 @@ def create_fraud_dashboard(df, target_col='Class'):
             st.plotly_chart(fig_scatter, use_container_width=True)
         
         # Informations sur les seuils de détection
-        st.subheader("📋 Seuils de Détection d'Anomalies")
-        col1, col2 = st.columns(2)
+        show_outlier_thresholds(outlier_rule, amount_bounds, amount_scan.factor)
         
-        with col1:
-            st.info(f"""
-            **Méthode: Interquartile Range (IQR)**
-            - Q1 (25e percentile): ${Q1:.2f}
-            - Q3 (75e percentile): ${Q3:.2f}
-            - IQR: ${IQR:.2f}
-            """)
-        
-        with col2:
-            st.warning(f"""
-            **Seuils d'Anomalie:**
-            - Seuil inférieur: ${lower_bound:.2f}
-            - Seuil supérieur: ${upper_bound:.2f}
-            """)
+        # Toutes les variables numériques : seuils en un seul calcul, V1–V28 chargées sur demande
+        if st.checkbox("🧬 Outliers de toutes les variables et lift de fraude") and len(df_filtered) > 0:
+            st.subheader("🧬 Outliers par Variable")
+            features = load_feature_columns()
+            core = [col for col in CORE_COLUMNS if col in df_filtered.columns and col != target_col]
+            scan_frame = df_filtered[core].join(features.loc[df_filtered.index])
+            feature_scan = OutlierScan.from_frame(scan_frame, rule=outlier_rule)
+            show_feature_outlier_scan(feature_scan, class_values)
     
     # Section de téléchargement
     st.markdown("---")
     st.header("📥 Téléchargement des Résultats")
     
+    export_format = choose_export_format()
     col1, col2, col3 = st.columns(3)
     
     with col1:
-        # Télécharger les données filtrées
-        csv_filtered = df_filtered.to_csv(index=False)
-        st.download_button(
-            label="📊 Données Filtrées (CSV)",
-            data=csv_filtered,
-            file_name=f"fraud_analysis_filtered_{pd.Timestamp.now().strftime('%Y%m%d_%H%M%S')}.csv",
-            mime="text/csv"
+        # Données filtrées (V1–V28 ajoutées seulement sur demande)
+        include_features = st.checkbox("Inclure les variables V1–V28")
+        offer_export(
+            "📊 Données Filtrées",
+            lambda: df_filtered.join(load_feature_columns()) if include_features else df_filtered,
+            "fraud_analysis_filtered", export_format, key='filtered'
         )
     
     with col2:
-        # Télécharger les outliers
-        if len(outliers) > 0:
-            csv_outliers = outliers.to_csv(index=False)
-            st.download_button(
-                label="🎯 Outliers Détectés (CSV)",
-                data=csv_outliers,
-                file_name=f"outliers_analysis_{pd.Timestamp.now().strftime('%Y%m%d_%H%M%S')}.csv",
-                mime="text/csv"
-            )
+        # Outliers extraits au moment de l'export
+        if n_outliers > 0:
+            offer_export("🎯 Outliers Détectés", lambda: df_filtered[outlier_mask],
+                         "outliers_analysis", export_format, key='outliers')
         else:
             st.info("Aucun outlier à télécharger")
     
     with col3:
-        # Télécharger le rapport de synthèse
-        summary_data = {
-            'Métrique': [
-                'Total Transactions',
-                'Fraudes Détectées',
-                'Taux de Fraude (%)',
-                'Montant Moyen ($)',
-                'Outliers Détectés',
-                'Taux d\'Outliers (%)'
-            ],
-            'Valeur': [
-                total_transactions,
-                fraud_count,
-                round(fraud_rate, 3),
-                round(avg_amount, 2),
-                len(outliers),
-                round(outlier_rate, 2)
-            ]
-        }
-        summary_df = pd.DataFrame(summary_data)
-        csv_summary = summary_df.to_csv(index=False)
-        
-        st.download_button(
-            label="📋 Rapport de Synthèse (CSV)",
-            data=csv_summary,
-            file_name=f"fraud_summary_{pd.Timestamp.now().strftime('%Y%m%d_%H%M%S')}.csv",
-            mime="text/csv"
+        # Rapport de synthèse
+        def summary_frame():
+            return pd.DataFrame({
+                'Métrique': [
+                    'Total Transactions',
+                    'Fraudes Détectées',
+                    'Taux de Fraude (%)',
+                    'Montant Moyen ($)',
+                    'Outliers Détectés',
+                    'Taux d\'Outliers (%)'
+                ],
+                'Valeur': [
+                    total_transactions,
+                    fraud_count,
+                    round(fraud_rate, 3),
+                    round(avg_amount, 2),
+                    n_outliers,
+                    round(outlier_rate, 2)
+                ]
+            })
+        offer_export("📋 Rapport de Synthèse", summary_frame, "fraud_summary", export_format, key='summary')
+
+def create_sql_dashboard(store, target_col='Class'):
+    """Tableau de bord adossé à la base SQLite : filtres et agrégations exécutés en SQL indexé"""
+    
+    st.markdown('<h1 class="main-header">🏦 Tableau de Bord - Détection de Fraudes Bancaires</h1>', 
+                unsafe_allow_html=True)
+    st.markdown("---")
+    
+    min_amount, max_amount, max_hours = store.bounds()
+    show_dataset_info({**store.kpis(), 'period_hours': max_hours})
+    
+    # Sidebar - Filtres et paramètres
+    st.sidebar.header("🎛️ Filtres et Paramètres")
+    amount_range = st.sidebar.slider(
+        "💰 Plage de montants ($)",
+        min_value=min_amount,
+        max_value=max_amount,
+        value=(min_amount, min(max_amount, 1000.0)),
+        format="%.2f"
+    )
+    time_range = None
+    if not np.isnan(max_hours):
+        time_range = st.sidebar.slider(
+            "⏰ Plage horaire",
+            min_value=0.0,
+            max_value=max_hours,
+            value=(0.0, max_hours),
+            step=1.0
         )
+    sample_size = st.sidebar.selectbox(
+        "📈 Taille de l'échantillon du nuage de points",
+        options=[1000, 5000, 10000, 25000],
+        index=2
+    )
+    filters = {'amount_range': amount_range, 'time_range': time_range}
+    
+    # Métriques principales (une seule requête agrégée)
+    kpis = store.kpis(**filters)
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("📊 Total Transactions", f"{kpis['total_transactions']:,}")
+    with col2:
+        st.metric("🚨 Fraudes Détectées", f"{kpis['fraud_count']:,}")
+    with col3:
+        st.metric("📈 Taux de Fraude", f"{kpis['fraud_rate']:.3f}%")
+    with col4:
+        st.metric("💵 Montant Moyen", f"${kpis['avg_amount']:.2f}")
+    
+    st.markdown("---")
+    
+    tab1, tab2, tab3, tab4 = st.tabs([
+        "📊 Vue d'ensemble", 
+        "⏰ Analyse Temporelle", 
+        "💰 Analyse des Montants", 
+        "🔍 Détection d'Anomalies"
+    ])
+    
+    with tab1:
+        st.header("📊 Vue d'ensemble des Transactions")
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            fraud_counts = store.class_counts(**filters)
+            fig_pie = px.pie(
+                values=fraud_counts.values,
+                names=['Transactions Normales', 'Transactions Frauduleuses'][:len(fraud_counts)],
+                title="Répartition des Types de Transactions",
+                color_discrete_sequence=['#87CEEB', '#FA8072']
+            )
+            fig_pie.update_traces(textposition='inside', textinfo='percent+label')
+            st.plotly_chart(fig_pie, use_container_width=True)
+        
+        # Statistiques par classe en SQL : elles servent aussi aux boîtes et aux densités
+        stats_by_class = {cls: store.amount_describe(cls, **filters) for cls in CLASS_NAMES}
+        stats_by_class = {cls: stats for cls, stats in stats_by_class.items() if stats['count'] > 0}
+        
+        with col2:
+            # Histogramme : comptages par tranche agrégés en SQL
+            edges = histogram_edges(*amount_range)
+            fig_hist = amount_histogram_figure(
+                edges, {cls: store.amount_histogram(*amount_range, 50, cls, **filters) for cls in stats_by_class}
+            )
+            st.plotly_chart(fig_hist, use_container_width=True)
+        
+        st.subheader("📈 Statistiques Descriptives")
+        col1, col2 = st.columns(2)
+        with col1:
+            st.write("**Transactions Normales**")
+            normal_stats = store.amount_describe(0, **filters) if 0 not in stats_by_class else stats_by_class[0]
+            st.dataframe(normal_stats.round(2))
+        with col2:
+            st.write("**Transactions Frauduleuses**")
+            if kpis['fraud_count'] > 0:
+                fraud_stats = stats_by_class[1]
+                st.dataframe(fraud_stats.round(2))
+            else:
+                st.info("Aucune transaction frauduleuse dans les données filtrées")
+    
+    with tab2:
+        if time_range is not None:
+            st.header("⏰ Analyse Temporelle des Fraudes")
+            show_hourly_charts(hourly_figures(store.hourly_stats(**filters)))
+            if kpis['total_transactions'] > 0:
+                show_fraud_heatmap(fraud_heatmap_figure(store.day_hour_frauds(**filters)))
+        else:
+            st.info("⚠️ Données temporelles non disponibles dans ce dataset")
+    
+    with tab3:
+        st.header("💰 Analyse Détaillée des Montants")
+        col1, col2 = st.columns(2)
+        with col1:
+            fig_box = amount_box_figure({
+                cls: store.amount_box(cls, **filters, describe=stats) for cls, stats in stats_by_class.items()
+            })
+            st.plotly_chart(fig_box, use_container_width=True)
+        with col2:
+            # Densités : comptages sur une grille fine en SQL, lissage par FFT
+            densities = {}
+            for cls, stats in stats_by_class.items():
+                bandwidth = silverman_bandwidth(stats['count'], stats['std'], stats['75%'] - stats['25%'])
+                grid_low, grid_high = stats['min'] - 2 * bandwidth, stats['max'] + 2 * bandwidth
+                counts = store.amount_histogram(grid_low, grid_high, KDE_GRID_SIZE, cls, **filters)
+                densities[cls] = kde_from_counts(
+                    histogram_edges(grid_low, grid_high, KDE_GRID_SIZE), counts, bandwidth
+                )
+            st.plotly_chart(amount_violin_figure(densities), use_container_width=True)
+        
+        st.subheader("📊 Comparaison des Montants")
+        if kpis['fraud_count'] > 0:
+            rows = ['mean', '50%', 'std', 'min', 'max']
+            comparison_df = pd.DataFrame({
+                'Métrique': ['Moyenne', 'Médiane', 'Écart-type', 'Min', 'Max'],
+                'Transactions Normales': normal_stats[rows].round(2).values,
+                'Transactions Frauduleuses': fraud_stats[rows].round(2).values
+            })
+            st.dataframe(comparison_df, use_container_width=True)
+    
+    with tab4:
+        st.header("🔍 Détection d'Anomalies")
+        Q1, Q3, lower_bound, upper_bound = store.iqr_bounds(**filters)
+        IQR = Q3 - Q1
+        n_outliers, outlier_fraud_mean = store.outlier_stats(lower_bound, upper_bound, **filters)
+        outlier_rate = (n_outliers / kpis['total_transactions'] * 100) if kpis['total_transactions'] > 0 else 0
+        
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("🎯 Outliers Détectés", f"{n_outliers:,}")
+        with col2:
+            st.metric("📊 Taux d'Outliers", f"{outlier_rate:.2f}%")
+        with col3:
+            st.metric("🚨 % Fraude dans Outliers", f"{outlier_fraud_mean * 100:.1f}%")
+        
+        view_mode = ANOMALY_VIEW_MODES[1]
+        if time_range is not None and kpis['total_transactions'] > 0:
+            st.subheader("📈 Visualisation des Anomalies")
+            view_mode = st.radio("Mode d'affichage", ANOMALY_VIEW_MODES, horizontal=True)
+        
+        if view_mode == ANOMALY_VIEW_MODES[0]:
+            # Fenêtre bornée par les filtres ; comptages 2D et points superposés extraits en SQL
+            with st.expander("🔎 Fenêtre de zoom (image recalculée sur le serveur)"):
+                time_window = zoom_window("⏱️ Temps (secondes)", time_range[0] * 3600, time_range[1] * 3600)
+                amount_window = zoom_window("💵 Montant ($)", *amount_range)
+            x_edges, y_edges, counts = store.amount_time_raster(time_window, amount_window, RASTER_SHAPE)
+            window = {'amount_range': amount_window, 'time_range': (time_window[0] / 3600, time_window[1] / 3600)}
+            outliers = store.fetch(**window, outliers=(lower_bound, upper_bound), limit=MAX_OVERLAY_POINTS,
+                                   columns=['Time', 'Amount'])
+            frauds = store.fetch(**window, cls=1, limit=MAX_OVERLAY_POINTS, columns=['Time', 'Amount'])
+            overlays = {
+                "🎯 Outliers": (outliers['Time'].to_numpy(), outliers['Amount'].to_numpy(), '#FF8C00'),
+                "🚨 Fraudes": (frauds['Time'].to_numpy(), frauds['Amount'].to_numpy(), '#DC143C'),
+            }
+            st.plotly_chart(anomaly_density_figure(x_edges, y_edges, counts, overlays), use_container_width=True)
+            st.caption(f"{int(counts.sum()):,} transactions dans la fenêtre, "
+                       f"résumées en {RASTER_SHAPE[0]} × {RASTER_SHAPE[1]} cellules")
+        
+        elif time_range is not None and kpis['total_transactions'] > 0:
+            # Seul un échantillon borné des lignes filtrées est rapatrié, et seulement pour le nuage de points
+            df_display = store.fetch(**filters, limit=sample_size, columns=['Time', 'Amount', target_col])
+            is_outlier = ((df_display['Amount'] < lower_bound) | (df_display['Amount'] > upper_bound)).astype(int)
+            fig_scatter = px.scatter(
+                df_display.assign(Point_Size=is_outlier * 10 + 5),
+                x='Time',
+                y='Amount',
+                color=target_col,
+                size='Point_Size',
+                title="Montant vs Temps (Points plus gros = Outliers)",
+                labels={
+                    'Time': 'Temps (secondes)', 
+                    'Amount': 'Montant ($)', 
+                    target_col: 'Type de Transaction'
+                },
+                color_discrete_sequence=['#87CEEB', '#FA8072'],
+                size_max=15
+            )
+            st.plotly_chart(fig_scatter, use_container_width=True)
+        
+        show_outlier_thresholds('iqr', {'q1': Q1, 'q3': Q3, 'scale': IQR, 'lower': lower_bound, 'upper': upper_bound},
+                                OUTLIER_RULES['iqr'][1])
+    
+    # Téléchargements : les lignes ne sont extraites de la base qu'à la demande
+    st.markdown("---")
+    st.header("📥 Téléchargement des Résultats")
+    export_format = choose_export_format()
+    col1, col2 = st.columns(2)
+    with col1:
+        offer_export("📊 Données Filtrées", lambda: store.fetch(**filters),
+                     "fraud_analysis_filtered", export_format, key='filtered')
+    with col2:
+        if n_outliers > 0:
+            offer_export("🎯 Outliers Détectés", lambda: store.fetch(**filters, outliers=(lower_bound, upper_bound)),
+                         "outliers_analysis", export_format, key='outliers')
 
 def main():
     """Fonction principale du dashboard"""
     
+    # Fichier trop volumineux pour la mémoire : profilage en flux
+    data_file = find_dataset('fraud')
+    if data_file and os.path.getsize(data_file) > STREAMING_THRESHOLD_BYTES:
+        create_streaming_dashboard(load_profile(data_file))
+        return
+    
+    # Backend optionnel : requêtes SQL indexées au lieu de filtrer le DataFrame en mémoire
+    if data_file and st.sidebar.checkbox("🗄️ Moteur SQLite indexé", value=False,
+                                         help="Filtres et agrégations exécutés dans une base SQLite locale"):
+        create_sql_dashboard(load_store(data_file))
+        return
+    
     # Chargement des données
     df = load_data()
     
@@ -501,7 +1095,11 @@ def main():
             return
         
         # Lancer le dashboard
-        create_fraud_dashboard(df, target_col='Class')
+        create_fraud_dashboard(df, target_col='Class', range_index=load_range_index(), cube=load_fraud_cube(),
+                               memo=load_filter_memo(), fingerprint=dataset_fingerprint(data_file))
+        memo_stats = load_filter_memo().stats()
+        st.sidebar.caption(f"♻️ Mémo des filtres : {memo_stats['entries']} résultats "
+                           f"({memo_stats['nbytes'] / 1024 ** 2:.1f} Mo), {memo_stats['hits']} réutilisés")
         
         # Footer
         st.markdown("---")
@@ -529,4 +1127,12 @@ def main():
         """)
 
 if __name__ == "__main__":
-    main()
+    # Pic de mémoire résidente du processus (remis à zéro à chaque interaction quand c'est possible,
+    # partagé par toutes les sessions)
+    with PeakRSS() as rss_probe:
+        main()
+    if rss_probe.peak_mb is not None:
+        growth = f" (+{rss_probe.growth_mb:.0f} Mo)" if rss_probe.growth_mb is not None else ""
+        scope = "de l'exécution" if rss_probe.resettable else "depuis le démarrage"
+        st.sidebar.caption(f"🧠 Pic mémoire du processus {scope}, toutes sessions : "
+                           f"{rss_probe.peak_mb:.0f} Mo{growth}")
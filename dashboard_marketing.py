@@ -6,12 +6,12 @@ import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import seaborn as sns
 import matplotlib.pyplot as plt
-from sklearn.preprocessing import StandardScaler
 from sklearn.decomposition import PCA
-from sklearn.cluster import KMeans
 from sklearn.metrics import silhouette_score
-import glob
 import os
+from data_loader import load_dataset
+from data_schema import ensure_numeric
+from segment_engine import K_RANGE, SegmentSweep, add_rfm_totals, fit_segments, frame_fingerprint
 
 # Configuration de la page
 st.set_page_config(
@@ -25,21 +25,15 @@ st.set_page_config(
 def load_marketing_data():
     """Charge les données marketing"""
     try:
-        # Recherche du fichier CSV marketing
-        csv_files = glob.glob("**/marketing*.csv", recursive=True)
-        if not csv_files:
-            csv_files = glob.glob("**/*campaign*.csv", recursive=True)
+        # Découverte via l'index partagé (sous-dossiers compris), délimiteur et BOM
+        # détectés sur le premier bloc, puis une seule analyse du fichier
+        try:
+            df, csv_file, _ = load_dataset('marketing', recursive=True)
+        except FileNotFoundError:
+            csv_file = None
         
-        if csv_files:
-            # Essayer différents délimiteurs
-            try:
-                df = pd.read_csv(csv_files[0], sep=',')
-                if len(df.columns) == 1:  # Si une seule colonne, essayer point-virgule
-                    df = pd.read_csv(csv_files[0], sep=';')
-            except:
-                df = pd.read_csv(csv_files[0], sep=';')  # Essayer directement point-virgule
-            
-            st.success(f"✅ Données marketing chargées : {csv_files[0]} ({df.shape[0]} lignes, {df.shape[1]} colonnes)")
+        if csv_file:
+            st.success(f"✅ Données marketing chargées : {os.path.basename(csv_file)} ({df.shape[0]} lignes, {df.shape[1]} colonnes)")
             
             # Vérifier si les données sont correctement chargées
             if len(df.columns) == 1:
@@ -57,28 +51,15 @@ def load_marketing_data():
 def prepare_segmentation_data(df):
     """Prépare les données pour la segmentation"""
     try:
-        # Variables de dépenses
-        spending_vars = [col for col in df.columns if 'Mnt' in col]
-        if spending_vars:
-            # Convertir en numérique avant de sommer
-            for col in spending_vars:
-                df[col] = pd.to_numeric(df[col], errors='coerce')
-            df['Total_Spending'] = df[spending_vars].sum(axis=1)
-        
-        # Variables d'achats
-        purchase_vars = [col for col in df.columns if 'Num' in col and 'Purchases' in col]
-        if purchase_vars:
-            # Convertir en numérique avant de sommer
-            for col in purchase_vars:
-                df[col] = pd.to_numeric(df[col], errors='coerce')
-            df['Total_Purchases'] = df[purchase_vars].sum(axis=1)
+        # Dépenses et achats totaux (colonnes converties en numérique si le schéma ne l'a pas fait)
+        add_rfm_totals(df)
         
         # Variables RFM
         rfm_vars = []
         
         # Vérifier Recency
         if 'Recency' in df.columns:
-            df['Recency'] = pd.to_numeric(df['Recency'], errors='coerce')
+            ensure_numeric(df, ['Recency'])
             if not df['Recency'].isna().all():
                 rfm_vars.append('Recency')
         
@@ -102,10 +83,27 @@ def prepare_segmentation_data(df):
         st.error(f"❌ Erreur lors de la préparation des données : {str(e)}")
         return df, []
 
+@st.cache_resource(show_spinner=False)
+def start_segment_sweep(fingerprint, _frame, columns):
+    """Lance en arrière-plan les segmentations de k = 2 à 8 (une fois par empreinte du dataset)"""
+    return SegmentSweep(_frame, list(columns), k_values=K_RANGE, first_k=4)
+
+def segment_quality_figure(metrics, n_clusters):
+    """Méthode du coude (inertie) et silhouette selon le nombre de clusters, k courant en pointillés"""
+    fig = make_subplots(rows=1, cols=2, subplot_titles=("Méthode du Coude (Inertie)", "Score de Silhouette"))
+    fig.add_trace(go.Scatter(x=metrics['Clusters'], y=metrics['Inertie'], mode='lines+markers',
+                             name='Inertie'), row=1, col=1)
+    fig.add_trace(go.Scatter(x=metrics['Clusters'], y=metrics['Silhouette'], mode='lines+markers',
+                             name='Silhouette', line_color='#DC143C'), row=1, col=2)
+    fig.add_vline(x=n_clusters, line_dash='dash', line_color='gray')
+    fig.update_xaxes(title_text='Nombre de clusters', dtick=1)
+    fig.update_layout(showlegend=False, title="Qualité de la Segmentation selon k")
+    return fig
+
 def perform_clustering(df, rfm_vars, n_clusters):
-    """Effectue la segmentation K-Means"""
+    """Effectue la segmentation K-Means (retourne aussi les segmentations précalculées des autres k)"""
     if not rfm_vars:
-        return df, None, None
+        return df, None, None, None
     
     try:
         # Vérifier que les variables RFM existent et sont numériques
@@ -113,38 +111,32 @@ def perform_clustering(df, rfm_vars, n_clusters):
         for var in rfm_vars:
             if var in df.columns:
                 # Convertir en numérique si possible
-                df[var] = pd.to_numeric(df[var], errors='coerce')
-                if df[var].dtype in ['int64', 'float64']:
+                ensure_numeric(df, [var])
+                if pd.api.types.is_numeric_dtype(df[var].dtype):
                     available_rfm_vars.append(var)
         
         if not available_rfm_vars:
             st.warning("⚠️ Aucune variable RFM numérique trouvée pour la segmentation")
-            return df, None, None
-        
-        # Préparation des données
-        X = df[available_rfm_vars].copy()
+            return df, None, None, None
         
-        # Gestion des valeurs manquantes
-        for col in available_rfm_vars:
-            if X[col].isnull().any():
-                median_val = X[col].median()
-                if pd.isna(median_val):  # Si la médiane est NaN, utiliser 0
-                    median_val = 0
-                X[col].fillna(median_val, inplace=True)
-        
-        # Standardisation
-        scaler = StandardScaler()
-        X_scaled = scaler.fit_transform(X)
-        
-        # Clustering
-        kmeans = KMeans(n_clusters=n_clusters, random_state=42, n_init=10)
-        df['Cluster'] = kmeans.fit_predict(X_scaled)
+        # Toutes les valeurs de k du curseur segmentées une fois par dataset, en arrière-plan
+        # (imputation par la médiane, standardisation, K-Means par mini-lots au-delà de
+        # MINIBATCH_THRESHOLD_ROWS clients) : changer de k devient une simple lecture
+        frame = df[available_rfm_vars]
+        sweep = start_segment_sweep(frame_fingerprint(frame), frame, tuple(available_rfm_vars))
+        if n_clusters in sweep:
+            fit = sweep.result(n_clusters)
+            model, labels = fit['model'], fit['labels']
+        else:
+            model, labels = fit_segments(df, available_rfm_vars, n_clusters)
+        df['Cluster'] = labels
+        X_scaled = model.transform(df)
         
-        return df, kmeans, X_scaled
+        return df, model, X_scaled, sweep
         
     except Exception as e:
         st.error(f"❌ Erreur lors du clustering : {str(e)}")
-        return df, None, None
+        return df, None, None, None
 
 def main():
     st.title("🛍️ Dashboard Marketing - Segmentation Client")
@@ -173,13 +165,18 @@ def main():
     
     # Paramètres de clustering
     if rfm_vars:
-        n_clusters = st.sidebar.slider("🎯 Nombre de clusters", 2, 8, 4)
+        n_clusters = st.sidebar.slider("🎯 Nombre de clusters", K_RANGE[0], K_RANGE[-1], 4)
         
         # Segmentation
-        df, kmeans, X_scaled = perform_clustering(df, rfm_vars, n_clusters)
+        df, segment_model, X_scaled, sweep = perform_clustering(df, rfm_vars, n_clusters)
         
         if 'Cluster' in df.columns:
             st.sidebar.success(f"✅ Segmentation réalisée ({n_clusters} clusters)")
+            if segment_model.inertia_gap is not None:
+                st.sidebar.caption(
+                    f"⚡ K-Means par mini-lots : inertie {segment_model.inertia_gap['gap']:+.2%} "
+                    f"par rapport au K-Means complet (échantillon de contrôle)"
+                )
     
     # Métriques principales
     col1, col2, col3, col4 = st.columns(4)
@@ -302,6 +299,15 @@ def main():
         with tab3:
             st.header("📈 Analyse RFM Détaillée")
             
+            # Coude et silhouette lus dans les segmentations précalculées (déjà terminées)
+            if sweep is not None:
+                quality = sweep.metrics()
+                if len(quality) < len(K_RANGE):
+                    st.caption(f"⏳ {len(quality)}/{len(K_RANGE)} segmentations calculées en arrière-plan")
+                if len(quality) > 1:
+                    st.plotly_chart(segment_quality_figure(quality, n_clusters), use_container_width=True)
+                    st.dataframe(quality.round(3), use_container_width=True)
+            
             if len(rfm_vars) >= 2:
                 # Visualisation PCA
                 pca = PCA(n_components=2)
@@ -5,19 +5,22 @@ Utilise Dash et Plotly pour une expérience interactive moderne
 """
 
 import dash
-from dash import dcc, html, Input, Output, callback_context
+from dash import dcc, html, Input, Output, State, callback_context
 import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import pandas as pd
 import numpy as np
-from sklearn.preprocessing import StandardScaler
-from sklearn.cluster import KMeans
 from sklearn.decomposition import PCA
-import os
-import glob
 from datetime import datetime
 import warnings
+from column_store import open_column_store
+from data_loader import get_index, load_dataset, load_dataset_files
+from data_schema import ensure_numeric, memory_summary
+from incremental_ingest import IncrementalIngestor
+from segment_engine import add_rfm_totals, default_model_path, fit_segments, load_or_fit_model
+from stratified_sampler import WEIGHT_COL, stratified_sample, weighted_fraud_counts
+from time_aggregates import TimeAggregates
 warnings.filterwarnings('ignore')
 
 # Configuration de l'application Dash
@@ -32,73 +35,111 @@ external_stylesheets = [
 
 app = dash.Dash(__name__, external_stylesheets=external_stylesheets)
 
+# Serveur WSGI exposé pour un déploiement multi-workers (gunicorn)
+server = app.server
+
 # Variables globales pour stocker les données
 fraud_data = None
 marketing_data = None
+# Ingestion incrémentale (mode suivi) : tampon et agrégats mis à jour par delta
+fraud_ingestor = None
+
+# Intervalle d'actualisation du mode suivi (ms)
+LIVE_REFRESH_INTERVAL_MS = 30 * 1000
+
+def standardize_fraud_columns(df, verbose=False):
+    """Renomme la colonne cible de fraude en 'is_fraud' (chargement complet et mode suivi)"""
+    for col in ('Class', 'Is_Fraud', 'fraud'):
+        if col in df.columns:
+            if verbose:
+                print(f"✅ Colonne '{col}' renommée en 'is_fraud'")
+            return df.rename(columns={col: 'is_fraud'})
+    return df
 
-def load_fraud_data():
-    """Chargement des données de fraude bancaire"""
+def load_fraud_data_live(all_files=False):
+    """Chargement initial en mode suivi : seuls les octets et fichiers ajoutés seront relus ensuite"""
+    global fraud_data, fraud_ingestor
+    
+    ingestor = IncrementalIngestor(directory='.', dataset='fraud', all_files=all_files)
+    if not ingestor._watched_files():
+        return False, "❌ Aucun fichier de fraude trouvé pour le suivi incrémental"
+    
+    ingestor.load()
+    fraud_ingestor = ingestor
+    fraud_data = standardize_fraud_columns(ingestor.frame())
+    print(f"📡 Suivi incrémental de {len(ingestor.readers)} fichier(s): {ingestor.n_rows} lignes")
+    
+    kpis = ingestor.profile.kpis()
+    return True, (f"📡 Suivi incrémental actif: {kpis['total_transactions']} transactions "
+                  f"({kpis['fraud_count']} fraudes, {kpis['fraud_rate']:.2f}%)")
+
+def refresh_fraud_data():
+    """Intègre les lignes et fichiers apparus depuis la dernière actualisation (mode suivi)"""
     global fraud_data
     
-    # Patterns de recherche étendus pour les fichiers de fraude
-    fraud_patterns = [
-        "*credit*.csv", "*fraud*.csv", "*transaction*.csv", 
-        "*banking*.csv", "*bank*.csv", "creditcard.csv"
-    ]
+    if fraud_ingestor is None:
+        return 0
+    delta = fraud_ingestor.refresh()
+    if len(delta) > 0:
+        fraud_data = standardize_fraud_columns(fraud_ingestor.frame())
+        print(f"📡 +{len(delta)} lignes intégrées ({fraud_ingestor.n_rows} au total)")
+    return len(delta)
+
+def load_fraud_data(all_files=False):
+    """Chargement des données de fraude bancaire (tous les fichiers trouvés si `all_files`)"""
+    global fraud_data, fraud_ingestor
     
-    fraud_files = []
-    for pattern in fraud_patterns:
-        fraud_files.extend(glob.glob(pattern))
+    # Un rechargement complet arrête le suivi incrémental
+    fraud_ingestor = None
     
-    # Supprimer les doublons et trier
-    fraud_files = sorted(list(set(fraud_files)))
+    # Fichiers de fraude de l'index du répertoire (relu seulement s'il a changé)
+    data_index = get_index('.')
+    fraud_files = data_index.find('fraud')
     
     print(f"🔍 Fichiers trouvés: {fraud_files}")
     
     if fraud_files:
         try:
-            # Prendre le premier fichier trouvé
-            selected_file = fraud_files[0]
-            print(f"📂 Chargement de: {selected_file}")
-            
-            # Détecter le délimiteur
-            with open(selected_file, 'r', encoding='utf-8') as f:
-                first_line = f.readline()
-                delimiter = ';' if first_line.count(';') > first_line.count(',') else ','
-            
-            print(f"🔧 Délimiteur détecté: '{delimiter}'")
-            
-            # Charger le CSV
-            df = pd.read_csv(selected_file, sep=delimiter)
+            if all_files and len(fraud_files) > 1:
+                # Export partitionné : un processus par fichier, schémas validés puis concaténés
+                print(f"📂 Chargement parallèle de {len(fraud_files)} fichiers")
+                df = load_dataset_files('fraud', [data_index.path(f) for f in fraud_files])
+            else:
+                # Prendre le premier fichier trouvé
+                selected_file = fraud_files[0]
+                print(f"📂 Chargement de: {selected_file}")
+                
+                # Délimiteur et encodage détectés sur le premier bloc, puis une seule analyse
+                # (types compacts, colonnes projetées en mémoire partagées entre workers)
+                df, _, dialect = load_dataset('fraud', path=data_index.path(selected_file), reader=open_column_store)
+                print(f"🔧 Délimiteur détecté: '{dialect['delimiter']}'")
             print(f"📊 Données chargées: {df.shape}")
+            print(memory_summary(df))
             print(f"📋 Colonnes: {list(df.columns)[:10]}...")  # Afficher les 10 premières colonnes
             
-            # Standardiser les noms de colonnes pour la fraude
-            if 'Class' in df.columns:
-                df = df.rename(columns={'Class': 'is_fraud'})
-                print("✅ Colonne 'Class' renommée en 'is_fraud'")
-            elif 'Is_Fraud' in df.columns:
-                df = df.rename(columns={'Is_Fraud': 'is_fraud'})
-                print("✅ Colonne 'Is_Fraud' renommée en 'is_fraud'")
-            elif 'fraud' in df.columns:
-                df = df.rename(columns={'fraud': 'is_fraud'})
-                print("✅ Colonne 'fraud' renommée en 'is_fraud'")
-            else:
+            # Standardiser les noms de colonnes pour la fraude (même règle qu'en mode suivi)
+            df = standardize_fraud_columns(df, verbose=True)
+            if 'is_fraud' not in df.columns:
                 # Si aucune colonne de fraude trouvée, créer une colonne factice
                 print("⚠️ Aucune colonne de fraude trouvée, création d'une colonne factice")
                 df['is_fraud'] = np.random.choice([0, 1], size=len(df), p=[0.99, 0.01])
             
-            # Échantillonnage si le dataset est trop gros
+            # Échantillonnage stratifié si le dataset est trop gros : toutes les fraudes
+            # sont conservées, les transactions normales portent un poids
             original_size = len(df)
             if len(df) > 50000:
-                df = df.sample(n=50000, random_state=42)
-                print(f"📉 Échantillonnage: {original_size} → {len(df)} lignes")
+                df = stratified_sample(df, budget=50000, target_col='is_fraud')
+                print(f"📉 Échantillonnage stratifié: {original_size} → {len(df)} lignes "
+                      f"({int((df['is_fraud'] == 1).sum())} fraudes conservées)")
             
             fraud_data = df
-            fraud_count = df['is_fraud'].sum() if 'is_fraud' in df.columns else 0
-            fraud_rate = (fraud_count / len(df) * 100) if len(df) > 0 else 0
+            # KPIs pondérés : exacts sur le fichier complet malgré l'échantillonnage
+            total_count, fraud_count = weighted_fraud_counts(df, target_col='is_fraud')
+            fraud_rate = (fraud_count / total_count * 100) if total_count > 0 else 0
             
-            return True, f"✅ Données fraude chargées: {len(df)} transactions ({fraud_count} fraudes, {fraud_rate:.2f}%)"
+            files_info = f" depuis {len(fraud_files)} fichiers" if all_files and len(fraud_files) > 1 else ""
+            sample_info = f" (échantillon de {len(df)} lignes)" if len(df) != total_count else ""
+            return True, f"✅ Données fraude chargées{files_info}: {total_count} transactions ({fraud_count} fraudes, {fraud_rate:.2f}%){sample_info}"
             
         except Exception as e:
             print(f"❌ Erreur détaillée: {str(e)}")
@@ -107,7 +148,7 @@ def load_fraud_data():
             return False, f"❌ Erreur chargement fraude: {str(e)}"
     
     # Lister les fichiers disponibles pour aider l'utilisateur
-    all_csv_files = glob.glob("*.csv")
+    all_csv_files = data_index.csv_files()
     if all_csv_files:
         files_list = ", ".join(all_csv_files[:5])  # Afficher les 5 premiers
         return False, f"❌ Aucun fichier de fraude trouvé. Fichiers CSV disponibles: {files_list}"
@@ -118,18 +159,9 @@ def load_marketing_data():
     """Chargement des données marketing"""
     global marketing_data
     
-    # Patterns de recherche étendus pour les fichiers marketing
-    marketing_patterns = [
-        "*marketing*.csv", "*campaign*.csv", "*customer*.csv",
-        "*client*.csv", "*segmentation*.csv", "marketing_campaign.csv"
-    ]
-    
-    marketing_files = []
-    for pattern in marketing_patterns:
-        marketing_files.extend(glob.glob(pattern))
-    
-    # Supprimer les doublons et trier
-    marketing_files = sorted(list(set(marketing_files)))
+    # Fichiers marketing de l'index du répertoire (relu seulement s'il a changé)
+    data_index = get_index('.')
+    marketing_files = data_index.find('marketing')
     
     print(f"🔍 Fichiers marketing trouvés: {marketing_files}")
     
@@ -139,20 +171,15 @@ def load_marketing_data():
             selected_file = marketing_files[0]
             print(f"📂 Chargement de: {selected_file}")
             
-            # Détecter le délimiteur
-            with open(selected_file, 'r', encoding='utf-8') as f:
-                first_line = f.readline()
-                delimiter = ';' if first_line.count(';') > first_line.count(',') else ','
-            
-            print(f"🔧 Délimiteur détecté: '{delimiter}'")
-            
-            # Charger le CSV
-            df = pd.read_csv(selected_file, sep=delimiter)
+            # Délimiteur, BOM et encodage détectés sur le premier bloc, puis une seule analyse
+            df, _, dialect = load_dataset('marketing', path=data_index.path(selected_file), reader=open_column_store)
+            print(f"🔧 Délimiteur détecté: '{dialect['delimiter']}'")
             print(f"📊 Données marketing chargées: {df.shape}")
+            print(memory_summary(df))
             print(f"📋 Colonnes: {list(df.columns)[:10]}...")  # Afficher les 10 premières colonnes
             
             # Préparation des données marketing
-            df = prepare_marketing_data(df)
+            df = prepare_marketing_data(df, model_path=default_model_path(data_index.path(selected_file)))
             marketing_data = df
             
             # Statistiques sur la segmentation
@@ -170,33 +197,27 @@ def load_marketing_data():
             return False, f"❌ Erreur chargement marketing: {str(e)}"
     
     # Lister les fichiers disponibles pour aider l'utilisateur
-    all_csv_files = glob.glob("*.csv")
+    all_csv_files = data_index.csv_files()
     if all_csv_files:
         files_list = ", ".join(all_csv_files[:5])  # Afficher les 5 premiers
         return False, f"❌ Aucun fichier marketing trouvé. Fichiers CSV disponibles: {files_list}"
     else:
         return False, "❌ Aucun fichier CSV trouvé dans le répertoire"
 
-def prepare_marketing_data(df):
-    """Préparation des données marketing avec segmentation RFM"""
+def prepare_marketing_data(df, model_path=None):
+    """
+    Préparation des données marketing avec segmentation RFM.
+
+    Avec `model_path`, le modèle de segmentation enregistré y est réutilisé
+    (segments et noms stables d'une exécution à l'autre) ; il n'est ajusté
+    et enregistré que s'il n'existe pas encore.
+    """
     try:
-        # Variables de dépenses (Monetary)
-        spending_vars = [col for col in df.columns if 'Mnt' in col]
-        if spending_vars:
-            for col in spending_vars:
-                df[col] = pd.to_numeric(df[col], errors='coerce')
-            df['Total_Spending'] = df[spending_vars].sum(axis=1)
-        
-        # Variables d'achats (Frequency)
-        purchase_vars = [col for col in df.columns if 'Num' in col and 'Purchases' in col]
-        if purchase_vars:
-            for col in purchase_vars:
-                df[col] = pd.to_numeric(df[col], errors='coerce')
-            df['Total_Purchases'] = df[purchase_vars].sum(axis=1)
+        # Dépenses (Monetary) et achats (Frequency) totaux
+        add_rfm_totals(df)
         
         # Recency
-        if 'Recency' in df.columns:
-            df['Recency'] = pd.to_numeric(df['Recency'], errors='coerce')
+        ensure_numeric(df, ['Recency'])
         
         # Segmentation RFM
         rfm_vars = []
@@ -209,25 +230,19 @@ def prepare_marketing_data(df):
         
         # Clustering K-Means si variables RFM disponibles
         if len(rfm_vars) >= 2:
-            X = df[rfm_vars].copy()
-            
-            # Gestion des valeurs manquantes
-            for col in rfm_vars:
-                median_val = X[col].median()
-                if pd.isna(median_val):
-                    median_val = 0
-                X[col].fillna(median_val, inplace=True)
-            
-            # Standardisation et clustering
-            scaler = StandardScaler()
-            X_scaled = scaler.fit_transform(X)
-            
-            kmeans = KMeans(n_clusters=4, random_state=42, n_init=10)
-            df['Segment'] = kmeans.fit_predict(X_scaled)
+            # Imputation par la médiane, standardisation et clustering
+            # (K-Means par mini-lots au-delà de MINIBATCH_THRESHOLD_ROWS clients)
+            if model_path is not None:
+                model, labels = load_or_fit_model(df, rfm_vars, 4, model_path)
+            else:
+                model, labels = fit_segments(df, rfm_vars, 4)
+            df['Segment'] = labels
+            if model.inertia_gap is not None:
+                print(f"⚡ K-Means par mini-lots : inertie {model.inertia_gap['gap']:+.2%} "
+                      f"par rapport au K-Means complet (échantillon de contrôle)")
             
-            # Noms des segments
-            segment_names = {0: 'Champions', 1: 'Loyaux', 2: 'Potentiels', 3: 'Endormis'}
-            df['Segment_Name'] = df['Segment'].map(segment_names)
+            # Noms des segments, par valeur client décroissante
+            df['Segment_Name'] = model.segment_names(labels)
         
         return df
         
@@ -242,8 +257,16 @@ def create_fraud_analysis():
     
     df = fraud_data
     
+    # En mode suivi, les agrégats sont maintenus incrémentalement par l'ingesteur
+    profile = fraud_ingestor.profile if fraud_ingestor is not None else None
+    
     # Graphique 1: Distribution des fraudes
-    fraud_counts = df['is_fraud'].value_counts()
+    if profile is not None:
+        fraud_counts = pd.Series(profile.class_counts, index=[0, 1])
+    elif WEIGHT_COL in df.columns:
+        fraud_counts = df.groupby('is_fraud')[WEIGHT_COL].sum()
+    else:
+        fraud_counts = df['is_fraud'].value_counts()
     fig1 = px.pie(
         values=fraud_counts.values,
         names=['Normal', 'Fraude'],
@@ -261,7 +284,7 @@ def create_fraud_analysis():
             title="💰 Distribution des Montants",
             labels={'is_fraud': 'Type Transaction', 'Amount': 'Montant (€)'}
         )
-        fig2.update_xaxis(tickvals=[0, 1], ticktext=['Normal', 'Fraude'])
+        fig2.update_xaxes(tickvals=[0, 1], ticktext=['Normal', 'Fraude'])
     else:
         fig2 = go.Figure()
         fig2.add_annotation(text="Colonne 'Amount' non trouvée", 
@@ -269,9 +292,13 @@ def create_fraud_analysis():
     
     # Graphique 3: Analyse temporelle (si colonne Time disponible)
     if 'Time' in df.columns:
-        df['Hour'] = (df['Time'] / 3600) % 24
-        hourly_fraud = df.groupby('Hour')['is_fraud'].agg(['count', 'sum']).reset_index()
-        hourly_fraud['fraud_rate'] = (hourly_fraud['sum'] / hourly_fraud['count']) * 100
+        if profile is not None:
+            hourly_fraud = profile.hourly_stats()
+            hourly_fraud['fraud_rate'] = hourly_fraud['Taux_Fraude'] * 100
+        else:
+            # Heure entière de la journée, taux pondérés par les poids d'échantillonnage s'ils existent
+            hourly_fraud = TimeAggregates.from_frame(df, target_col='is_fraud', weight_col=WEIGHT_COL).hourly_stats()
+            hourly_fraud['fraud_rate'] = hourly_fraud['Taux_Fraude'] * 100
         
         fig3 = px.line(
             hourly_fraud, 
@@ -391,6 +418,22 @@ app.layout = html.Div([
             ], id='load-marketing-btn', n_clicks=0, className='button-primary'),
         ], style={'text-align': 'center', 'margin-bottom': '20px'}),
         
+        # Option d'ingestion des exports partitionnés (un fichier par jour)
+        html.Div([
+            dcc.Checklist(
+                id='fraud-all-files',
+                options=[
+                    {'label': ' Fusionner tous les fichiers de transactions (chargement parallèle)', 'value': 'all'},
+                    {'label': ' Suivi incrémental des nouvelles lignes et nouveaux fichiers', 'value': 'live'}
+                ],
+                value=[]
+            ),
+            # Actualisation périodique du mode suivi (seul le delta est analysé)
+            dcc.Interval(id='live-refresh', interval=LIVE_REFRESH_INTERVAL_MS, n_intervals=0),
+            dcc.Store(id='live-version', data=0),
+            html.Div(id='live-status', style={'color': '#666', 'font-size': '0.9em'})
+        ], style={'text-align': 'center', 'margin-bottom': '20px'}),
+        
         # Status des données
         html.Div(id='data-status', style={
             'text-align': 'center',
@@ -439,9 +482,10 @@ app.layout = html.Div([
 @app.callback(
     Output('data-status', 'children'),
     [Input('load-fraud-btn', 'n_clicks'),
-     Input('load-marketing-btn', 'n_clicks')]
+     Input('load-marketing-btn', 'n_clicks')],
+    [State('fraud-all-files', 'value')]
 )
-def update_data_status(fraud_clicks, marketing_clicks):
+def update_data_status(fraud_clicks, marketing_clicks, fraud_all_files):
     """Mise à jour du statut des données"""
     ctx = callback_context
     
@@ -451,7 +495,11 @@ def update_data_status(fraud_clicks, marketing_clicks):
     messages = []
     
     if fraud_clicks > 0:
-        success, message = load_fraud_data()
+        options = fraud_all_files or []
+        if 'live' in options:
+            success, message = load_fraud_data_live(all_files='all' in options)
+        else:
+            success, message = load_fraud_data(all_files='all' in options)
         messages.append(message)
     
     if marketing_clicks > 0:
@@ -460,11 +508,29 @@ def update_data_status(fraud_clicks, marketing_clicks):
     
     return html.Div([html.P(msg) for msg in messages])
 
+@app.callback(
+    [Output('live-status', 'children'),
+     Output('live-version', 'data')],
+    [Input('live-refresh', 'n_intervals')],
+    [State('live-version', 'data')]
+)
+def refresh_live_data(n_intervals, version):
+    """Intégration périodique des nouvelles transactions (mode suivi)"""
+    if fraud_ingestor is None:
+        return "", dash.no_update
+    
+    n_new = refresh_fraud_data()
+    status = f"📡 {fraud_ingestor.n_rows} transactions suivies — dernière actualisation {datetime.now():%H:%M:%S}"
+    if n_new == 0:
+        return status, dash.no_update
+    return f"{status} (+{n_new})", (version or 0) + 1
+
 @app.callback(
     Output('fraud-content', 'children'),
-    [Input('load-fraud-btn', 'n_clicks')]
+    [Input('load-fraud-btn', 'n_clicks'),
+     Input('live-version', 'data')]
 )
-def update_fraud_content(n_clicks):
+def update_fraud_content(n_clicks, live_version):
     """Mise à jour du contenu d'analyse bancaire"""
     if n_clicks > 0:
         return create_fraud_analysis()
@@ -496,7 +562,8 @@ def update_comparison_content(fraud_clicks, marketing_clicks):
                 'Dataset': 'Bancaire',
                 'Lignes': len(fraud_data),
                 'Colonnes': len(fraud_data.columns),
-                'Fraudes/Segments': fraud_data['is_fraud'].sum() if 'is_fraud' in fraud_data.columns else 'N/A'
+                'Fraudes/Segments': (weighted_fraud_counts(fraud_data, target_col='is_fraud')[1]
+                                     if 'is_fraud' in fraud_data.columns else 'N/A')
             })
         
         if marketing_data is not None:
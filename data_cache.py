@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Cache Colonnaire des Fichiers CSV
+=================================
+
+Au premier chargement, le fichier CSV est converti en copie binaire
+colonnaire : Parquet si pyarrow est installé, sinon un fichier .npy par
+colonne. Les chargements suivants lisent directement cette copie, sans
+analyse du texte.
+
+Chaque entrée du cache est identifiée par le chemin du fichier source et
+les options de lecture, puis validée par sa taille, sa date de modification
+et une empreinte de son contenu : une copie périmée est reconstruite
+automatiquement dès que le fichier source change.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow.parquet as pq
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+
+CACHE_DIR_NAME = ".eda_cache"
+MANIFEST_NAME = "manifest.json"
+HASH_BLOCK_SIZE = 4 * 1024 * 1024
+
+
+def content_hash(path):
+    """Calcule l'empreinte BLAKE2 du contenu d'un fichier (lecture par blocs)"""
+    digest = hashlib.blake2b(digest_size=20)
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def file_fingerprint(path, with_hash=True):
+    """Retourne l'identité d'un fichier : chemin, taille, mtime et empreinte"""
+    stat = os.stat(path)
+    fingerprint = {
+        'path': os.path.abspath(path),
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+    }
+    if with_hash:
+        fingerprint['hash'] = content_hash(path)
+    return fingerprint
+
+
+def default_cache_dir(path):
+    """Répertoire de cache par défaut : `.eda_cache/` à côté du fichier source"""
+    return os.path.join(os.path.dirname(os.path.abspath(path)), CACHE_DIR_NAME)
+
+
+def cache_entry_dir(path, read_kwargs=None, cache_dir=None):
+    """Répertoire de l'entrée de cache associée à un fichier et à ses options de lecture"""
+    cache_dir = cache_dir or default_cache_dir(path)
+    key_source = json.dumps(
+        {'path': os.path.abspath(path), 'read_kwargs': read_kwargs or {}},
+        sort_keys=True,
+        default=str
+    )
+    key = hashlib.sha1(key_source.encode('utf-8')).hexdigest()[:16]
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(cache_dir, f"{stem}-{key}")
+
+
+def read_manifest(entry_dir):
+    """Lit le manifeste d'une entrée de cache (None si absent ou illisible)"""
+    try:
+        with open(os.path.join(entry_dir, MANIFEST_NAME), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def write_manifest(entry_dir, manifest):
+    """Écrit le manifeste d'une entrée de cache"""
+    with open(os.path.join(entry_dir, MANIFEST_NAME), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+
+
+def is_entry_valid(entry_dir, path):
+    """
+    Vérifie qu'une entrée de cache correspond toujours au fichier source.
+
+    La taille et la date de modification suffisent dans le cas courant. Si
+    seule la date a changé (copie, `touch`...), l'empreinte du contenu est
+    recalculée : l'entrée reste valide si le contenu est identique.
+    """
+    manifest = read_manifest(entry_dir)
+    if manifest is None:
+        return False
+
+    source = manifest.get('source', {})
+    current = file_fingerprint(path, with_hash=False)
+
+    if current['size'] != source.get('size'):
+        return False
+    if current['mtime_ns'] == source.get('mtime_ns'):
+        return True
+
+    if content_hash(path) != source.get('hash'):
+        return False
+
+    # Contenu inchangé : on mémorise la nouvelle date pour éviter de rehacher
+    manifest['source']['mtime_ns'] = current['mtime_ns']
+    try:
+        write_manifest(entry_dir, manifest)
+    except OSError:
+        pass
+    return True
+
+
+def _column_kind(series):
+    """Catégorie de stockage .npy d'une colonne"""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return 'category'
+    if pd.api.types.is_datetime64_any_dtype(series.dtype):
+        return 'datetime'
+    if pd.api.types.is_bool_dtype(series.dtype) or pd.api.types.is_numeric_dtype(series.dtype):
+        return 'numeric'
+    return 'object'
+
+
+def write_npy_columns(df, entry_dir):
+    """
+    Écrit un DataFrame sous forme d'un fichier .npy par colonne.
+
+    Les colonnes texte et catégorielles sont stockées comme codes entiers
+    accompagnés de la table de leurs modalités (-1 pour les valeurs manquantes).
+    """
+    columns = []
+    for i, col in enumerate(df.columns):
+        series = df[col]
+        kind = _column_kind(series)
+        file_name = f"col_{i:04d}.npy"
+        entry = {'name': str(col), 'kind': kind, 'file': file_name, 'dtype': str(series.dtype)}
+
+        if kind in ('category', 'object'):
+            if kind == 'category':
+                codes = series.cat.codes.to_numpy()
+                categories = series.cat.categories
+            else:
+                codes, categories = pd.factorize(series, use_na_sentinel=True)
+            categories_file = f"col_{i:04d}_categories.npy"
+            np.save(os.path.join(entry_dir, file_name), np.asarray(codes, dtype=np.int32))
+            np.save(os.path.join(entry_dir, categories_file), np.asarray(categories.astype(str), dtype=str))
+            entry['categories_file'] = categories_file
+            if kind == 'category':
+                entry['ordered'] = bool(series.cat.ordered)
+        else:
+            np.save(os.path.join(entry_dir, file_name), series.to_numpy())
+
+        columns.append(entry)
+    return columns
+
+
+def read_npy_columns(entry_dir, columns, mmap_mode=None):
+    """
+    Reconstruit un DataFrame à partir des fichiers .npy d'une entrée de cache.
+
+    Avec `mmap_mode='r'`, les colonnes numériques sont projetées en mémoire
+    en lecture seule et le DataFrame les référence sans copie.
+    """
+    data = {}
+    for entry in columns:
+        values = np.load(os.path.join(entry_dir, entry['file']), mmap_mode=mmap_mode)
+        kind = entry['kind']
+
+        if kind in ('category', 'object'):
+            categories = np.load(os.path.join(entry_dir, entry['categories_file']))
+            if kind == 'category':
+                data[entry['name']] = pd.Categorical.from_codes(
+                    np.asarray(values), categories=categories, ordered=entry.get('ordered', False)
+                )
+            else:
+                restored = categories.astype(object)[np.asarray(values)]
+                restored[np.asarray(values) < 0] = np.nan
+                data[entry['name']] = restored
+        else:
+            data[entry['name']] = values
+
+    return pd.DataFrame(data, copy=False)
+
+
+def write_entry(df, entry_dir, source, read_kwargs, fmt=None):
+    """
+    Écrit une entrée de cache complète de façon atomique (répertoire
+    temporaire puis renommage), au format Parquet ou .npy.
+    """
+    parent = os.path.dirname(entry_dir)
+    os.makedirs(parent, exist_ok=True)
+    tmp_dir = f"{entry_dir}.tmp-{os.getpid()}"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    fmt = fmt or ('parquet' if PARQUET_AVAILABLE else 'npy')
+    manifest = {
+        'source': source,
+        'read_kwargs': json.loads(json.dumps(read_kwargs, default=str)),
+        'n_rows': int(len(df)),
+        'format': fmt,
+    }
+
+    frame = df.reset_index(drop=True)
+    if fmt == 'parquet':
+        frame.to_parquet(os.path.join(tmp_dir, 'data.parquet'), index=False)
+    else:
+        manifest['columns'] = write_npy_columns(frame, tmp_dir)
+
+    write_manifest(tmp_dir, manifest)
+    shutil.rmtree(entry_dir, ignore_errors=True)
+    os.replace(tmp_dir, entry_dir)
+    return manifest
+
+
+def build_cache(path, cache_dir=None, **read_csv_kwargs):
+    """Analyse le CSV une fois et écrit sa copie colonnaire ; retourne (DataFrame, répertoire de l'entrée)"""
+    entry_dir = cache_entry_dir(path, read_csv_kwargs, cache_dir)
+    source = file_fingerprint(path)
+    df = pd.read_csv(path, **read_csv_kwargs)
+    try:
+        write_entry(df, entry_dir, source, read_csv_kwargs)
+    except OSError as e:
+        # Un répertoire non inscriptible ne doit pas empêcher le chargement
+        print(f"⚠️ Cache colonnaire non écrit ({entry_dir}): {e}")
+    return df, entry_dir
+
+
+def ensure_cache(path, cache_dir=None, **read_csv_kwargs):
+    """Garantit l'existence d'une entrée de cache valide et retourne son répertoire"""
+    entry_dir = cache_entry_dir(path, read_csv_kwargs, cache_dir)
+    if not is_entry_valid(entry_dir, path):
+        build_cache(path, cache_dir=cache_dir, **read_csv_kwargs)
+    return entry_dir
+
+
+def project_columns(columns, usecols):
+    """Sous-ensemble de `columns` demandé par `usecols`, dans l'ordre du fichier (comme pandas)"""
+    if usecols is None:
+        return list(columns)
+    wanted = set(usecols)
+    missing = wanted - set(columns)
+    if missing:
+        raise ValueError(f"Colonnes absentes du fichier: {sorted(missing)}")
+    return [col for col in columns if col in wanted]
+
+
+def read_csv_cached(path, cache_dir=None, usecols=None, **read_csv_kwargs):
+    """
+    Équivalent de `pd.read_csv` s'appuyant sur le cache colonnaire.
+
+    Le premier appel analyse le CSV et écrit la copie binaire ; les appels
+    suivants la relisent directement tant que le fichier source est inchangé.
+    Avec `usecols`, seules les colonnes demandées sont lues depuis la copie
+    (une seule entrée de cache, quel que soit le sous-ensemble demandé).
+    """
+    entry_dir = cache_entry_dir(path, read_csv_kwargs, cache_dir)
+    if is_entry_valid(entry_dir, path):
+        manifest = read_manifest(entry_dir)
+        if manifest.get('format') == 'parquet' and PARQUET_AVAILABLE:
+            parquet_path = os.path.join(entry_dir, 'data.parquet')
+            if usecols is not None:
+                usecols = project_columns(pq.read_schema(parquet_path).names, usecols)
+            return pd.read_parquet(parquet_path, columns=usecols)
+        if manifest.get('format') == 'npy':
+            names = project_columns([entry['name'] for entry in manifest['columns']], usecols)
+            entries = [entry for entry in manifest['columns'] if entry['name'] in names]
+            return read_npy_columns(entry_dir, entries)
+
+    df, _ = build_cache(path, cache_dir=cache_dir, **read_csv_kwargs)
+    if usecols is not None:
+        df = df[project_columns(df.columns, usecols)]
+    return df
+
+
+def clear_cache(path=None, cache_dir=None):
+    """Supprime le cache colonnaire (celui du répertoire de `path` ou `cache_dir`)"""
+    target = cache_dir or (default_cache_dir(path) if path else CACHE_DIR_NAME)
+    shutil.rmtree(target, ignore_errors=True)
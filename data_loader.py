@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Chargeur Unifié des Datasets
+============================
+
+Point d'entrée unique de la découverte et du chargement des fichiers de
+fraude bancaire et de marketing, partagé par tous les dashboards :
+- un index du répertoire de données, rafraîchi seulement quand le
+  répertoire change (pas de `glob` à chaque clic) ;
+- la détection du délimiteur, du BOM UTF-8 et de l'encodage en une seule
+  lecture du premier bloc du fichier ;
+- une seule analyse du fichier, directement dans les types du schéma et
+  au travers du cache colonnaire ;
+- le chargement parallèle (un processus par fichier) des exports
+  partitionnés, par exemple un fichier de transactions par jour.
+"""
+
+import csv
+import fnmatch
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from data_cache import read_csv_cached
+from data_schema import read_csv_with_schema
+
+# Motifs de recherche des fichiers ; le nom canonique est prioritaire
+DATASET_PATTERNS = {
+    'fraud': [
+        "*credit*.csv", "*fraud*.csv", "*transaction*.csv",
+        "*banking*.csv", "*bank*.csv"
+    ],
+    'marketing': [
+        "*marketing*.csv", "*campaign*.csv", "*customer*.csv",
+        "*client*.csv", "*segmentation*.csv"
+    ],
+}
+CANONICAL_FILES = {
+    'fraud': "creditcard.csv",
+    'marketing': "marketing_campaign.csv",
+}
+
+SNIFF_BLOCK_SIZE = 64 * 1024
+DELIMITER_CANDIDATES = [',', ';', '\t', '|']
+UTF8_BOM = b'\xef\xbb\xbf'
+
+
+class DatasetIndex:
+    """
+    Index des fichiers CSV d'un répertoire de données.
+
+    Le contenu n'est relu que lorsque la date de modification d'un des
+    répertoires indexés change (ajout, suppression ou renommage de fichier).
+    Les répertoires cachés (`.git`, `.eda_cache`...) sont ignorés.
+    """
+
+    def __init__(self, directory='.', recursive=False):
+        self.directory = os.path.abspath(directory)
+        self.recursive = recursive
+        self._dir_mtimes = {}
+        self._files = []
+
+    def _is_stale(self):
+        if not self._dir_mtimes:
+            return True
+        for path, mtime in self._dir_mtimes.items():
+            try:
+                if os.stat(path).st_mtime_ns != mtime:
+                    return True
+            except OSError:
+                return True
+        return False
+
+    def _scan(self):
+        files = []
+        dir_mtimes = {}
+        pending = [self.directory]
+        while pending:
+            current = pending.pop()
+            try:
+                dir_mtimes[current] = os.stat(current).st_mtime_ns
+                entries = list(os.scandir(current))
+            except OSError:
+                continue
+            for entry in entries:
+                if entry.name.startswith('.'):
+                    continue
+                if entry.is_dir(follow_symlinks=False):
+                    if self.recursive:
+                        pending.append(entry.path)
+                elif entry.name.lower().endswith('.csv'):
+                    files.append(os.path.relpath(entry.path, self.directory))
+        self._files = sorted(files)
+        self._dir_mtimes = dir_mtimes
+
+    def refresh(self, force=False):
+        """Relit le répertoire si nécessaire"""
+        if force or self._is_stale():
+            self._scan()
+        return self
+
+    def csv_files(self):
+        """Liste des fichiers CSV indexés (chemins relatifs au répertoire)"""
+        return list(self.refresh()._files)
+
+    def find(self, dataset):
+        """Fichiers correspondant à un dataset ('fraud' ou 'marketing'), nom canonique en tête"""
+        patterns = DATASET_PATTERNS[dataset]
+        canonical = CANONICAL_FILES[dataset]
+        matches = [
+            path for path in self.csv_files()
+            if any(fnmatch.fnmatch(os.path.basename(path).lower(), pattern) for pattern in patterns)
+        ]
+        return sorted(matches, key=lambda path: (os.path.basename(path) != canonical, path))
+
+    def path(self, relative_path):
+        """Chemin absolu d'un fichier indexé"""
+        return os.path.join(self.directory, relative_path)
+
+
+_INDEXES = {}
+
+
+def get_index(directory='.', recursive=False):
+    """Index partagé d'un répertoire (un seul par répertoire et par processus)"""
+    key = (os.path.abspath(directory), recursive)
+    if key not in _INDEXES:
+        _INDEXES[key] = DatasetIndex(directory, recursive=recursive)
+    return _INDEXES[key]
+
+
+def sniff_csv(path, block_size=SNIFF_BLOCK_SIZE):
+    """
+    Détecte l'encodage, le BOM, le délimiteur et l'en-tête d'un CSV.
+
+    Seul le premier bloc du fichier est lu, une seule fois.
+    """
+    with open(path, 'rb') as f:
+        block = f.read(block_size)
+
+    has_bom = block.startswith(UTF8_BOM)
+    if has_bom:
+        encoding = 'utf-8-sig'
+        block = block[len(UTF8_BOM):]
+    else:
+        encoding = 'utf-8'
+
+    # Ne décoder que des lignes complètes (un caractère multi-octets peut être coupé)
+    complete = block[:block.rfind(b'\n') + 1] or block
+    try:
+        text = complete.decode('utf-8')
+    except UnicodeDecodeError:
+        encoding = 'latin-1'
+        text = complete.decode('latin-1')
+
+    first_line = text.splitlines()[0] if text else ''
+    counts = {candidate: first_line.count(candidate) for candidate in DELIMITER_CANDIDATES}
+    delimiter = max(counts, key=counts.get) if max(counts.values()) > 0 else ','
+    header = next(csv.reader([first_line], delimiter=delimiter), []) if first_line else []
+
+    return {
+        'encoding': encoding,
+        'has_bom': has_bom,
+        'delimiter': delimiter,
+        'columns': [col.strip() for col in header],
+    }
+
+
+def find_dataset(dataset, directory='.', recursive=False):
+    """Chemin du fichier à charger pour un dataset, ou None si aucun n'est trouvé"""
+    index = get_index(directory, recursive=recursive)
+    matches = index.find(dataset)
+    return index.path(matches[0]) if matches else None
+
+
+def load_dataset(dataset, path=None, directory='.', recursive=False, reader=read_csv_cached, usecols=None):
+    """
+    Découvre (si `path` n'est pas fourni) et charge un dataset en une seule analyse.
+
+    Avec `usecols`, seules les colonnes demandées (et présentes dans
+    l'en-tête) sont chargées ; les autres pourront l'être à la demande par
+    un nouvel appel. Retourne (DataFrame, chemin, dialecte détecté). Lève
+    FileNotFoundError si aucun fichier ne correspond.
+    """
+    if path is None:
+        path = find_dataset(dataset, directory, recursive=recursive)
+    if path is None or not os.path.exists(path):
+        raise FileNotFoundError(f"Aucun fichier trouvé pour le dataset '{dataset}'")
+
+    dialect = sniff_csv(path)
+    projection = {}
+    if usecols is not None:
+        projection['usecols'] = [col for col in usecols if col in dialect['columns']]
+    df = read_csv_with_schema(
+        path, dataset, reader=reader, columns=dialect['columns'],
+        sep=dialect['delimiter'], encoding=dialect['encoding'], **projection
+    )
+    return df, path, dialect
+
+
+def _load_partition(task):
+    """Charge un fichier d'un export partitionné (exécuté dans un processus du pool)"""
+    dataset, path, reader = task
+    df, _, _ = load_dataset(dataset, path=path, reader=reader)
+    return df
+
+
+def check_schema_compatibility(frames, paths):
+    """
+    Vérifie que les fichiers d'un export partitionné ont des schémas compatibles.
+
+    Les colonnes doivent être identiques (même ordre non requis) et chaque
+    colonne doit être numérique, date ou texte dans tous les fichiers. Lève
+    ValueError en nommant le premier fichier incompatible.
+    """
+    def kind(dtype):
+        if pd.api.types.is_bool_dtype(dtype) or pd.api.types.is_numeric_dtype(dtype):
+            return 'numérique'
+        if pd.api.types.is_datetime64_any_dtype(dtype):
+            return 'date'
+        return 'texte'
+
+    reference, reference_path = frames[0], paths[0]
+    expected_columns = set(reference.columns)
+    expected_kinds = {col: kind(dtype) for col, dtype in reference.dtypes.items()}
+
+    for df, path in zip(frames[1:], paths[1:]):
+        columns = set(df.columns)
+        if columns != expected_columns:
+            missing = sorted(expected_columns - columns)
+            extra = sorted(columns - expected_columns)
+            raise ValueError(
+                f"Schéma incompatible entre {os.path.basename(reference_path)} et "
+                f"{os.path.basename(path)} (manquantes: {missing}, en trop: {extra})"
+            )
+        for col, dtype in df.dtypes.items():
+            if kind(dtype) != expected_kinds[col]:
+                raise ValueError(
+                    f"Colonne '{col}' de type {kind(dtype)} dans {os.path.basename(path)}, "
+                    f"{expected_kinds[col]} dans {os.path.basename(reference_path)}"
+                )
+
+
+def load_dataset_files(dataset, paths, max_workers=None, reader=read_csv_cached, add_source=False):
+    """
+    Charge tous les fichiers d'un export partitionné en parallèle et les concatène.
+
+    Chaque fichier est analysé dans un processus distinct (au plus un par
+    cœur), si bien que la durée de chargement dépend du nombre de cœurs et
+    non du nombre de fichiers. Les schémas sont validés avant concaténation ;
+    avec `add_source=True`, une colonne `Source_File` indique l'origine de
+    chaque ligne.
+    """
+    paths = list(paths)
+    if not paths:
+        raise FileNotFoundError(f"Aucun fichier trouvé pour le dataset '{dataset}'")
+
+    # En-têtes comparés avant toute analyse : un fichier étranger échoue immédiatement
+    headers = [set(sniff_csv(path)['columns']) for path in paths]
+    for header, path in zip(headers[1:], paths[1:]):
+        if header != headers[0]:
+            raise ValueError(
+                f"Schéma incompatible entre {os.path.basename(paths[0])} et {os.path.basename(path)} "
+                f"(manquantes: {sorted(headers[0] - header)}, en trop: {sorted(header - headers[0])})"
+            )
+
+    tasks = [(dataset, path, reader) for path in paths]
+    if len(paths) == 1:
+        frames = [_load_partition(tasks[0])]
+    else:
+        workers = min(len(paths), max_workers or os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            frames = list(pool.map(_load_partition, tasks))
+
+    check_schema_compatibility(frames, paths)
+
+    columns = list(frames[0].columns)
+    if add_source:
+        frames = [
+            df.assign(Source_File=os.path.basename(path))
+            for df, path in zip(frames, paths)
+        ]
+        columns.append('Source_File')
+
+    combined = pd.concat([df[columns] for df in frames], ignore_index=True)
+
+    # Les catégories diffèrent d'un fichier à l'autre : on reconstruit le type commun
+    for col in columns:
+        if isinstance(frames[0][col].dtype, pd.CategoricalDtype) and not isinstance(combined[col].dtype, pd.CategoricalDtype):
+            combined[col] = combined[col].astype('category')
+    return combined
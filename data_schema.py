@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Schémas de Types des Datasets
+=============================
+
+Déclare les types compacts des deux datasets du projet afin de les lire
+directement dans leur représentation finale, sans passer par les types
+par défaut de `pd.read_csv` (float64, int64, chaînes object) :
+- fraude : variables V1–V28, Time et Amount en float32, Class en int8 ;
+- marketing : entiers réduits (int8/int16/int32), textes en `category`,
+  dates de `Dt_Customer` analysées à la lecture.
+
+Le rapport `memory_report()` compare l'empreinte mémoire obtenue à celle
+des types par défaut.
+"""
+
+import numpy as np
+import pandas as pd
+
+FRAUD_DTYPES = {
+    'Time': 'float32',
+    **{f'V{i}': 'float32' for i in range(1, 29)},
+    'Amount': 'float32',
+    'Class': 'int8',
+}
+
+MARKETING_DTYPES = {
+    'ID': 'int32',
+    'Year_Birth': 'int16',
+    'Education': 'category',
+    'Marital_Status': 'category',
+    'Income': 'float32',
+    'Kidhome': 'int8',
+    'Teenhome': 'int8',
+    'Recency': 'int16',
+    'MntWines': 'int32',
+    'MntFruits': 'int32',
+    'MntMeatProducts': 'int32',
+    'MntFishProducts': 'int32',
+    'MntSweetProducts': 'int32',
+    'MntGoldProds': 'int32',
+    'NumDealsPurchases': 'int16',
+    'NumWebPurchases': 'int16',
+    'NumCatalogPurchases': 'int16',
+    'NumStorePurchases': 'int16',
+    'NumWebVisitsMonth': 'int16',
+    'AcceptedCmp1': 'int8',
+    'AcceptedCmp2': 'int8',
+    'AcceptedCmp3': 'int8',
+    'AcceptedCmp4': 'int8',
+    'AcceptedCmp5': 'int8',
+    'Complain': 'int8',
+    'Z_CostContact': 'int8',
+    'Z_Revenue': 'int8',
+    'Response': 'int8',
+}
+
+MARKETING_DATE_COLUMNS = ['Dt_Customer']
+
+SCHEMAS = {
+    'fraud': {'dtype': FRAUD_DTYPES, 'parse_dates': []},
+    'marketing': {'dtype': MARKETING_DTYPES, 'parse_dates': MARKETING_DATE_COLUMNS},
+}
+
+
+def schema_read_kwargs(dataset, columns=None):
+    """
+    Options `pd.read_csv` du schéma d'un dataset ('fraud' ou 'marketing').
+
+    Si `columns` (l'en-tête du fichier) est fourni, seules les colonnes
+    présentes sont typées.
+    """
+    schema = SCHEMAS[dataset]
+    dtype = schema['dtype']
+    parse_dates = schema['parse_dates']
+    if columns is not None:
+        dtype = {col: dtype[col] for col in columns if col in dtype}
+        parse_dates = [col for col in parse_dates if col in columns]
+
+    kwargs = {'dtype': dict(dtype)}
+    if parse_dates:
+        kwargs['parse_dates'] = list(parse_dates)
+    return kwargs
+
+
+def apply_schema(df, dataset):
+    """
+    Convertit un DataFrame déjà chargé vers les types du schéma.
+
+    Les valeurs non convertibles deviennent manquantes ; une colonne entière
+    contenant des valeurs manquantes est conservée en flottant.
+    """
+    schema = SCHEMAS[dataset]
+    df = df.copy()
+
+    for col, dtype in schema['dtype'].items():
+        if col not in df.columns:
+            continue
+        if dtype == 'category':
+            df[col] = df[col].astype('category')
+            continue
+
+        values = pd.to_numeric(df[col], errors='coerce')
+        if np.dtype(dtype).kind in 'iu' and values.isna().any():
+            df[col] = values.astype('float32')
+        else:
+            df[col] = values.astype(dtype)
+
+    return _parse_date_columns(df, dataset)
+
+
+def _parse_date_columns(df, dataset):
+    """Analyse les colonnes de dates restées en texte (format jour-mois-année de Kaggle)"""
+    for col in SCHEMAS[dataset]['parse_dates']:
+        if col in df.columns and not pd.api.types.is_datetime64_any_dtype(df[col].dtype):
+            df[col] = pd.to_datetime(df[col], errors='coerce', dayfirst=True)
+    return df
+
+
+def split_integer_dtypes(dtype):
+    """
+    Sépare un dictionnaire de types en (types imposés à la lecture, types entiers).
+
+    Une colonne entière fait échouer `pd.read_csv` sur une cellule vide ou
+    un texte inattendu : elle est lue sans type imposé puis réduite par
+    `coerce_integer_columns`.
+    """
+    integer_dtypes = {col: kind for col, kind in dtype.items()
+                      if kind != 'category' and np.dtype(kind).kind in 'iu'}
+    return {col: kind for col, kind in dtype.items() if col not in integer_dtypes}, integer_dtypes
+
+
+def coerce_integer_columns(df, integer_dtypes, required=()):
+    """
+    Réduit en mémoire les colonnes entières lues sans type imposé.
+
+    Les valeurs non numériques deviennent manquantes (`pd.to_numeric(errors='coerce')`) ;
+    les lignes où une colonne de `required` (la cible de fraude) est
+    manquante sont retirées, les autres colonnes gardent leurs manquants en
+    float32. Retourne (DataFrame, {colonne: valeurs non numériques}, lignes retirées).
+    """
+    invalid = {}
+    for col in integer_dtypes:
+        if col in df.columns and not pd.api.types.is_numeric_dtype(df[col].dtype):
+            values = pd.to_numeric(df[col], errors='coerce')
+            n_invalid = int(values.isna().sum() - df[col].isna().sum())
+            if n_invalid:
+                invalid[col] = n_invalid
+            df[col] = values
+
+    n_dropped = 0
+    required = [col for col in required if col in df.columns]
+    if required:
+        keep = df[required].notna().all(axis=1).to_numpy()
+        n_dropped = int(len(df) - keep.sum())
+        if n_dropped:
+            df = df[keep].copy()
+
+    for col, dtype in integer_dtypes.items():
+        if col in df.columns:
+            df[col] = df[col].astype('float32') if df[col].isna().any() else df[col].astype(dtype)
+    return df, invalid, n_dropped
+
+
+def read_csv_with_schema(path, dataset, reader=pd.read_csv, columns=None, **read_csv_kwargs):
+    """
+    Lit un CSV en une seule analyse dans les types compacts du schéma.
+
+    `reader` peut être `pd.read_csv` ou un chargeur compatible (cache
+    colonnaire, magasin projeté) ; `columns` (l'en-tête, s'il est connu)
+    restreint le schéma aux colonnes présentes. Flottants, catégories et
+    dates sont typés à la lecture ; les colonnes entières sont lues sans
+    type imposé puis réduites en mémoire (`coerce_integer_columns`,
+    float32 s'il reste des valeurs manquantes). Les colonnes dont des
+    valeurs n'ont pas pu être converties sont signalées.
+    """
+    kwargs = schema_read_kwargs(dataset, columns)
+    kwargs['dtype'], integer_dtypes = split_integer_dtypes(kwargs['dtype'])
+    df = _parse_date_columns(reader(path, **read_csv_kwargs, **kwargs), dataset)
+
+    df, invalid, _ = coerce_integer_columns(df, integer_dtypes)
+    if invalid:
+        print(f"⚠️ Schéma '{dataset}' : valeurs non numériques remplacées par NaN dans "
+              f"{', '.join(f'{col} ({n} valeurs)' for col, n in invalid.items())}")
+    return df
+
+
+def _default_dtype_bytes(series):
+    """Empreinte mémoire d'une colonne avec les types par défaut de `pd.read_csv`"""
+    if isinstance(series.dtype, pd.CategoricalDtype) or pd.api.types.is_datetime64_any_dtype(series.dtype):
+        # Texte lu avec le type chaîne par défaut de pandas
+        return int(series.astype(str).memory_usage(index=False, deep=True))
+    if pd.api.types.is_numeric_dtype(series.dtype):
+        return int(series.size * 8)
+    return int(series.memory_usage(index=False, deep=True))
+
+
+def memory_report(df):
+    """
+    Compare la mémoire de chaque colonne à celle des types par défaut.
+
+    Retourne un DataFrame (une ligne par colonne et une ligne 'TOTAL') avec
+    les types, les tailles en Ko et le gain en pourcentage.
+    """
+    rows = []
+    for col in df.columns:
+        series = df[col]
+        default_bytes = _default_dtype_bytes(series)
+        actual_bytes = int(series.memory_usage(index=False, deep=True))
+        rows.append({
+            'Colonne': col,
+            'Type': str(series.dtype),
+            'Mémoire_Défaut_Ko': default_bytes / 1024,
+            'Mémoire_Ko': actual_bytes / 1024,
+        })
+
+    report = pd.DataFrame(rows)
+    total = pd.DataFrame([{
+        'Colonne': 'TOTAL',
+        'Type': '',
+        'Mémoire_Défaut_Ko': report['Mémoire_Défaut_Ko'].sum(),
+        'Mémoire_Ko': report['Mémoire_Ko'].sum(),
+    }])
+    report = pd.concat([report, total], ignore_index=True)
+    report['Gain_%'] = np.where(
+        report['Mémoire_Défaut_Ko'] > 0,
+        (1 - report['Mémoire_Ko'] / report['Mémoire_Défaut_Ko']) * 100,
+        0.0
+    )
+    return report.round(2)
+
+
+def memory_summary(df):
+    """Résumé en une ligne du gain mémoire (pour les logs des chargeurs)"""
+    total = memory_report(df).iloc[-1]
+    ratio = total['Mémoire_Défaut_Ko'] / total['Mémoire_Ko'] if total['Mémoire_Ko'] > 0 else 1.0
+    return (f"💾 Mémoire: {total['Mémoire_Ko'] / 1024:.1f} Mo "
+            f"(au lieu de {total['Mémoire_Défaut_Ko'] / 1024:.1f} Mo, ×{ratio:.1f} plus compact)")
+
+
+def ensure_numeric(df, columns):
+    """Convertit en numérique les colonnes qui ne le sont pas déjà (lecture sans schéma)"""
+    for col in columns:
+        if col in df.columns and not pd.api.types.is_numeric_dtype(df[col].dtype):
+            df[col] = pd.to_numeric(df[col], errors='coerce')
+    return df
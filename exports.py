@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Exports des Résultats
+=====================
+
+Sérialisation des données filtrées pour les boutons de téléchargement
+des dashboards, faite uniquement à la demande (jamais à chaque
+interaction) et par blocs de lignes :
+- CSV, écrit bloc par bloc dans le tampon de sortie (pas de grande chaîne
+  intermédiaire ni de copie d'encodage) ;
+- CSV compressé gzip, les blocs passant directement dans le compresseur ;
+- format binaire colonnaire : Parquet si pyarrow est installé, sinon une
+  archive `.npz` compressée avec un tableau par colonne (même repli que
+  le cache colonnaire).
+"""
+
+import gzip
+import io
+
+import numpy as np
+
+from data_cache import PARQUET_AVAILABLE
+
+DEFAULT_EXPORT_CHUNKSIZE = 50_000
+
+# Format → (libellé, extension, type MIME)
+EXPORT_FORMATS = {
+    'csv': ("CSV", 'csv', 'text/csv'),
+    'csv.gz': ("CSV compressé (gzip)", 'csv.gz', 'application/gzip'),
+    'columnar': (
+        ("Parquet (colonnaire)", 'parquet', 'application/vnd.apache.parquet') if PARQUET_AVAILABLE
+        else ("NumPy .npz (colonnaire)", 'npz', 'application/octet-stream')
+    ),
+}
+
+
+def iter_csv_chunks(df, chunksize=DEFAULT_EXPORT_CHUNKSIZE):
+    """Texte CSV d'un DataFrame, bloc de lignes par bloc (en-tête dans le premier bloc)"""
+    for start in range(0, max(len(df), 1), chunksize):
+        yield df.iloc[start:start + chunksize].to_csv(index=False, header=(start == 0))
+
+
+def write_csv(df, fileobj, chunksize=DEFAULT_EXPORT_CHUNKSIZE):
+    """Écrit le CSV d'un DataFrame dans un fichier binaire ouvert, par blocs"""
+    for text in iter_csv_chunks(df, chunksize):
+        fileobj.write(text.encode('utf-8'))
+
+
+def write_columnar(df, fileobj):
+    """Écrit un DataFrame au format binaire colonnaire (Parquet, ou .npz sans pyarrow)"""
+    if PARQUET_AVAILABLE:
+        df.to_parquet(fileobj, index=False)
+    else:
+        np.savez_compressed(fileobj, **{str(col): df[col].to_numpy() for col in df.columns})
+
+
+def export_bytes(df, fmt='csv', chunksize=DEFAULT_EXPORT_CHUNKSIZE):
+    """Contenu du fichier d'export d'un DataFrame dans le format demandé (clé de EXPORT_FORMATS)"""
+    buffer = io.BytesIO()
+    if fmt == 'csv':
+        write_csv(df, buffer, chunksize)
+    elif fmt == 'csv.gz':
+        with gzip.GzipFile(fileobj=buffer, mode='wb', compresslevel=6, mtime=0) as compressed:
+            write_csv(df, compressed, chunksize)
+    elif fmt == 'columnar':
+        write_columnar(df, buffer)
+    else:
+        raise ValueError(f"Format d'export inconnu : {fmt}")
+    return buffer.getvalue()
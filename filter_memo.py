@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Mémoïsation des Calculs par État de Filtres
+===========================================
+
+Chaque interaction avec un widget Streamlit relance tout le script du
+dashboard : lignes filtrées, KPIs, tables horaires, seuils d'anomalies et
+statistiques comparatives étaient recalculés à chaque fois, même pour un
+état de filtres déjà affiché quelques secondes plus tôt.
+
+`FilterMemo` conserve ces résultats, indexés par (empreinte du dataset,
+nom du calcul, plage de montants, plage horaire, paramètres propres au
+calcul comme la taille d'échantillon ou la règle de détection) :
+- revenir à un état de filtres déjà vu ne recalcule rien ;
+- les figures Plotly, plus coûteuses à construire que les agrégats
+  qu'elles affichent, sont mémorisées de la même façon ;
+- la taille de chaque résultat est estimée (tableaux NumPy, DataFrames,
+  figures, conteneurs) et les entrées les moins récemment utilisées sont évincées
+  au-delà du budget mémoire ;
+- le mémo est partagé entre les sessions (verrou interne) : les résultats
+  ne doivent jamais être modifiés en place.
+"""
+
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_MEMO_BUDGET_BYTES = 256 * 1024 ** 2
+
+
+def estimate_nbytes(value, _seen=None):
+    """Taille mémoire approximative d'un résultat (tableaux, DataFrames, figures Plotly, conteneurs, objets simples)"""
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (pd.DataFrame, pd.Series, pd.Index)):
+        usage = value.memory_usage(deep=True)
+        return int(usage.sum()) if isinstance(value, pd.DataFrame) else int(usage)
+    if hasattr(value, 'to_plotly_json'):
+        # Figure Plotly : le graphe d'objets est cyclique, seules ses données comptent
+        return sys.getsizeof(value) + estimate_nbytes(value.to_plotly_json())
+    # Objets partagés ou références circulaires comptés une seule fois
+    _seen = set() if _seen is None else _seen
+    if id(value) in _seen:
+        return 0
+    _seen.add(id(value))
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(estimate_nbytes(k, _seen) + estimate_nbytes(v, _seen)
+                                          for k, v in value.items())
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return sys.getsizeof(value) + sum(estimate_nbytes(item, _seen) for item in value)
+    if hasattr(value, '__dict__'):
+        return sys.getsizeof(value) + estimate_nbytes(vars(value), _seen)
+    return sys.getsizeof(value)
+
+
+class FilterMemo:
+    """Cache LRU des calculs par état de filtres, borné par un budget mémoire"""
+
+    def __init__(self, budget_bytes=DEFAULT_MEMO_BUDGET_BYTES):
+        self.budget_bytes = budget_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # clé → (valeur, taille)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get_or_compute(self, key, compute):
+        """Résultat mémorisé pour `key`, sinon `compute()` mémorisé (s'il tient dans le budget)"""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key][0]
+            self.misses += 1
+
+        # Calcul hors verrou : les autres sessions ne sont pas bloquées
+        value = compute()
+        size = estimate_nbytes(value)
+        if size > self.budget_bytes:
+            return value
+
+        with self._lock:
+            if key in self._entries:
+                self.nbytes -= self._entries.pop(key)[1]
+            self._entries[key] = (value, size)
+            self.nbytes += size
+            while self.nbytes > self.budget_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.nbytes -= evicted
+        return value
+
+    def clear(self):
+        """Vide le mémo"""
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+
+    def stats(self):
+        """Entrées, taille occupée (octets), succès et calculs"""
+        return {'entries': len(self._entries), 'nbytes': self.nbytes, 'hits': self.hits, 'misses': self.misses}
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Cube Pré-agrégé des Transactions
+================================
+
+Les KPIs, les graphiques horaires et la heatmap jour × heure du dashboard
+de fraude ne sont que des comptages et des sommes sur Class, groupés par
+heure et par jour, sous des plages de montant et de temps.
+
+Le cube précalcule, une fois par dataset, le nombre de transactions et la
+somme des montants par tranche de montant × heure absolue (jour × heure) ×
+classe, cumulés le long de l'axe des montants. Une interaction avec les
+curseurs se résout en :
+- une différence de deux tranches cumulées pour les tranches de montant et
+  les heures entièrement comprises dans les plages ;
+- un calcul exact sur les seules lignes des tranches partielles aux bornes
+  (retrouvées par recherche dichotomique dans les index triés).
+
+Le résultat est identique à un filtrage des lignes, et son coût dépend du
+nombre de tranches et des lignes des bornes, pas du volume total.
+"""
+
+import numpy as np
+import pandas as pd
+
+from range_index import SortedColumnIndex
+from time_aggregates import TimeAggregates, hour_class_counts
+
+# Tranches géométriques d'environ 3,5 % entre 0,01 et 10 millions
+CUBE_AMOUNT_EDGES = np.concatenate(([-np.inf, 0.0], np.geomspace(0.01, 1e7, 601), [np.inf]))
+
+
+def _slice_rows(index, low, high):
+    """Lignes dont la valeur est dans [low, high], élargi d'un ulp (sur-ensemble sûr)"""
+    dtype = index.sorted_values.dtype.type
+    low = np.nextafter(dtype(low), dtype(-np.inf)) if np.isfinite(low) else low
+    high = np.nextafter(dtype(high), dtype(np.inf)) if np.isfinite(high) else high
+    if low > high:
+        return np.empty(0, dtype=np.intp)
+    return index.rows(low, high)
+
+
+class CubeSlice(TimeAggregates):
+    """Agrégats d'une requête : transactions par heure absolue et par classe, sommes des montants"""
+
+    def __init__(self, hour_counts, amount_sums):
+        super().__init__(hour_counts)
+        self.amount_sums = amount_sums
+
+    def kpis(self):
+        """Nombre de transactions, de fraudes, taux et montant moyen"""
+        total = int(self.hour_counts.sum())
+        frauds = int(self.hour_counts[:, 1].sum())
+        return {
+            'total_transactions': total,
+            'fraud_count': frauds,
+            'fraud_rate': (frauds / total * 100) if total > 0 else 0.0,
+            'avg_amount': (self.amount_sums.sum() / total) if total > 0 else np.nan,
+        }
+
+    def class_counts(self):
+        """Nombre de transactions par classe"""
+        return pd.Series(self.hour_counts.sum(axis=0), index=[0, 1])
+
+
+class FraudCube:
+    """
+    Cube tranche de montant × heure absolue × classe (comptages et sommes des montants).
+
+    `time_hours` est le temps en heures depuis la première transaction
+    (Time / 3600) ; `amount_index` et `time_index` peuvent réutiliser des
+    index triés existants (`range_index`).
+    """
+
+    def __init__(self, amount, time_hours, labels, amount_edges=CUBE_AMOUNT_EDGES,
+                 amount_index=None, time_index=None):
+        self.amount = np.asarray(amount)
+        self.time_hours = np.asarray(time_hours)
+        self.labels = np.asarray(labels).astype(np.int64)
+        self.amount_edges = amount_edges
+        self.amount_index = amount_index or SortedColumnIndex(self.amount)
+        self.time_index = time_index or SortedColumnIndex(self.time_hours)
+
+        amount_bins, hours = self._coordinates(np.arange(len(self.amount)))
+        valid = (amount_bins >= 0) & (hours >= 0)
+        self.n_hours = int(hours[valid].max()) + 1 if valid.any() else 1
+        n_bins = len(amount_edges) - 1
+
+        flat = (amount_bins[valid] * self.n_hours + hours[valid]) * 2 + self.labels[valid]
+        size = n_bins * self.n_hours * 2
+        counts = np.bincount(flat, minlength=size).reshape(n_bins, self.n_hours, 2)
+        sums = np.bincount(flat, weights=self.amount[valid].astype(np.float64), minlength=size)
+        sums = sums.reshape(n_bins, self.n_hours, 2)
+
+        # Cumuls le long des montants : une plage de tranches = différence de deux tranches
+        self.cum_counts = np.zeros((n_bins + 1, self.n_hours, 2), dtype=np.int64)
+        self.cum_sums = np.zeros((n_bins + 1, self.n_hours, 2))
+        np.cumsum(counts, axis=0, out=self.cum_counts[1:])
+        np.cumsum(sums, axis=0, out=self.cum_sums[1:])
+
+    @classmethod
+    def from_frame(cls, df, target_col='Class', range_index=None):
+        """Construit le cube d'un DataFrame de transactions (Time, Amount, classe)"""
+        indexes = range_index.indexes if range_index is not None else {}
+        return cls(
+            df['Amount'].to_numpy(),
+            (df['Time_Hours'] if 'Time_Hours' in df.columns else df['Time'] / 3600).to_numpy(),
+            df[target_col].to_numpy(),
+            amount_index=indexes.get('Amount'), time_index=indexes.get('Time_Hours')
+        )
+
+    def _coordinates(self, rows):
+        """Tranche de montant et heure absolue de lignes (-1 pour les valeurs manquantes)"""
+        amount = self.amount[rows].astype(np.float64)
+        time_hours = self.time_hours[rows].astype(np.float64)
+        amount_bins = np.searchsorted(self.amount_edges, amount, side='right') - 1
+        amount_bins[np.isnan(amount)] = -1
+        hours = np.full(len(rows), -1, dtype=np.int64)
+        known = ~np.isnan(time_hours)
+        hours[known] = np.floor(time_hours[known]).astype(np.int64)
+        return amount_bins, hours
+
+    def query(self, amount_range, time_range):
+        """Agrégats exacts des transactions dans les plages (bornes incluses, comme les curseurs)"""
+        a_low, a_high = amount_range
+        t_low, t_high = time_range
+
+        # Tranches de montant et heures entièrement comprises dans les plages
+        first_bin = int(np.searchsorted(self.amount_edges, a_low, side='left'))
+        end_bin = int(np.searchsorted(self.amount_edges, a_high, side='right')) - 1
+        first_hour = max(int(np.ceil(t_low)), 0)
+        end_hour = min(int(np.floor(t_high)), self.n_hours)
+
+        hour_counts = np.zeros((self.n_hours, 2), dtype=np.int64)
+        amount_sums = np.zeros(2)
+        full_amount = first_bin < end_bin
+        full_time = first_hour < end_hour
+        if full_amount and full_time:
+            hour_counts[first_hour:end_hour] = (
+                self.cum_counts[end_bin, first_hour:end_hour] - self.cum_counts[first_bin, first_hour:end_hour]
+            )
+            amount_sums += (
+                self.cum_sums[end_bin, first_hour:end_hour] - self.cum_sums[first_bin, first_hour:end_hour]
+            ).sum(axis=0)
+            lo_edge, hi_edge = self.amount_edges[first_bin], self.amount_edges[end_bin]
+        else:
+            lo_edge = hi_edge = np.nan
+
+        # Bornes : lignes des tranches partielles, filtrées exactement
+        if full_amount and full_time:
+            candidates = np.concatenate([
+                _slice_rows(self.amount_index, a_low, lo_edge),
+                _slice_rows(self.amount_index, hi_edge, a_high),
+                _slice_rows(self.time_index, t_low, first_hour),
+                _slice_rows(self.time_index, end_hour, t_high),
+            ])
+            candidates = np.unique(candidates)
+        else:
+            # Aucune tranche complète : calcul exact depuis la plage la plus sélective
+            by_amount = _slice_rows(self.amount_index, a_low, a_high)
+            by_time = _slice_rows(self.time_index, t_low, t_high)
+            candidates = by_amount if len(by_amount) <= len(by_time) else by_time
+
+        if len(candidates) > 0:
+            amount = self.amount[candidates]
+            time_hours = self.time_hours[candidates]
+            dtype_a, dtype_t = amount.dtype.type, time_hours.dtype.type
+            in_range = (
+                (amount >= dtype_a(a_low)) & (amount <= dtype_a(a_high)) &
+                (time_hours >= dtype_t(t_low)) & (time_hours <= dtype_t(t_high))
+            )
+            if full_amount and full_time:
+                amount64, time64 = amount.astype(np.float64), time_hours.astype(np.float64)
+                in_cube = (
+                    (amount64 >= lo_edge) & (amount64 < hi_edge) &
+                    (time64 >= first_hour) & (time64 < end_hour)
+                )
+                in_range &= ~in_cube
+            edge_rows = candidates[in_range]
+
+            _, hours = self._coordinates(edge_rows)
+            labels = self.labels[edge_rows]
+            hour_counts += hour_class_counts(np.clip(hours, 0, self.n_hours - 1), labels, n_hours=self.n_hours)
+            amount_sums += np.bincount(
+                labels, weights=self.amount[edge_rows].astype(np.float64), minlength=2
+            )[:2]
+
+        return CubeSlice(hour_counts, amount_sums)
@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Ingestion Incrémentale des Transactions
+=======================================
+
+Suit un répertoire de données (nouveaux fichiers d'un export partitionné)
+ou un CSV qui grossit (lignes ajoutées en fin de fichier) et n'analyse que
+les octets ou fichiers nouveaux depuis la dernière actualisation.
+
+Les nouvelles lignes sont ajoutées à un tampon de colonnes à capacité
+croissante (sans recopier l'historique) et intégrées aux agrégats du
+profil en flux (fraudes, taux horaires, statistiques des montants) : le
+coût d'une actualisation est proportionnel au delta, pas à l'historique.
+"""
+
+import io
+import os
+
+import numpy as np
+import pandas as pd
+
+from data_loader import get_index, sniff_csv
+from data_schema import coerce_integer_columns, schema_read_kwargs, split_integer_dtypes
+from streaming_profiler import FraudProfile
+
+INITIAL_CAPACITY = 1024
+
+
+class TailReader:
+    """Lit uniquement les lignes complètes ajoutées à un CSV depuis la dernière lecture"""
+
+    def __init__(self, path, dataset='fraud', target_col='Class'):
+        self.path = path
+        self.dataset = dataset
+        self.target_col = target_col
+        dialect = sniff_csv(path)
+        self.columns = dialect['columns']
+        self.delimiter = dialect['delimiter']
+        self.encoding = 'utf-8' if dialect['encoding'] == 'utf-8-sig' else dialect['encoding']
+        self.read_kwargs = schema_read_kwargs(dataset, self.columns)
+        self.read_kwargs['dtype'], self.integer_dtypes = split_integer_dtypes(self.read_kwargs['dtype'])
+        self.offset = self._header_end()
+        self.inode = os.stat(path).st_ino
+        self.reset = False
+
+    def _header_end(self):
+        """Position du premier octet après la ligne d'en-tête"""
+        with open(self.path, 'rb') as f:
+            f.readline()
+            return f.tell()
+
+    def read_new(self):
+        """
+        Retourne les nouvelles lignes complètes (DataFrame éventuellement vide).
+
+        Si le fichier a été tronqué ou remplacé, la lecture repart du début et
+        l'attribut `reset` est positionné pour que l'appelant reconstruise ses
+        agrégats. Les lignes dont la cible est vide ou non numérique sont
+        ignorées (et signalées) ; l'offset n'avance qu'après une analyse
+        réussie, de sorte qu'un delta illisible est relu à l'actualisation
+        suivante au lieu d'être perdu.
+        """
+        self.reset = False
+        stat = os.stat(self.path)
+        if stat.st_ino != self.inode or stat.st_size < self.offset:
+            self.offset = self._header_end()
+            self.inode = stat.st_ino
+            self.reset = True
+
+        if stat.st_size == self.offset:
+            return pd.DataFrame(columns=self.columns)
+
+        with open(self.path, 'rb') as f:
+            f.seek(self.offset)
+            data = f.read(stat.st_size - self.offset)
+
+        # Une ligne en cours d'écriture sera lue à la prochaine actualisation
+        end = data.rfind(b'\n') + 1
+        if end == 0:
+            return pd.DataFrame(columns=self.columns)
+
+        delta = pd.read_csv(
+            io.BytesIO(data[:end]), header=None, names=self.columns,
+            sep=self.delimiter, encoding=self.encoding, **self.read_kwargs
+        )
+        delta, _, n_dropped = coerce_integer_columns(delta, self.integer_dtypes, required=(self.target_col,))
+        self.offset += end
+        if n_dropped:
+            print(f"⚠️ {os.path.basename(self.path)} : {n_dropped} lignes ignorées, '{self.target_col}' vide ou non numérique")
+        return delta
+
+
+class AppendableFrame:
+    """
+    Tampon de colonnes NumPy à capacité doublée lors des dépassements.
+
+    L'ajout d'un delta ne recopie l'historique qu'au doublement de capacité
+    (coût amorti proportionnel au delta) ; `frame()` expose les lignes
+    remplies sous forme de DataFrame sans copie.
+    """
+
+    def __init__(self):
+        self._buffers = {}
+        self.n_rows = 0
+
+    def _capacity(self):
+        return len(next(iter(self._buffers.values()))) if self._buffers else 0
+
+    def append(self, delta):
+        """Ajoute les lignes d'un DataFrame"""
+        n_new = len(delta)
+        if n_new == 0:
+            return self
+
+        if self._buffers and set(delta.columns) != set(self._buffers):
+            raise ValueError(f"Colonnes inattendues dans le delta: {sorted(set(delta.columns) ^ set(self._buffers))}")
+
+        if not self._buffers:
+            capacity = max(INITIAL_CAPACITY, n_new)
+            for col in delta.columns:
+                values = delta[col].to_numpy()
+                dtype = values.dtype if values.dtype.kind in 'biufcM' else object
+                self._buffers[col] = np.empty(capacity, dtype=dtype)
+
+        # Un delta aux manquants convertis en float32 élargit le tampon entier
+        for col, buffer in self._buffers.items():
+            values = delta[col].to_numpy()
+            if buffer.dtype != object and not np.can_cast(values.dtype, buffer.dtype):
+                self._buffers[col] = buffer.astype(np.result_type(buffer.dtype, values.dtype))
+
+        needed = self.n_rows + n_new
+        if needed > self._capacity():
+            capacity = max(needed, 2 * self._capacity())
+            for col, buffer in self._buffers.items():
+                grown = np.empty(capacity, dtype=buffer.dtype)
+                grown[:self.n_rows] = buffer[:self.n_rows]
+                self._buffers[col] = grown
+
+        for col, buffer in self._buffers.items():
+            buffer[self.n_rows:needed] = delta[col].to_numpy()
+        self.n_rows = needed
+        return self
+
+    def frame(self):
+        """Vue DataFrame des lignes ingérées (sans copie)"""
+        return pd.DataFrame(
+            {col: buffer[:self.n_rows] for col, buffer in self._buffers.items()},
+            copy=False
+        )
+
+
+class IncrementalIngestor:
+    """
+    Ingestion incrémentale d'un fichier ou d'un répertoire de transactions.
+
+    `load()` lit tout l'existant une fois ; chaque `refresh()` n'analyse que
+    les octets ajoutés aux fichiers suivis et les fichiers apparus depuis,
+    puis met à jour le tampon et le profil agrégé.
+    """
+
+    def __init__(self, path=None, directory='.', dataset='fraud', target_col='Class', all_files=True):
+        self.path = path
+        self.directory = directory
+        self.dataset = dataset
+        self.target_col = target_col
+        self.all_files = all_files
+        self.readers = {}
+        self.buffer = AppendableFrame()
+        self.profile = FraudProfile(target_col=target_col)
+
+    def _watched_files(self):
+        """Fichiers à suivre : le fichier donné, ou ceux du répertoire pour ce dataset"""
+        if self.path is not None:
+            return [self.path]
+        index = get_index(self.directory)
+        files = [index.path(f) for f in index.find(self.dataset)]
+        return files if self.all_files else files[:1]
+
+    def _integrate(self, delta):
+        if len(delta) == 0:
+            return
+        self.buffer.append(delta)
+        if self.target_col in delta.columns:
+            self.profile.update(delta)
+
+    def _rebuild(self):
+        """Repart de zéro (fichier suivi tronqué ou remplacé)"""
+        self.buffer = AppendableFrame()
+        self.profile = FraudProfile(target_col=self.target_col)
+        for reader in self.readers.values():
+            reader.offset = reader._header_end()
+            reader.inode = os.stat(reader.path).st_ino
+
+    def refresh(self):
+        """Intègre les nouveautés et retourne le DataFrame des lignes ajoutées"""
+        deltas = []
+        for path in self._watched_files():
+            if path not in self.readers:
+                self.readers[path] = TailReader(path, dataset=self.dataset, target_col=self.target_col)
+            reader = self.readers[path]
+            delta = reader.read_new()
+            if reader.reset:
+                # Fichier réécrit : l'historique n'est plus valide
+                self._rebuild()
+                return self.refresh()
+            if len(delta) > 0:
+                deltas.append(delta)
+
+        if not deltas:
+            return pd.DataFrame()
+
+        delta = pd.concat(deltas, ignore_index=True) if len(deltas) > 1 else deltas[0]
+        self._integrate(delta)
+        return delta
+
+    def load(self):
+        """Chargement initial de l'existant"""
+        self.refresh()
+        return self.frame()
+
+    def frame(self):
+        """Toutes les lignes ingérées (vue sans copie)"""
+        return self.buffer.frame()
+
+    @property
+    def n_rows(self):
+        return self.buffer.n_rows
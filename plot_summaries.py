@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Résumés des Distributions pour les Graphiques
+=============================================
+
+Les histogrammes, boîtes à moustaches et violons du dashboard de fraude
+envoyaient les lignes brutes à Plotly : le navigateur recevait et
+regroupait lui-même des centaines de milliers de points, d'où le curseur
+« taille de l'échantillon ».
+
+Ce module calcule les résumés côté serveur, en NumPy :
+- comptages par tranche (histogrammes) ;
+- quartiles, moustaches (règle 1,5 × IQR) et un sous-ensemble borné des
+  points atypiques (boîtes) ;
+- densité à noyau gaussien évaluée sur une grille régulière à partir des
+  comptages par tranche, la convolution étant faite par FFT (violons).
+
+Les graphiques ne reçoivent que ces résumés : la taille des données
+envoyées et le temps de rendu ne dépendent plus du nombre de lignes. Les
+fonctions travaillant sur des comptages acceptent aussi ceux calculés en
+SQL (`sqlite_backend`). Les quartiles sont estimés par esquisse au-delà
+de `SKETCH_THRESHOLD_ROWS` valeurs (`quantile_sketch`).
+"""
+
+import numpy as np
+
+from quantile_sketch import quantiles
+
+KDE_GRID_SIZE = 512
+MAX_OUTLIER_POINTS = 2000
+WHISKER_FACTOR = 1.5
+
+
+def regular_bins(low, high, nbins=50):
+    """Origine et largeur de `nbins` tranches régulières entre low et high"""
+    low, high = float(low), float(high)
+    if not high > low:
+        high = low + 1.0
+    return low, (high - low) / nbins
+
+
+def histogram_edges(low, high, nbins=50):
+    """
+    Bornes de `nbins` tranches régulières entre low et high.
+
+    Calculées comme `origine + i × largeur`, la formule qu'évalue aussi
+    SQLite (`TransactionStore.amount_histogram`) : les comptages coïncident.
+    """
+    origin, width = regular_bins(low, high, nbins)
+    return origin + np.arange(nbins + 1) * width
+
+
+def bin_counts(values, edges):
+    """Nombre de valeurs par tranche (dernière tranche fermée, NaN ignorés)"""
+    values = np.asarray(values)
+    return np.histogram(values[~np.isnan(values)], bins=edges)[0]
+
+
+def thin_points(values, max_points=MAX_OUTLIER_POINTS):
+    """Au plus `max_points` valeurs régulièrement espacées dans l'ordre trié (extrêmes inclus)"""
+    values = np.sort(np.asarray(values))
+    if len(values) <= max_points:
+        return values
+    return values[np.linspace(0, len(values) - 1, max_points).round().astype(np.intp)]
+
+
+def box_summary(values, whisker=WHISKER_FACTOR, max_points=MAX_OUTLIER_POINTS):
+    """
+    Statistiques d'une boîte à moustaches (conventions de Plotly).
+
+    Les moustaches s'arrêtent aux valeurs extrêmes comprises dans
+    [Q1 - whisker × IQR, Q3 + whisker × IQR] ; les valeurs au-delà sont
+    les points atypiques, dont au plus `max_points` sont conservés.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    values = values[~np.isnan(values)]
+    if len(values) == 0:
+        return None
+    q1, median, q3 = quantiles(values, [0.25, 0.5, 0.75])
+    low_limit, high_limit = q1 - whisker * (q3 - q1), q3 + whisker * (q3 - q1)
+    inside = (values >= low_limit) & (values <= high_limit)
+    return {
+        'n': len(values),
+        'q1': q1, 'median': median, 'q3': q3,
+        'mean': values.mean(),
+        'lowerfence': values[inside].min(),
+        'upperfence': values[inside].max(),
+        'outliers': thin_points(values[~inside], max_points),
+    }
+
+
+def silverman_bandwidth(n, std, iqr):
+    """Largeur de bande de Silverman (règle utilisée par les violons de Plotly)"""
+    spread = min(std, iqr / 1.349) if iqr > 0 else std
+    if not spread > 0 or n < 2:
+        return 1.0
+    return 1.059 * spread * n ** -0.2
+
+
+def kde_grid_edges(low, high, bandwidth, grid_size=KDE_GRID_SIZE):
+    """Tranches de la grille d'évaluation : étendue des données plus deux largeurs de bande"""
+    return histogram_edges(low - 2 * bandwidth, high + 2 * bandwidth, grid_size)
+
+
+def kde_from_counts(edges, counts, bandwidth):
+    """
+    Densité à noyau gaussien aux centres des tranches, à partir des comptages.
+
+    Chaque tranche est ramenée à son centre puis convoluée avec le noyau
+    (tronqué à 4 largeurs de bande) par FFT : O(G log G) pour une grille
+    de G tranches, quel que soit le nombre de lignes.
+    """
+    counts = np.asarray(counts, dtype=np.float64)
+    centers = (edges[:-1] + edges[1:]) / 2
+    total = counts.sum()
+    if total == 0:
+        return centers, np.zeros_like(centers)
+
+    step = edges[1] - edges[0]
+    half = min(len(counts) - 1, int(np.ceil(4 * bandwidth / step)))
+    offsets = np.arange(-half, half + 1) * step
+    kernel = np.exp(-0.5 * (offsets / bandwidth) ** 2) / (np.sqrt(2 * np.pi) * bandwidth)
+
+    size = 1 << int(np.ceil(np.log2(len(counts) + 2 * half)))
+    smoothed = np.fft.irfft(np.fft.rfft(counts, size) * np.fft.rfft(kernel, size), size)
+    density = smoothed[half:half + len(counts)] / total
+    return centers, np.clip(density, 0, None)
+
+
+def binned_kde(values, grid_size=KDE_GRID_SIZE):
+    """Densité d'un tableau de valeurs : (grille, densité), ou None si vide"""
+    values = np.asarray(values, dtype=np.float64)
+    values = values[~np.isnan(values)]
+    if len(values) == 0:
+        return None
+    q1, q3 = quantiles(values, [0.25, 0.75])
+    bandwidth = silverman_bandwidth(len(values), values.std(ddof=1) if len(values) > 1 else 0.0, q3 - q1)
+    edges = kde_grid_edges(values.min(), values.max(), bandwidth, grid_size)
+    return kde_from_counts(edges, bin_counts(values, edges), bandwidth)
+
+
+# Résolution de l'image de densité (tranches en x, tranches en y)
+RASTER_SHAPE = (300, 150)
+MAX_OVERLAY_POINTS = 5000
+
+
+def density_raster(x, y, x_range, y_range, shape=RASTER_SHAPE):
+    """
+    Comptages 2D des points (x, y) dans la fenêtre donnée.
+
+    Retourne (bornes x, bornes y, comptages) avec les comptages au format
+    des heatmaps (une ligne par tranche de y) ; les points hors fenêtre
+    sont ignorés. Le coût ne dépend que du nombre de points, la taille de
+    l'image que de `shape`.
+    """
+    x_edges = histogram_edges(*x_range, shape[0])
+    y_edges = histogram_edges(*y_range, shape[1])
+    counts = np.histogram2d(np.asarray(x), np.asarray(y), bins=[x_edges, y_edges])[0]
+    return x_edges, y_edges, counts.T.astype(np.int64)
+
+
+def log_counts(counts):
+    """Échelle logarithmique (log10, float32 pour alléger l'envoi) des comptages, cellules vides en NaN"""
+    counts = np.asarray(counts, dtype=np.float32)
+    scaled = np.full(counts.shape, np.nan, dtype=np.float32)
+    np.log10(counts, out=scaled, where=counts > 0)
+    return scaled
+
+
+def spread_rows(rows, max_points=MAX_OVERLAY_POINTS):
+    """Au plus `max_points` lignes régulièrement espacées parmi `rows` (ordre conservé)"""
+    rows = np.asarray(rows)
+    if len(rows) <= max_points:
+        return rows
+    return rows[np.linspace(0, len(rows) - 1, max_points).round().astype(np.intp)]
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Esquisses de Quantiles Fusionnables
+===================================
+
+Les médianes, quartiles et seuils IQR étaient calculés par `quantile`
+exact sur toutes les lignes filtrées : une copie triée (ou partitionnée)
+de la colonne entière, impossible en mode par blocs.
+
+Ce module fournit une esquisse KLL (Karnin, Lang et Liberty) :
+- les valeurs arrivent par blocs dans un compacteur de niveau 0 ;
+- un niveau qui dépasse sa capacité est trié et une valeur sur deux
+  (décalage aléatoire) monte au niveau suivant, où elle pèse double ;
+- les capacités décroissent géométriquement (facteur 2/3) vers les
+  niveaux bas : quelques centaines de valeurs conservées, quel que soit
+  le nombre de lignes.
+
+L'erreur de rang normalisée visée est réglable (`error`, 1 % par défaut)
+et fixe la taille `k` des compacteurs. Deux esquisses construites sur des
+blocs ou partitions différents se fusionnent niveau par niveau, avec la
+même garantie qu'une esquisse construite sur l'ensemble.
+
+`quantiles` et `matrix_quantiles` renvoient les quantiles exacts tant que
+les données tiennent sous `SKETCH_THRESHOLD_ROWS` lignes, et passent à
+l'esquisse au-delà.
+"""
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_SKETCH_ERROR = 0.01
+SKETCH_THRESHOLD_ROWS = 1_000_000
+
+# Taille des blocs intégrés à la fois (mémoire de travail bornée)
+SKETCH_BLOCK_SIZE = 65_536
+
+# Rapport de capacité entre deux niveaux consécutifs
+CAPACITY_RATIO = 2 / 3
+
+
+def sketch_k(error=DEFAULT_SKETCH_ERROR):
+    """Taille des compacteurs pour une erreur de rang normalisée donnée (borne empirique à 99 %)"""
+    if not 0 < error < 1:
+        raise ValueError(f"Erreur de rang invalide : {error}")
+    return max(8, int(np.ceil((2.296 / error) ** (1 / 0.9723))))
+
+
+class QuantileSketch:
+    """Esquisse KLL fusionnable des quantiles d'une série de valeurs (min et max exacts)"""
+
+    def __init__(self, error=DEFAULT_SKETCH_ERROR, seed=0):
+        self.error = error
+        self.k = sketch_k(error)
+        self.levels = [np.empty(0)]
+        self.count = 0
+        self.min = np.inf
+        self.max = -np.inf
+        self._rng = np.random.default_rng(seed)
+
+    @classmethod
+    def from_values(cls, values, error=DEFAULT_SKETCH_ERROR, seed=0):
+        """Esquisse d'un tableau de valeurs, intégré par blocs"""
+        return cls(error, seed).update(values)
+
+    @property
+    def size(self):
+        """Nombre de valeurs conservées"""
+        return sum(len(items) for items in self.levels)
+
+    def _capacity(self, level):
+        depth = len(self.levels) - 1 - level
+        return max(2, int(np.ceil(self.k * CAPACITY_RATIO ** depth)))
+
+    def _compress(self):
+        """Compacte chaque niveau au-delà de sa capacité, du bas vers le haut"""
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) > self._capacity(level):
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                items = np.sort(items)
+                # Un nombre impair laisse une valeur au niveau courant
+                odd = len(items) % 2
+                promoted = items[odd + self._rng.integers(2)::2]
+                self.levels[level] = items[:odd]
+                self.levels[level + 1] = np.concatenate((self.levels[level + 1], promoted))
+            level += 1
+
+    def update(self, values):
+        """Intègre un bloc de valeurs (NaN ignorés)"""
+        values = np.asarray(values).ravel()
+        # Conversion et filtrage bloc par bloc : pas de copie de tout le tableau
+        for start in range(0, len(values), SKETCH_BLOCK_SIZE):
+            block = values[start:start + SKETCH_BLOCK_SIZE].astype(np.float64)
+            block = block[~np.isnan(block)]
+            if len(block) == 0:
+                continue
+            self.count += len(block)
+            self.min = min(self.min, float(block.min()))
+            self.max = max(self.max, float(block.max()))
+            self.levels[0] = np.concatenate((self.levels[0], block))
+            self._compress()
+        return self
+
+    def merge(self, other):
+        """Fusionne l'esquisse d'un autre bloc ou d'une autre partition"""
+        if other.count == 0:
+            return self
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate((self.levels[level], items))
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress()
+        return self
+
+    def quantile(self, q):
+        """
+        Quantile(s) estimé(s), q dans [0, 1] (scalaire ou tableau).
+
+        Interpolation linéaire entre les rangs des valeurs conservées :
+        tant qu'aucun niveau n'a été compacté (au plus `k` valeurs), le
+        résultat est celui de `np.quantile`.
+        """
+        q = np.asarray(q, dtype=np.float64)
+        if self.count == 0:
+            return np.full(q.shape, np.nan)[()]
+
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(values), 2.0 ** level) for level, values in enumerate(self.levels)])
+        order = np.argsort(items, kind='stable')
+        items, weights = items[order], weights[order]
+        # Rang (base 0) du centre du bloc de valeurs que représente chaque valeur conservée
+        ranks = np.cumsum(weights) - (weights + 1) / 2
+        estimate = np.interp(q * (weights.sum() - 1), ranks, items)
+        estimate = np.where(q <= 0, self.min, np.where(q >= 1, self.max, estimate))
+        return np.clip(estimate, self.min, self.max)[()]
+
+
+def quantiles(values, q, threshold=SKETCH_THRESHOLD_ROWS, error=DEFAULT_SKETCH_ERROR):
+    """Quantiles d'un tableau (NaN ignorés) : exacts jusqu'à `threshold` valeurs, esquisse au-delà"""
+    values = np.asarray(values)
+    if len(values) <= threshold:
+        return np.nanquantile(values, q) if len(values) > 0 else np.full(np.shape(q), np.nan)[()]
+    return QuantileSketch.from_values(values, error).quantile(q)
+
+
+def matrix_quantiles(matrix, q, threshold=SKETCH_THRESHOLD_ROWS, error=DEFAULT_SKETCH_ERROR):
+    """
+    Quantiles de chaque ligne d'une matrice (variables, transactions) : tableau (len(q), variables).
+
+    Sous le seuil, un seul appel `np.nanpercentile` pour toutes les
+    variables ; au-delà, une esquisse par variable.
+    """
+    q = np.atleast_1d(np.asarray(q, dtype=np.float64))
+    if matrix.shape[1] <= threshold:
+        return np.nanpercentile(matrix, q * 100, axis=1)
+    return np.array([QuantileSketch.from_values(row, error).quantile(q) for row in matrix]).T
+
+
+def describe_values(values, name=None, threshold=SKETCH_THRESHOLD_ROWS, error=DEFAULT_SKETCH_ERROR):
+    """Équivalent de `Series.describe()` d'un tableau, quartiles estimés au-delà du seuil"""
+    values = np.asarray(values)
+    count = len(values) - int(np.isnan(values).sum())
+    if count == 0:
+        stats = [0, np.nan, np.nan, np.nan, np.nan, np.nan, np.nan, np.nan]
+    else:
+        stats = [count, np.nanmean(values, dtype=np.float64),
+                 np.nanstd(values, dtype=np.float64, ddof=1) if count > 1 else np.nan, np.nanmin(values),
+                 *quantiles(values, [0.25, 0.5, 0.75], threshold, error), np.nanmax(values)]
+    return pd.Series(stats, index=['count', 'mean', 'std', 'min', '25%', '50%', '75%', 'max'], name=name)
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Index Triés pour les Filtres par Plage
+======================================
+
+Les curseurs du dashboard de fraude (montant, plage horaire) filtraient
+les transactions en construisant quatre masques booléens sur toutes les
+lignes à chaque interaction, puis en copiant le résultat.
+
+Ce module précalcule, une fois par dataset, l'ordre trié de chaque colonne
+filtrée. Une plage se résout alors par recherche dichotomique en un
+intervalle de numéros de lignes ; l'intersection de plusieurs plages part
+de la plus petite et vérifie les autres colonnes sur ses seules lignes.
+Le coût d'un filtre est en O(log n + k) au lieu de O(n), et le résultat est
+un tableau d'indices que les graphiques peuvent consommer directement.
+"""
+
+import numpy as np
+
+
+class SortedColumnIndex:
+    """Ordre trié d'une colonne numérique (NaN en fin de tri, jamais sélectionnés)"""
+
+    def __init__(self, values):
+        self.values = np.asarray(values)
+        self.order = np.argsort(self.values, kind='stable')
+        self.sorted_values = self.values[self.order]
+        # Les NaN sont triés en dernier : on les exclut des recherches
+        self.n_valid = int(len(self.values) - np.isnan(self.sorted_values).sum()) \
+            if self.sorted_values.dtype.kind == 'f' else len(self.values)
+
+    def bounds(self, low, high):
+        """Positions [début, fin) des valeurs comprises entre low et high (bornes incluses)"""
+        valid = self.sorted_values[:self.n_valid]
+        start = int(np.searchsorted(valid, low, side='left'))
+        stop = int(np.searchsorted(valid, high, side='right'))
+        return start, max(start, stop)
+
+    def count(self, low, high):
+        """Nombre de lignes dans la plage (O(log n))"""
+        start, stop = self.bounds(low, high)
+        return stop - start
+
+    def rows(self, low, high):
+        """Numéros des lignes dans la plage (ordre de la colonne triée)"""
+        start, stop = self.bounds(low, high)
+        return self.order[start:stop]
+
+
+class RangeFilterIndex:
+    """Index triés de plusieurs colonnes, pour des filtres par plages combinées"""
+
+    def __init__(self, columns):
+        self.indexes = {name: SortedColumnIndex(values) for name, values in columns.items()}
+        self.n_rows = len(next(iter(self.indexes.values())).values) if self.indexes else 0
+
+    @classmethod
+    def from_frame(cls, df, columns):
+        """Construit l'index des colonnes d'un DataFrame présentes dans `columns`"""
+        return cls({col: df[col].to_numpy() for col in columns if col in df.columns})
+
+    def select(self, ranges):
+        """
+        Numéros des lignes (triés) satisfaisant toutes les plages {colonne: (min, max)}.
+
+        La plage la plus sélective fournit les candidats (recherche
+        dichotomique) ; les autres colonnes ne sont lues que sur ces lignes.
+        """
+        ranges = {col: bounds for col, bounds in ranges.items() if bounds is not None}
+        if not ranges:
+            return np.arange(self.n_rows)
+
+        counts = {col: self.indexes[col].count(*bounds) for col, bounds in ranges.items()}
+        driver = min(counts, key=counts.get)
+        rows = self.indexes[driver].rows(*ranges[driver])
+
+        for col, (low, high) in ranges.items():
+            if col == driver or len(rows) == 0:
+                continue
+            values = self.indexes[col].values[rows]
+            rows = rows[(values >= low) & (values <= high)]
+
+        return np.sort(rows)
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Mesure de la Mémoire Résidente
+==============================
+
+Pic de mémoire résidente (RSS) du processus, remis à zéro au début de
+chaque exécution du dashboard pour mesurer le coût d'une interaction.
+
+Sous Linux, le pic (`VmHWM`) est lu dans `/proc/self/status` et remis à
+zéro via `/proc/self/clear_refs`. Ailleurs, on se replie sur
+`resource.getrusage` (pic depuis le démarrage, non réinitialisable ;
+`ru_maxrss` est en octets sous macOS, en Kio sous Linux).
+
+La mesure porte sur tout le processus : les sessions Streamlit
+concurrentes partagent le même pic et le remettent à zéro l'une pour
+l'autre.
+"""
+
+import os
+import sys
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+STATUS_PATH = "/proc/self/status"
+CLEAR_REFS_PATH = "/proc/self/clear_refs"
+
+
+def _read_status_kb(field):
+    try:
+        with open(STATUS_PATH, 'r') as f:
+            for line in f:
+                if line.startswith(field + ':'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def current_rss_mb():
+    """Mémoire résidente actuelle en Mo (None si indisponible)"""
+    kb = _read_status_kb('VmRSS')
+    return kb / 1024 if kb is not None else None
+
+
+def peak_rss_mb():
+    """Pic de mémoire résidente en Mo depuis la dernière remise à zéro"""
+    kb = _read_status_kb('VmHWM')
+    if kb is None and resource is not None:
+        kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        if sys.platform == 'darwin':
+            kb /= 1024
+    return kb / 1024 if kb is not None else None
+
+
+def reset_peak_rss():
+    """Remet le pic à la mémoire résidente actuelle ; retourne False si non supporté"""
+    try:
+        with open(CLEAR_REFS_PATH, 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+
+class PeakRSS:
+    """Contexte mesurant le pic de RSS d'un bloc : `with PeakRSS() as probe: ...; probe.peak_mb`"""
+
+    def __enter__(self):
+        self.resettable = reset_peak_rss()
+        self.start_mb = current_rss_mb()
+        self.peak_mb = None
+        return self
+
+    def __exit__(self, *exc):
+        self.peak_mb = peak_rss_mb()
+        return False
+
+    @property
+    def growth_mb(self):
+        """Croissance du pic par rapport à la mémoire de départ"""
+        if self.peak_mb is None or self.start_mb is None:
+            return None
+        return self.peak_mb - self.start_mb
+
+
+if __name__ == "__main__":
+    print(f"RSS actuelle: {current_rss_mb()} Mo, pic: {peak_rss_mb()} Mo, "
+          f"remise à zéro: {'oui' if reset_peak_rss() else 'non'} (pid {os.getpid()})")
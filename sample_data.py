@@ -0,0 +1,18 @@
+#!/usr/bin/env python3
+"""
+Données synthétiques partagées par les scripts de test
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def sample_transactions(n_rows=5000, seed=42):
+    """Crée des transactions synthétiques au format creditcard.csv"""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'Time': np.sort(rng.uniform(0, 172800, n_rows)).round(),
+        'V1': rng.normal(size=n_rows),
+        'Amount': rng.gamma(1.5, 60.0, n_rows).round(2),
+        'Class': rng.choice([0, 1], n_rows, p=[0.98, 0.02])
+    })
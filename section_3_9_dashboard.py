@@ -11,6 +11,8 @@ import streamlit as st
 import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
+from outlier_engine import OutlierScan
+from time_aggregates import TimeAggregates
 
 # Configuration de la page Streamlit
 def create_fraud_dashboard():
@@ -132,12 +134,9 @@ def create_fraud_dashboard():
         if 'Time' in df.columns:
             st.header("⏰ Analyse Temporelle des Fraudes")
             
-            # Analyse par heure
-            df_filtered['Hour'] = (df_filtered['Time'] / 3600).astype(int) % 24
-            hourly_stats = df_filtered.groupby('Hour').agg({
-                target_col: ['count', 'sum', 'mean']
-            }).reset_index()
-            hourly_stats.columns = ['Hour', 'Total', 'Fraudes', 'Taux_Fraude']
+            # Analyse par heure (un seul comptage par heure absolue et par classe)
+            time_aggregates = TimeAggregates.from_frame(df_filtered, target_col=target_col)
+            hourly_stats = time_aggregates.hourly_stats()
             
             col1, col2 = st.columns(2)
             
@@ -169,12 +168,9 @@ def create_fraud_dashboard():
             
             # Heatmap temporelle
             if len(df_filtered) > 0:
-                df_filtered['Day'] = (df_filtered['Time'] / (3600 * 24)).astype(int)
-                heatmap_data = df_filtered.groupby(['Day', 'Hour'])[target_col].sum().reset_index()
+                pivot_data = time_aggregates.day_hour_frauds()
                 
-                if len(heatmap_data) > 0:
-                    pivot_data = heatmap_data.pivot(index='Day', columns='Hour', values=target_col).fillna(0)
-                    
+                if len(pivot_data) > 0:
                     fig_heatmap = px.imshow(
                         pivot_data,
                         title="Heatmap des Fraudes (Jour vs Heure)",
@@ -229,17 +225,10 @@ def create_fraud_dashboard():
     with tab4:
         st.header("🔍 Détection d'Anomalies")
         
-        # Calcul des outliers avec IQR
-        Q1 = df_filtered['Amount'].quantile(0.25)
-        Q3 = df_filtered['Amount'].quantile(0.75)
-        IQR = Q3 - Q1
-        lower_bound = Q1 - 1.5 * IQR
-        upper_bound = Q3 + 1.5 * IQR
-        
-        outliers = df_filtered[
-            (df_filtered['Amount'] < lower_bound) | 
-            (df_filtered['Amount'] > upper_bound)
-        ]
+        # Outliers IQR de toutes les variables numériques (quartiles en un seul calcul)
+        scan = OutlierScan.from_frame(df_filtered.drop(columns=[target_col]), rule='iqr')
+        outlier_mask = scan.column_flags('Amount')
+        outliers = df_filtered[outlier_mask]
         
         col1, col2, col3 = st.columns(3)
         
@@ -259,13 +248,8 @@ def create_fraud_dashboard():
         
         # Scatter plot avec outliers
         if 'Time' in df_filtered.columns:
-            df_filtered['Is_Outlier'] = (
-                (df_filtered['Amount'] < lower_bound) | 
-                (df_filtered['Amount'] > upper_bound)
-            )
-            
             fig_scatter = px.scatter(
-                df_filtered.sample(min(10000, len(df_filtered))),  # Échantillon pour performance
+                df_filtered.assign(Is_Outlier=outlier_mask).sample(min(10000, len(df_filtered))),  # Échantillon pour performance
                 x='Time',
                 y='Amount',
                 color=target_col,
@@ -275,6 +259,10 @@ def create_fraud_dashboard():
                 color_discrete_sequence=['skyblue', 'salmon']
             )
             st.plotly_chart(fig_scatter, use_container_width=True)
+        
+        # Lift de fraude : taux de fraude des outliers de chaque variable / taux global
+        st.subheader("🧬 Outliers par Variable")
+        st.dataframe(scan.fraud_lift(df_filtered[target_col]).round(2))
     
     # Section de téléchargement des résultats
     st.markdown("---")
@@ -336,6 +324,8 @@ import matplotlib.pyplot as plt
 from scipy import stats
 from sklearn.preprocessing import StandardScaler
 from sklearn.decomposition import PCA
+from data_cache import read_csv_cached
+from data_loader import load_dataset
 
 # Configuration de la page
 st.set_page_config(
@@ -350,8 +340,9 @@ st.set_page_config(
 def load_data():
     """Charge les données de fraude"""
     try:
-        # Remplacez par le chemin vers votre fichier CSV
-        df = pd.read_csv("creditcard.csv")
+        # Remplacez par le chemin vers votre fichier CSV (par défaut : découverte
+        # automatique, types compacts et copie colonnaire en cache)
+        df, _, _ = load_dataset('fraud', path="creditcard.csv", reader=read_csv_cached)
         return df
     except FileNotFoundError:
         st.error("❌ Fichier de données non trouvé. Veuillez vérifier le chemin.")
@@ -88,22 +88,18 @@ if 'marketing_df' in locals():
         scaler = StandardScaler()
         X_scaled = scaler.fit_transform(X)
         
-        # Détermination nombre optimal clusters
-        from sklearn.metrics import silhouette_score
-        silhouette_scores = []
-        K_range = range(2, 8)
+        # Détermination nombre optimal clusters : un ajustement par k dans un pool de processus,
+        # silhouette sur un sous-échantillon stratifié par cluster (K-Means par mini-lots
+        # au-delà de 100 000 clients)
+        from segment_engine import optimal_k_search
+        optimal_k, k_metrics, optimal_fit = optimal_k_search(marketing_df, rfm_vars, k_values=range(2, 8))
         
-        for k in K_range:
-            kmeans = KMeans(n_clusters=k, random_state=42)
-            labels = kmeans.fit_predict(X_scaled)
-            silhouette_scores.append(silhouette_score(X_scaled, labels))
-        
-        optimal_k = K_range[np.argmax(silhouette_scores)]
+        print("⏱️ Qualité et durée par nombre de clusters :")
+        display(k_metrics.round(3))
         print(f"🎯 Nombre optimal de clusters : {optimal_k}")
         
-        # Segmentation finale
-        kmeans_final = KMeans(n_clusters=optimal_k, random_state=42)
-        marketing_df['Cluster'] = kmeans_final.fit_predict(X_scaled)
+        # Segmentation finale (déjà calculée pendant la recherche)
+        marketing_df['Cluster'] = optimal_fit['labels']
         
         print("✅ Segmentation terminée")
         
@@ -243,14 +243,11 @@ if 'fraud_df' in locals() and 'Amount' in fraud_df.columns:
     print("🚨 DÉTECTION D'ANOMALIES")
     print("=" * 25)
     
-    # Méthode IQR pour détecter les outliers
-    Q1 = fraud_df['Amount'].quantile(0.25)
-    Q3 = fraud_df['Amount'].quantile(0.75)
-    IQR = Q3 - Q1
-    lower_bound = Q1 - 1.5 * IQR
-    upper_bound = Q3 + 1.5 * IQR
+    # Méthode IQR sur toutes les variables numériques (quartiles en un seul calcul)
+    from outlier_engine import OutlierScan
+    scan = OutlierScan.from_frame(fraud_df.drop(columns=[target_col]), rule='iqr')
     
-    outliers = fraud_df[(fraud_df['Amount'] < lower_bound) | (fraud_df['Amount'] > upper_bound)]
+    outliers = fraud_df[scan.column_flags('Amount')]
     print(f"📊 Nombre d'outliers détectés : {len(outliers)} ({len(outliers)/len(fraud_df)*100:.2f}%)")
     
     # Analyse des outliers par type de transaction
@@ -261,6 +258,11 @@ if 'fraud_df' in locals() and 'Amount' in fraud_df.columns:
     print(f"🎯 Taux de fraude global : {normal_fraud_rate:.4f}")
     print(f"📈 Ratio : {outlier_fraud_rate/normal_fraud_rate:.2f}x plus élevé")
     
+    # Lift de fraude des outliers de chaque variable et transactions atypiques sur plusieurs variables
+    print("\\n🧬 Lift de fraude par variable :")
+    print(scan.fraud_lift(fraud_df[target_col]).head(10).round(2).to_string(index=False))
+    print(f"🎯 Transactions atypiques sur 3 variables ou plus : {(scan.row_counts >= 3).sum():,}")
+    
     # Visualisation des anomalies
     fig, axes = plt.subplots(1, 3, figsize=(18, 6))
     
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Segmentation Client en Lot
+==========================
+
+Ajuste une fois le modèle de segmentation RFM et l'enregistre, puis
+affecte de nouveaux fichiers clients au segment le plus proche, bloc par
+bloc, sans réajustement :
+
+    python segment_customers.py fit marketing_campaign.csv --clusters 4
+    python segment_customers.py assign nouveaux_clients.csv --model .eda_cache/segment_model.json --output segments.csv
+    python segment_customers.py update marketing_campaign.csv
+
+`update` rafraîchit le modèle après ajout ou modification de clients :
+les centres enregistrés sont mis à jour à partir des seuls clients
+nouveaux ou modifiés, avec réajustement complet en cas de dérive.
+
+Pour `fit` et `update`, le modèle est lu et écrit par défaut dans
+`.eda_cache/segment_model.json` à côté du fichier d'apprentissage
+(`--model` pour un autre chemin), avec l'instantané des clients
+(`segment_model.snapshot.npz`). `assign` affecte des fichiers rangés
+n'importe où : le chemin du modèle y est obligatoire.
+"""
+
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from segment_engine import (RFM_COLUMNS, SEGMENT_CHUNKSIZE, SegmentModel, assign_segments, customer_features,
+                            default_model_path, describe_refresh, fit_segments, load_snapshot, refresh_segments,
+                            save_snapshot, snapshot_path)
+
+
+def print_segments(model, labels):
+    """Effectif de chaque segment"""
+    for segment, (name, count) in enumerate(zip(model.names, np.bincount(labels, minlength=model.n_clusters))):
+        print(f"   Segment {segment} ({name}) : {count:,} clients")
+
+
+def fit_command(args):
+    """Ajuste et enregistre le modèle de segmentation"""
+    model_path = args.model or default_model_path(args.customers)
+    start = time.perf_counter()
+    # Fichier lu une seule fois : la même matrice sert à l'ajustement et à l'instantané
+    ids, X = customer_features(args.customers, RFM_COLUMNS, chunksize=args.chunksize)
+    model, labels = fit_segments(pd.DataFrame(X, columns=RFM_COLUMNS), RFM_COLUMNS, args.clusters,
+                                 chunksize=args.chunksize)
+    model.save(model_path)
+    save_snapshot(snapshot_path(model_path), model, ids, X, labels)
+
+    print(f"✅ Modèle {model.method} ajusté sur {model.n_rows:,} clients en {time.perf_counter() - start:.1f}s")
+    print_segments(model, labels)
+    print(f"💾 Modèle enregistré : {model_path}")
+
+
+def update_command(args):
+    """Met à jour le modèle enregistré avec les clients ajoutés ou modifiés depuis le dernier passage"""
+    model_path = args.model or default_model_path(args.customers)
+    if not os.path.exists(model_path):
+        print(f"❌ Modèle introuvable : {model_path} (lancez d'abord la commande fit)")
+        return 1
+    snapshot = load_snapshot(snapshot_path(model_path))
+    if snapshot is None:
+        print(f"❌ Instantané introuvable : {snapshot_path(model_path)} (relancez la commande fit)")
+        return 1
+
+    start = time.perf_counter()
+    ids, X = customer_features(args.customers, RFM_COLUMNS, chunksize=args.chunksize)
+    model, labels, report = refresh_segments(SegmentModel.load(model_path), ids, X, snapshot)
+    print(describe_refresh(report))
+    if report['mode'] != 'inchangé':
+        model.save(model_path)
+        save_snapshot(snapshot_path(model_path), model, ids, X, labels)
+
+    print(f"✅ {len(X):,} clients segmentés en {time.perf_counter() - start:.1f}s (lecture comprise)")
+    print_segments(model, labels)
+    return 0
+
+
+def assign_command(args):
+    """Affecte les clients d'un fichier aux segments du modèle enregistré"""
+    if not os.path.exists(args.model):
+        print(f"❌ Modèle introuvable : {args.model} (lancez d'abord la commande fit)")
+        return 1
+    model = SegmentModel.load(args.model)
+    output = args.output or f"{os.path.splitext(args.customers)[0]}_segments.csv"
+
+    start = time.perf_counter()
+    counts = np.zeros(model.n_clusters, dtype=np.int64)
+    with open(output, 'w', encoding='utf-8', newline='') as f:
+        for i, assigned in enumerate(assign_segments(model, args.customers, chunksize=args.chunksize)):
+            assigned.to_csv(f, index=False, header=(i == 0))
+            counts += np.bincount(assigned['Segment'].to_numpy(), minlength=model.n_clusters)
+
+    elapsed = time.perf_counter() - start
+    print(f"✅ {counts.sum():,} clients affectés en {elapsed:.1f}s ({counts.sum() / max(elapsed, 1e-9):,.0f} clients/s)")
+    for segment, (name, count) in enumerate(zip(model.names, counts)):
+        print(f"   Segment {segment} ({name}) : {count:,} clients")
+    print(f"💾 Segments enregistrés : {output}")
+    return 0
+
+
+def main(argv=None):
+    """Point d'entrée en ligne de commande"""
+    parser = argparse.ArgumentParser(description="Segmentation RFM des clients en lot")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    fit_parser = commands.add_parser('fit', help="ajuste et enregistre le modèle")
+    fit_parser.add_argument('customers', help="fichier CSV des clients d'apprentissage")
+    fit_parser.add_argument('--clusters', type=int, default=4, help="nombre de segments (4 par défaut)")
+    fit_parser.set_defaults(handler=fit_command)
+
+    assign_parser = commands.add_parser('assign', help="affecte des clients aux segments du modèle")
+    assign_parser.add_argument('customers', help="fichier CSV des clients à affecter")
+    assign_parser.add_argument('--output', help="fichier CSV de sortie (<clients>_segments.csv par défaut)")
+    assign_parser.add_argument('--model', required=True, help="chemin du modèle enregistré par la commande fit")
+    assign_parser.set_defaults(handler=assign_command)
+
+    update_parser = commands.add_parser('update', help="met à jour le modèle avec les clients ajoutés ou modifiés")
+    update_parser.add_argument('customers', help="fichier CSV complet des clients")
+    update_parser.set_defaults(handler=update_command)
+
+    for sub_parser in (fit_parser, update_parser):
+        sub_parser.add_argument('--model', help="chemin du modèle (.eda_cache/segment_model.json par défaut)")
+    for sub_parser in (fit_parser, assign_parser, update_parser):
+        sub_parser.add_argument('--chunksize', type=int, default=SEGMENT_CHUNKSIZE, help="clients lus par bloc")
+
+    args = parser.parse_args(argv)
+    return args.handler(args) or 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,796 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Segmentation Client à Grande Échelle
+====================================
+
+`perform_clustering()` (dashboard marketing) et `prepare_marketing_data()`
+(dashboard unifié) ajustaient un `KMeans(n_init=10)` complet à chaque
+appel : une fraction de seconde sur 2 240 clients, plusieurs minutes sur
+un extrait CRM de plusieurs millions de lignes.
+
+`fit_segments` choisit la méthode selon le nombre de clients :
+- jusqu'à `MINIBATCH_THRESHOLD_ROWS`, K-Means complet (mêmes résultats
+  qu'avant) ;
+- au-delà, K-Means par mini-lots, la source (DataFrame ou CSV lu par
+  blocs depuis le disque) étant parcourue trois fois :
+  1. médianes (esquisses KLL), moments de standardisation et réservoir
+     uniforme de clients (un CSV n'est analysé qu'à cette passe, ses
+     variables étant déversées dans un fichier binaire temporaire) ;
+  2. centres initialisés par un K-Means complet sur le réservoir, puis
+     mis à jour par `partial_fit` sur des mini-lots de chaque bloc ;
+  3. affectation vectorisée de chaque client au centre le plus proche.
+
+L'écart d'inertie avec un K-Means complet est mesuré sur le réservoir
+(`inertia_gap`) pour juger de la qualité de la bascule.
+
+`SegmentSweep` calcule en arrière-plan, dans un pool de processus, les
+segmentations de toutes les valeurs de k du curseur avec leurs
+indicateurs de qualité (inertie, Calinski-Harabasz, silhouette sur
+échantillon stratifié par segment) : changer de k devient une simple
+lecture. `optimal_k_search` s'en sert pour choisir k par la silhouette.
+
+Les segments sont numérotés par valeur client décroissante (dépenses et
+achats élevés, récence faible) : Champions, Loyaux, Potentiels, Endormis
+pour k = 4. Le modèle (médianes, standardisation, centres, noms) est
+enregistré en JSON (`SegmentModel.save`) et affecte de nouveaux clients,
+lus par blocs, au centre le plus proche en O(n·k) sans réajustement
+(`assign_segments`, script `segment_customers.py`).
+
+Quand le fichier clients grossit, `refresh_segments` repart des centres
+enregistrés : les contributions des clients modifiés ou disparus sont
+retirées, les clients nouveaux ou modifiés sont intégrés par mini-lots,
+puis tous les clients sont réaffectés. Un réajustement complet n'a lieu
+que si un centre se déplace ou si l'inertie par client augmente au-delà
+des seuils de dérive. Un instantané des clients (identifiants,
+variables, segments) est enregistré à côté du modèle pour détecter ces
+changements.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from sklearn.cluster import KMeans, MiniBatchKMeans
+from sklearn.metrics import calinski_harabasz_score, silhouette_samples
+from sklearn.preprocessing import StandardScaler
+
+from data_cache import default_cache_dir
+from data_loader import sniff_csv
+from data_schema import ensure_numeric, schema_read_kwargs
+from quantile_sketch import QuantileSketch
+from streaming_profiler import RunningStats
+
+RFM_COLUMNS = ['Recency', 'Total_Purchases', 'Total_Spending']
+
+# Noms des segments par valeur client décroissante (pour k = 4)
+SEGMENT_NAMES = ['Champions', 'Loyaux', 'Potentiels', 'Endormis']
+
+SEGMENT_MODEL_NAME = "segment_model.json"
+SEGMENT_MODEL_VERSION = 1
+
+# Seuils de dérive de la mise à jour incrémentale : déplacement maximal d'un centre
+# (en écarts-types) et hausse relative de l'inertie moyenne par client
+MAX_CENTROID_SHIFT = 0.25
+MAX_INERTIA_JUMP = 0.10
+WARM_START_PASSES = 3
+
+MINIBATCH_THRESHOLD_ROWS = 100_000
+SEGMENT_CHUNKSIZE = 100_000
+MINIBATCH_SIZE = 4096
+
+# Clients conservés pour initialiser les centres et mesurer l'écart d'inertie
+REFERENCE_SAMPLE_SIZE = 20_000
+
+# Valeurs de k précalculées (curseur « Nombre de clusters ») et taille d'échantillon de la silhouette
+K_RANGE = range(2, 9)
+SILHOUETTE_SAMPLE_SIZE = 10_000
+MIN_SILHOUETTE_PER_CLUSTER = 100
+
+
+def spending_columns(columns):
+    """Colonnes de dépenses (Mnt*)"""
+    return [col for col in columns if 'Mnt' in col]
+
+
+def purchase_columns(columns):
+    """Colonnes de nombres d'achats (Num*Purchases)"""
+    return [col for col in columns if 'Num' in col and 'Purchases' in col]
+
+
+def add_rfm_totals(df):
+    """Ajoute Total_Spending et Total_Purchases (sommes des dépenses et des achats) quand leurs colonnes existent"""
+    spending_vars = spending_columns(df.columns)
+    if spending_vars:
+        ensure_numeric(df, spending_vars)
+        df['Total_Spending'] = df[spending_vars].sum(axis=1)
+
+    purchase_vars = purchase_columns(df.columns)
+    if purchase_vars:
+        ensure_numeric(df, purchase_vars)
+        df['Total_Purchases'] = df[purchase_vars].sum(axis=1)
+    return df
+
+
+def iter_feature_chunks(source, columns, chunksize=SEGMENT_CHUNKSIZE, keep=()):
+    """
+    Blocs de lignes contenant les variables de segmentation.
+
+    `source` est un DataFrame (découpé sans copie) ou le chemin d'un CSV
+    marketing, lu par blocs avec son dialecte et son schéma ; seules les
+    colonnes utiles (et celles de `keep`, comme l'identifiant client) sont
+    lues et les totaux RFM sont calculés par bloc.
+    """
+    if isinstance(source, pd.DataFrame):
+        for start in range(0, len(source), chunksize):
+            yield source.iloc[start:start + chunksize]
+        return
+
+    dialect = sniff_csv(source)
+    header = dialect['columns']
+    usecols = [col for col in header
+               if col in columns or col in keep or col in spending_columns(header) or col in purchase_columns(header)]
+    # Entiers du schéma lus en flottants : une valeur manquante dans un bloc ne fait pas échouer la lecture
+    # (les colonnes conservées telles quelles, comme l'identifiant, gardent le type détecté)
+    dtype = {col: 'float32' if pd.api.types.is_integer_dtype(kind) else kind
+             for col, kind in schema_read_kwargs('marketing', usecols)['dtype'].items() if col not in keep}
+    chunks = pd.read_csv(source, sep=dialect['delimiter'], encoding=dialect['encoding'],
+                         usecols=usecols, dtype=dtype, chunksize=chunksize)
+    for chunk in chunks:
+        yield add_rfm_totals(chunk)
+
+
+def chunk_matrix(chunk, columns):
+    """Matrice (clients, variables) float64 d'un bloc, valeurs non numériques en NaN"""
+    return np.column_stack([
+        pd.to_numeric(chunk[col], errors='coerce').to_numpy(dtype=np.float64) for col in columns
+    ])
+
+
+def nearest_centers(X, centers):
+    """Centre le plus proche de chaque ligne et distance au carré, en O(n·k)"""
+    distances = (
+        np.einsum('ij,ij->i', X, X)[:, None]
+        - 2 * X @ centers.T
+        + np.einsum('ij,ij->i', centers, centers)[None, :]
+    )
+    labels = distances.argmin(axis=1)
+    return labels, np.maximum(distances[np.arange(len(X)), labels], 0)
+
+
+class SegmentModel:
+    """Imputation, standardisation et centres d'une segmentation K-Means"""
+
+    def __init__(self, columns, medians, mean, scale, centers, inertia=np.nan, method='kmeans',
+                 n_rows=0, inertia_gap=None, names=None):
+        self.columns = list(columns)
+        self.medians = np.asarray(medians, dtype=np.float64)
+        self.mean = np.asarray(mean, dtype=np.float64)
+        self.scale = np.asarray(scale, dtype=np.float64)
+        self.centers = np.asarray(centers, dtype=np.float64)  # espace standardisé
+        self.inertia = inertia
+        self.method = method
+        self.n_rows = n_rows
+        self.inertia_gap = inertia_gap  # comparaison au K-Means complet sur le réservoir (mini-lots)
+        self.names = list(names) if names is not None else [f"Segment {i}" for i in range(len(self.centers))]
+
+    @property
+    def n_clusters(self):
+        return len(self.centers)
+
+    def segment_names(self, labels):
+        """Nom du segment de chaque client"""
+        return np.asarray(self.names, dtype=object)[labels]
+
+    def to_dict(self):
+        """Paramètres du modèle sérialisables en JSON"""
+        return {
+            'version': SEGMENT_MODEL_VERSION,
+            'columns': self.columns,
+            'medians': self.medians.tolist(),
+            'mean': self.mean.tolist(),
+            'scale': self.scale.tolist(),
+            'centers': self.centers.tolist(),
+            'names': self.names,
+            'inertia': self.inertia,
+            'method': self.method,
+            'n_rows': self.n_rows,
+            'inertia_gap': self.inertia_gap,
+        }
+
+    @classmethod
+    def from_dict(cls, params):
+        """Modèle reconstruit depuis `to_dict` ; ValueError si le format n'est pas reconnu"""
+        if params.get('version') != SEGMENT_MODEL_VERSION:
+            raise ValueError(f"Version de modèle de segmentation non supportée : {params.get('version')}")
+        return cls(params['columns'], params['medians'], params['mean'], params['scale'], params['centers'],
+                   inertia=params['inertia'], method=params['method'], n_rows=params['n_rows'],
+                   inertia_gap=params['inertia_gap'], names=params['names'])
+
+    def save(self, path):
+        """Enregistre le modèle en JSON (écriture atomique : un lecteur ne voit jamais un fichier partiel)"""
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=2)
+        os.replace(tmp_path, path)
+        return path
+
+    @classmethod
+    def load(cls, path):
+        """Modèle enregistré par `save`"""
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls.from_dict(json.load(f))
+
+    def scale_matrix(self, X):
+        """Remplace les valeurs manquantes par les médianes et standardise (copie)"""
+        X = np.where(np.isnan(X), self.medians, X)
+        return (X - self.mean) / self.scale
+
+    def transform(self, frame):
+        """Variables standardisées d'un DataFrame ou d'un bloc"""
+        return self.scale_matrix(chunk_matrix(frame, self.columns))
+
+    def predict(self, frame):
+        """Segment de chaque client (centre le plus proche)"""
+        return nearest_centers(self.transform(frame), self.centers)[0].astype(np.int32)
+
+
+def order_segments(model, labels):
+    """
+    Renumérote les segments par valeur client décroissante et les nomme.
+
+    La valeur d'un centre est la somme de ses coordonnées standardisées,
+    la récence comptant négativement : les numéros et les noms ne
+    dépendent plus de l'ordre arbitraire des centres du K-Means.
+    """
+    signs = np.array([-1.0 if col == 'Recency' else 1.0 for col in model.columns])
+    order = np.argsort(-(model.centers @ signs), kind='stable')
+    rank = np.empty_like(order)
+    rank[order] = np.arange(len(order))
+    model.centers = model.centers[order]
+    model.names = (list(SEGMENT_NAMES) if len(order) == len(SEGMENT_NAMES)
+                   else [f"Segment {i}" for i in range(len(order))])
+    return rank[labels].astype(np.int32)
+
+
+def fill_medians(X):
+    """Médianes des colonnes (0 pour une colonne vide) et matrice imputée"""
+    with np.errstate(all='ignore'):
+        medians = np.nan_to_num(np.nanmedian(X, axis=0)) if len(X) else np.zeros(X.shape[1])
+    return medians, np.where(np.isnan(X), medians, X)
+
+
+def fit_full_batch(df, columns, n_clusters, random_state=42):
+    """K-Means complet en mémoire (comportement historique des dashboards)"""
+    X = chunk_matrix(df, columns)
+    medians, X = fill_medians(X)
+    scaler = StandardScaler().fit(X)
+    kmeans = KMeans(n_clusters=n_clusters, random_state=random_state, n_init=10)
+    labels = kmeans.fit_predict(scaler.transform(X)).astype(np.int32)
+    model = SegmentModel(columns, medians, scaler.mean_, scaler.scale_, kmeans.cluster_centers_,
+                         inertia=float(kmeans.inertia_), method='kmeans', n_rows=len(X))
+    return model, order_segments(model, labels)
+
+
+def iter_feature_matrices(source, columns, chunksize=SEGMENT_CHUNKSIZE):
+    """Matrices (clients, variables) des blocs d'une source"""
+    for chunk in iter_feature_chunks(source, columns, chunksize):
+        yield chunk_matrix(chunk, columns)
+
+
+def _spilled_matrices(path, n_columns, chunksize):
+    """Relit par blocs les variables déversées sur disque lors de la première passe"""
+    with open(path, 'rb') as f:
+        while True:
+            X = np.fromfile(f, dtype=np.float64, count=chunksize * n_columns)
+            if len(X) == 0:
+                return
+            yield X.reshape(-1, n_columns)
+
+
+def _scan_statistics(matrices, n_columns, sample_size, seed, spill=None):
+    """
+    Passe 1 : nombre de lignes, moments et esquisses de médiane par
+    variable, réservoir uniforme de lignes brutes ; les blocs sont
+    recopiés dans `spill` (fichier binaire ouvert) s'il est fourni.
+    """
+    n_rows = 0
+    stats = [RunningStats() for _ in range(n_columns)]
+    sketches = [QuantileSketch() for _ in range(n_columns)]
+    rng = np.random.default_rng(seed)
+    sample, sample_keys = np.empty((0, n_columns)), np.empty(0)
+
+    for X in matrices:
+        n_rows += len(X)
+        for j in range(n_columns):
+            stats[j].update(X[:, j])
+            sketches[j].update(X[:, j])
+        if spill is not None:
+            spill.write(np.ascontiguousarray(X).tobytes())
+
+        # Les `sample_size` plus petites clés aléatoires forment un échantillon uniforme
+        sample = np.concatenate((sample, X))
+        sample_keys = np.concatenate((sample_keys, rng.random(len(X))))
+        if len(sample) > sample_size:
+            keep = np.argpartition(sample_keys, sample_size)[:sample_size]
+            sample, sample_keys = sample[keep], sample_keys[keep]
+
+    return n_rows, stats, sketches, sample
+
+
+def inertia_gap(centers, X_scaled, n_clusters, random_state=42):
+    """
+    Inerties, sur les mêmes lignes standardisées, des centres fournis et
+    d'un K-Means complet (n_init=10) ; 'gap' est l'écart relatif.
+    """
+    reference = KMeans(n_clusters=n_clusters, random_state=random_state, n_init=10).fit(X_scaled)
+    inertia = float(nearest_centers(X_scaled, centers)[1].sum())
+    full = float(reference.inertia_)
+    return {'inertia': inertia, 'full_batch': full, 'gap': (inertia - full) / full if full > 0 else 0.0}
+
+
+def fit_minibatch(source, columns, n_clusters, chunksize=SEGMENT_CHUNKSIZE, batch_size=MINIBATCH_SIZE,
+                  sample_size=REFERENCE_SAMPLE_SIZE, random_state=42):
+    """
+    K-Means par mini-lots sur une source lue par blocs (DataFrame ou chemin CSV), en trois passes.
+
+    Un CSV n'est analysé qu'une fois : ses variables de segmentation sont
+    déversées dans un fichier binaire temporaire, relu par blocs aux passes
+    suivantes.
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        if isinstance(source, pd.DataFrame):
+            n_rows, stats, sketches, sample = _scan_statistics(
+                iter_feature_matrices(source, columns, chunksize), len(columns), sample_size, random_state)
+
+            def matrices():
+                return iter_feature_matrices(source, columns, chunksize)
+        else:
+            spill_path = os.path.join(tmp, 'features.f8')
+            with open(spill_path, 'wb') as spill:
+                n_rows, stats, sketches, sample = _scan_statistics(
+                    iter_feature_matrices(source, columns, chunksize), len(columns), sample_size, random_state,
+                    spill=spill)
+
+            def matrices():
+                return _spilled_matrices(spill_path, len(columns), chunksize)
+
+        if n_rows == 0:
+            raise ValueError("Aucun client à segmenter")
+        medians = np.array([np.nan_to_num(sketch.quantile(0.5)) for sketch in sketches])
+
+        # Moments des colonnes imputées : les valeurs manquantes forment un bloc égal à la médiane
+        mean, scale = np.empty(len(columns)), np.empty(len(columns))
+        for j, column_stats in enumerate(stats):
+            filled = RunningStats()
+            filled.count, filled.mean = n_rows - column_stats.count, medians[j]
+            filled.merge(column_stats)
+            mean[j] = filled.mean
+            std = np.sqrt(filled.m2 / filled.count)
+            scale[j] = std if std > 0 else 1.0
+
+        model = SegmentModel(columns, medians, mean, scale, np.empty((0, len(columns))), method='minibatch')
+
+        # Passe 2 : centres initiaux sur le réservoir, puis mises à jour par mini-lots
+        sample_scaled = model.scale_matrix(sample)
+        init = KMeans(n_clusters=n_clusters, random_state=random_state, n_init=10).fit(sample_scaled)
+        minibatch = MiniBatchKMeans(n_clusters=n_clusters, init=init.cluster_centers_, n_init=1,
+                                    batch_size=batch_size, random_state=random_state)
+        for X in matrices():
+            X = model.scale_matrix(X)
+            for start in range(0, len(X), batch_size):
+                minibatch.partial_fit(X[start:start + batch_size])
+        model.centers = minibatch.cluster_centers_
+
+        # Passe 3 : affectation vectorisée et inertie totale
+        labels = np.empty(n_rows, dtype=np.int32)
+        inertia, offset = 0.0, 0
+        for X in matrices():
+            chunk_labels, distances = nearest_centers(model.scale_matrix(X), model.centers)
+            labels[offset:offset + len(X)] = chunk_labels
+            inertia += float(distances.sum())
+            offset += len(X)
+
+    model.inertia, model.n_rows = inertia, n_rows
+    model.inertia_gap = inertia_gap(model.centers, sample_scaled, n_clusters, random_state)
+    return model, order_segments(model, labels)
+
+
+def count_rows(source, chunksize=SEGMENT_CHUNKSIZE):
+    """Nombre de clients d'une source (lignes d'un DataFrame, ou d'un CSV sans analyser les champs)"""
+    if isinstance(source, pd.DataFrame):
+        return len(source)
+    with open(source, 'rb') as f:
+        newlines = sum(block.count(b'\n') for block in iter(lambda: f.read(1 << 20), b''))
+    return max(newlines - 1, 0)
+
+
+def fit_segments(source, columns, n_clusters, method='auto', threshold=MINIBATCH_THRESHOLD_ROWS,
+                 chunksize=SEGMENT_CHUNKSIZE, random_state=42):
+    """
+    Segmentation K-Means d'une base clients : retourne (SegmentModel, segments).
+
+    `method` vaut 'kmeans', 'minibatch' ou 'auto' (mini-lots au-delà de
+    `threshold` clients). Un chemin CSV n'est jamais chargé en entier en
+    mode mini-lots.
+    """
+    if method == 'auto':
+        method = 'minibatch' if count_rows(source) > threshold else 'kmeans'
+    if method == 'minibatch':
+        return fit_minibatch(source, columns, n_clusters, chunksize=chunksize, random_state=random_state)
+    if method != 'kmeans':
+        raise ValueError(f"Méthode de segmentation inconnue : {method}")
+    df = source if isinstance(source, pd.DataFrame) else pd.concat(iter_feature_chunks(source, columns, chunksize))
+    return fit_full_batch(df, columns, n_clusters, random_state)
+
+
+def default_model_path(data_path):
+    """Emplacement par défaut du modèle de segmentation : `.eda_cache/` à côté du fichier clients"""
+    return os.path.join(default_cache_dir(data_path), SEGMENT_MODEL_NAME)
+
+
+def snapshot_path(model_path):
+    """Instantané des clients associé à un modèle enregistré"""
+    return f"{os.path.splitext(model_path)[0]}.snapshot.npz"
+
+
+def save_snapshot(path, model, ids, X, labels):
+    """
+    Enregistre identifiants, variables brutes et segments des clients (écriture atomique).
+
+    Les sommes (variables standardisées) et effectifs exacts de chaque
+    segment sont enregistrés avec eux : les centres d'un K-Means par
+    mini-lots ne sont que des estimations des moyennes, et la mise à jour
+    incrémentale repart de ces sommes. Les identifiants texte sont
+    enregistrés en chaînes de longueur fixe (relisibles sans pickle).
+    """
+    if ids.dtype == object:
+        ids = ids.astype(str)
+    sums, counts = segment_sums(model, X, labels)
+    tmp_path = f"{path}.tmp.npz"
+    np.savez(tmp_path, ids=ids, features=X, labels=labels, sums=sums, counts=counts)
+    os.replace(tmp_path, path)
+
+
+def load_snapshot(path):
+    """
+    (identifiants, variables, segments, sommes, effectifs) enregistrés par `save_snapshot`.
+
+    Retourne None si l'instantané n'existe pas ; un fichier illisible ou
+    incomplet lève une erreur.
+    """
+    if not os.path.exists(path):
+        return None
+    with np.load(path) as arrays:
+        return tuple(arrays[name] for name in ('ids', 'features', 'labels', 'sums', 'counts'))
+
+
+def customer_features(source, columns, id_col='ID', chunksize=SEGMENT_CHUNKSIZE):
+    """
+    Identifiants et matrice (clients, variables) d'une source (DataFrame ou CSV lu par blocs).
+
+    Sans colonne d'identifiant (ou avec des identifiants en double), la
+    position de la ligne en tient lieu (fichier auquel on ne fait
+    qu'ajouter des lignes).
+    """
+    ids, matrices = [], []
+    for chunk in iter_feature_chunks(source, columns, chunksize, keep=(id_col,)):
+        matrices.append(chunk_matrix(chunk, columns))
+        if id_col in chunk.columns:
+            ids.append(chunk[id_col].to_numpy())
+    X = np.concatenate(matrices) if matrices else np.empty((0, len(columns)))
+    ids = np.concatenate(ids) if ids else None
+    if ids is not None and ids.dtype == object:
+        # Identifiants texte comparés et enregistrés en chaînes de longueur fixe
+        ids = ids.astype(str)
+    if ids is not None and len(np.unique(ids)) < len(ids):
+        print(f"⚠️ Identifiants {id_col} non uniques : position des lignes utilisée à la place")
+        ids = None
+    return (np.arange(len(X)) if ids is None else ids), X
+
+
+def _group_sums(X, labels, k):
+    """Somme des lignes de chaque segment, (k, variables)"""
+    return np.column_stack([np.bincount(labels, weights=X[:, j], minlength=k) for j in range(X.shape[1])])
+
+
+def segment_sums(model, X, labels, chunksize=SEGMENT_CHUNKSIZE):
+    """Sommes des variables standardisées et effectifs de chaque segment, par blocs"""
+    sums = np.zeros((model.n_clusters, X.shape[1]))
+    for start in range(0, len(X), chunksize):
+        sums += _group_sums(model.scale_matrix(X[start:start + chunksize]), labels[start:start + chunksize],
+                            model.n_clusters)
+    return sums, np.bincount(labels, minlength=model.n_clusters).astype(np.float64)
+
+
+def _assign_all(model, X, chunksize=SEGMENT_CHUNKSIZE):
+    """Segments et inertie totale de tous les clients, par blocs"""
+    labels = np.empty(len(X), dtype=np.int32)
+    inertia = 0.0
+    for start in range(0, len(X), chunksize):
+        chunk_labels, distances = nearest_centers(model.scale_matrix(X[start:start + chunksize]), model.centers)
+        labels[start:start + chunksize] = chunk_labels
+        inertia += float(distances.sum())
+    return labels, inertia
+
+
+def refresh_segments(model, ids, X, snapshot, max_shift=MAX_CENTROID_SHIFT, max_inertia_jump=MAX_INERTIA_JUMP,
+                     passes=WARM_START_PASSES, batch_size=MINIBATCH_SIZE, random_state=42):
+    """
+    Met à jour une segmentation à partir de ses centres et de l'instantané précédent des clients.
+
+    Les clients modifiés ou disparus sont retirés des sommes exactes par
+    segment enregistrées dans l'instantané,
+    les clients nouveaux ou modifiés (seuls à être parcourus) sont
+    affectés par mini-lots avec mise à jour des centres, en `passes`
+    passes au plus. Si un centre se déplace de plus de `max_shift` ou si
+    l'inertie moyenne par client augmente de plus de `max_inertia_jump`,
+    la segmentation est réajustée entièrement.
+
+    Retourne (SegmentModel, segments, rapport) ; le rapport donne le mode
+    ('inchangé', 'incrémental' ou 'réajustement'), les nombres de clients
+    nouveaux, modifiés et retirés, le déplacement maximal des centres et
+    la hausse d'inertie.
+    """
+    start_time = time.perf_counter()
+    previous_ids, previous_X, previous_labels, previous_sums, previous_counts = snapshot
+    k = model.n_clusters
+
+    # Correspondance des clients actuels avec l'instantané (identifiants triés)
+    order = np.argsort(previous_ids, kind='stable')
+    positions = np.clip(np.searchsorted(previous_ids[order], ids), 0, max(len(order) - 1, 0))
+    found = (previous_ids[order][positions] == ids) if len(order) else np.zeros(len(ids), dtype=bool)
+    previous_rows = order[positions] if len(order) else np.zeros(len(ids), dtype=np.intp)
+    before = previous_X[previous_rows]
+    same = found & ((before == X) | (np.isnan(before) & np.isnan(X))).all(axis=1)
+    changed = found & ~same
+    new = ~found
+    kept = np.zeros(len(previous_ids), dtype=bool)
+    kept[previous_rows[found]] = True
+
+    report = {'mode': 'inchangé', 'new': int(new.sum()), 'changed': int(changed.sum()),
+              'removed': int((~kept).sum()), 'centroid_shift': 0.0, 'inertia_jump': 0.0}
+    if not (new.any() or changed.any() or report['removed']):
+        report['seconds'] = time.perf_counter() - start_time
+        return model, previous_labels[previous_rows].astype(np.int32), report
+
+    # Sommes et effectifs des segments, sans les clients modifiés ou disparus
+    counts = previous_counts.astype(np.float64)
+    sums = previous_sums.astype(np.float64)
+    outgoing = np.concatenate((previous_rows[changed], np.flatnonzero(~kept)))
+    outgoing_labels = previous_labels[outgoing]
+    counts -= np.bincount(outgoing_labels, minlength=k)
+    sums -= _group_sums(model.scale_matrix(previous_X[outgoing]), outgoing_labels, k)
+    centers = np.where(counts[:, None] > 0, sums / np.maximum(counts, 1)[:, None], model.centers)
+
+    # Mini-lots sur les clients nouveaux et modifiés : chaque client compte une fois,
+    # dans le segment le plus proche des centres courants
+    delta = model.scale_matrix(X[new | changed])
+    assigned = np.full(len(delta), -1)
+    shuffled = np.random.default_rng(random_state).permutation(len(delta))
+    for _ in range(passes):
+        moved = 0
+        for start in range(0, len(delta), batch_size):
+            batch = shuffled[start:start + batch_size]
+            labels = nearest_centers(delta[batch], centers)[0]
+            move = labels != assigned[batch]
+            if not move.any():
+                continue
+            leaving = assigned[batch][move]
+            leaving_rows = batch[move][leaving >= 0]
+            leaving = leaving[leaving >= 0]
+            counts += np.bincount(labels[move], minlength=k) - np.bincount(leaving, minlength=k)
+            sums += _group_sums(delta[batch[move]], labels[move], k) - _group_sums(delta[leaving_rows], leaving, k)
+            assigned[batch] = labels
+            centers = np.where(counts[:, None] > 0, sums / np.maximum(counts, 1)[:, None], centers)
+            moved += int(move.sum())
+        if moved == 0:
+            break
+
+    updated = SegmentModel(model.columns, model.medians, model.mean, model.scale, centers, method='incrémental',
+                           names=model.names)
+    labels, inertia = _assign_all(updated, X)
+    updated.inertia, updated.n_rows = inertia, len(X)
+
+    # Dérive : déplacement des centres (en écarts-types) et inertie moyenne par client
+    report['centroid_shift'] = float(np.linalg.norm(centers - model.centers, axis=1).max())
+    previous_mean = model.inertia / model.n_rows if model.n_rows else np.nan
+    report['inertia_jump'] = float(inertia / max(len(X), 1) / previous_mean - 1) if previous_mean > 0 else 0.0
+    if report['centroid_shift'] > max_shift or report['inertia_jump'] > max_inertia_jump:
+        report['mode'] = 'réajustement'
+        updated, labels = fit_segments(pd.DataFrame(X, columns=model.columns), model.columns, k,
+                                       random_state=random_state)
+    else:
+        report['mode'] = 'incrémental'
+    report['seconds'] = time.perf_counter() - start_time
+    return updated, labels, report
+
+
+def describe_refresh(report):
+    """Résumé lisible d'un rapport de `refresh_segments`"""
+    return (f"🔄 Segmentation {report['mode']} : {report['new']:,} nouveaux, {report['changed']:,} modifiés, "
+            f"{report['removed']:,} retirés ; déplacement des centres {report['centroid_shift']:.3f}, "
+            f"inertie {report['inertia_jump']:+.1%} ({report['seconds']:.2f}s)")
+
+
+def load_or_fit_model(df, columns, n_clusters, path, id_col='ID'):
+    """
+    Modèle enregistré à `path` s'il porte sur les mêmes variables et le même k,
+    mis à jour de façon incrémentale si les clients ont changé depuis
+    l'instantané enregistré ; sinon ajusté sur `df`. Le modèle et
+    l'instantané sont réenregistrés après tout changement. Retourne
+    (SegmentModel, segments de df).
+    """
+    ids, X = customer_features(df, columns, id_col)
+    model = None
+    if os.path.exists(path):
+        try:
+            model = SegmentModel.load(path)
+            if model.columns != list(columns) or model.n_clusters != n_clusters:
+                model = None
+        except (OSError, ValueError, KeyError) as e:
+            print(f"⚠️ Modèle de segmentation illisible ({e}), nouvel ajustement")
+            model = None
+
+    snapshot = None
+    if model is not None:
+        try:
+            snapshot = load_snapshot(snapshot_path(path))
+        except (OSError, ValueError, KeyError) as e:
+            print(f"⚠️ Instantané des clients illisible ({e}), reconstruit à partir du modèle")
+    if model is None:
+        model, labels = fit_segments(pd.DataFrame(X, columns=list(columns)), list(columns), n_clusters)
+    elif snapshot is None:
+        # Modèle inchangé : seul l'instantané, point de départ des mises à jour, est écrit
+        labels = _assign_all(model, X)[0]
+        save_snapshot(snapshot_path(path), model, ids, X, labels)
+        return model, labels
+    else:
+        model, labels, report = refresh_segments(model, ids, X, snapshot)
+        print(describe_refresh(report))
+        if report['mode'] == 'inchangé':
+            return model, labels
+
+    model.save(path)
+    save_snapshot(snapshot_path(path), model, ids, X, labels)
+    return model, labels
+
+
+def assign_segments(model, source, chunksize=SEGMENT_CHUNKSIZE, keep=('ID',)):
+    """
+    Affecte les clients d'une source (DataFrame ou CSV lu par blocs) au centre le plus proche.
+
+    Produit un DataFrame par bloc avec les colonnes de `keep` présentes,
+    `Segment` et `Segment_Name` ; O(n·k), sans réajustement.
+    """
+    for chunk in iter_feature_chunks(source, model.columns, chunksize, keep=keep):
+        labels = model.predict(chunk)
+        assigned = chunk[[col for col in keep if col in chunk.columns]].copy()
+        assigned['Segment'] = labels
+        assigned['Segment_Name'] = model.segment_names(labels)
+        yield assigned
+
+
+def frame_fingerprint(frame):
+    """Empreinte du contenu d'un DataFrame (valeurs et noms de colonnes)"""
+    digest = hashlib.sha1(pd.util.hash_pandas_object(frame, index=False).to_numpy().tobytes())
+    digest.update(repr(list(frame.columns)).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def stratified_silhouette(X_scaled, labels, sample_size=SILHOUETTE_SAMPLE_SIZE,
+                          min_per_cluster=MIN_SILHOUETTE_PER_CLUSTER, random_state=42):
+    """
+    Silhouette moyenne, exacte jusqu'à `sample_size` lignes, estimée au-delà sur un sous-échantillon stratifié.
+
+    Chaque segment fournit des lignes au prorata de sa taille (au moins
+    `min_per_cluster`) et la moyenne est pondérée par le nombre de lignes
+    que représente chaque ligne tirée : les petits segments restent
+    représentés sans biaiser l'estimation. `silhouette_samples` calcule
+    les distances par blocs, avec une mémoire bornée.
+    """
+    clusters, sizes = np.unique(labels, return_counts=True)
+    if len(clusters) < 2:
+        return np.nan
+    if len(labels) <= sample_size:
+        return float(silhouette_samples(X_scaled, labels).mean())
+
+    rng = np.random.default_rng(random_state)
+    quotas = np.minimum(sizes, np.maximum(min_per_cluster, np.round(sample_size * sizes / len(labels)).astype(int)))
+    rows = np.concatenate([rng.choice(np.flatnonzero(labels == cluster), quota, replace=False)
+                           for cluster, quota in zip(clusters, quotas)])
+    scores = silhouette_samples(X_scaled[rows], labels[rows])
+    return float(np.average(scores, weights=np.repeat(sizes / quotas, quotas)))
+
+
+def segmentation_quality(X_scaled, labels, sample_size=SILHOUETTE_SAMPLE_SIZE, random_state=42):
+    """Indice de Calinski-Harabasz (toutes les lignes) et silhouette (échantillon stratifié) d'une segmentation"""
+    if len(np.unique(labels)) < 2:
+        return {'calinski_harabasz': np.nan, 'silhouette': np.nan}
+    return {
+        'calinski_harabasz': float(calinski_harabasz_score(X_scaled, labels)),
+        'silhouette': stratified_silhouette(X_scaled, labels, sample_size, random_state=random_state),
+    }
+
+
+def _fit_sweep_task(task):
+    """Segmentation et indicateurs de qualité pour un k (exécuté dans un processus du pool)"""
+    frame, columns, k, random_state = task
+    start = time.perf_counter()
+    model, labels = fit_segments(frame, columns, k, random_state=random_state)
+    quality = segmentation_quality(model.transform(frame), labels, random_state=random_state)
+    return {'k': k, 'model': model, 'labels': labels, 'inertia': model.inertia, **quality,
+            'seconds': time.perf_counter() - start}
+
+
+class SegmentSweep:
+    """
+    Segmentations de plusieurs valeurs de k, calculées en arrière-plan dans un pool de processus.
+
+    Les calculs démarrent dès la création ; `first_k` (la valeur affichée)
+    passe en tête de file. `result(k)` attend au besoin la fin du calcul
+    de ce k seulement.
+    """
+
+    def __init__(self, frame, columns, k_values=K_RANGE, first_k=None, max_workers=None, random_state=42):
+        self.columns = list(columns)
+        self.k_values = sorted(k_values, key=lambda k: k != first_k)
+        frame = frame[self.columns]
+        workers = min(len(self.k_values), max_workers or os.cpu_count() or 1)
+        pool = ProcessPoolExecutor(max_workers=workers)
+        self._futures = {k: pool.submit(_fit_sweep_task, (frame, self.columns, k, random_state))
+                         for k in self.k_values}
+        # Plus aucune tâche à soumettre : les processus s'arrêtent une fois les calculs terminés
+        pool.shutdown(wait=False)
+
+    def __contains__(self, k):
+        return k in self._futures
+
+    def done(self, k):
+        """Le calcul de ce k est-il terminé ?"""
+        return self._futures[k].done()
+
+    @property
+    def n_done(self):
+        return sum(future.done() for future in self._futures.values())
+
+    def result(self, k):
+        """{'k', 'model', 'labels', 'inertia', 'calinski_harabasz', 'silhouette', 'seconds'} pour ce k"""
+        return self._futures[k].result()
+
+    def metrics(self):
+        """Indicateurs de qualité des valeurs de k déjà calculées, par k croissant"""
+        rows = [self.result(k) for k in sorted(self.k_values) if self.done(k)]
+        return pd.DataFrame({
+            'Clusters': [row['k'] for row in rows],
+            'Inertie': [row['inertia'] for row in rows],
+            'Calinski_Harabasz': [row['calinski_harabasz'] for row in rows],
+            'Silhouette': [row['silhouette'] for row in rows],
+            'Duree_s': [row['seconds'] for row in rows],
+        })
+
+    def best_k(self, metric='silhouette'):
+        """Valeur de k qui maximise l'indicateur (attend la fin de tous les calculs)"""
+        column = {'silhouette': 'Silhouette', 'calinski_harabasz': 'Calinski_Harabasz'}[metric]
+        for k in self.k_values:
+            self.result(k)
+        metrics = self.metrics()
+        return int(metrics.loc[metrics[column].idxmax(), 'Clusters'])
+
+
+def optimal_k_search(frame, columns, k_values=K_RANGE, max_workers=None, random_state=42):
+    """
+    Nombre de clusters optimal par la silhouette : les ajustements de chaque k
+    tournent en parallèle dans un pool de processus.
+
+    Retourne (k optimal, indicateurs et durées par k, résultat de ce k).
+    """
+    sweep = SegmentSweep(frame, columns, k_values=k_values, max_workers=max_workers, random_state=random_state)
+    best = sweep.best_k()
+    return best, sweep.metrics(), sweep.result(best)
@@ -0,0 +1,370 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Moteur de Requêtes SQLite des Transactions
+==========================================
+
+Backend optionnel du dashboard de fraude : les transactions sont chargées
+une fois, par blocs, dans une base SQLite locale (module standard
+`sqlite3`, aucun service à lancer) indexée sur Amount, Time et Class.
+
+Les filtres des curseurs, l'agrégation horaire, la heatmap jour × heure,
+les quartiles et les seuils IQR sont alors exécutés en SQL avec les index ;
+seuls les résultats agrégés (ou un échantillon borné pour les graphiques)
+reviennent dans pandas. La latence d'une interaction ne dépend plus de la
+taille de la table chargée en mémoire.
+
+La base est rangée dans `.eda_cache/` et reconstruite automatiquement
+quand le fichier source change (même invalidation que le cache colonnaire).
+"""
+
+import os
+import shutil
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+import data_cache
+from data_loader import sniff_csv
+from data_schema import coerce_integer_columns, schema_read_kwargs, split_integer_dtypes
+from plot_summaries import histogram_edges, regular_bins
+from streaming_profiler import DEFAULT_CHUNKSIZE, iter_csv_chunks
+
+DB_SUFFIX = ".sqlite"
+DB_NAME = "transactions.db"
+TABLE_NAME = "transactions"
+INDEXED_COLUMNS = ['Amount', 'Time', 'Class']
+
+
+def db_dir_for(path, cache_dir=None):
+    """Répertoire de la base SQLite associée à un fichier de transactions"""
+    return data_cache.cache_entry_dir(path, {'backend': 'sqlite'}, cache_dir) + DB_SUFFIX
+
+
+def build_database(path, cache_dir=None, chunksize=DEFAULT_CHUNKSIZE):
+    """
+    Crée (ou valide) la base SQLite d'un fichier de transactions et retourne son chemin.
+
+    Le CSV est lu par blocs dans les types du schéma (mémoire bornée) ; les
+    index sont créés après l'insertion. L'écriture est atomique (répertoire
+    temporaire puis renommage).
+    """
+    entry_dir = db_dir_for(path, cache_dir)
+    db_path = os.path.join(entry_dir, DB_NAME)
+    if data_cache.is_entry_valid(entry_dir, path):
+        return db_path
+
+    dialect = sniff_csv(path)
+    dtype, integer_dtypes = split_integer_dtypes(schema_read_kwargs('fraud', dialect['columns'])['dtype'])
+
+    os.makedirs(os.path.dirname(entry_dir), exist_ok=True)
+    tmp_dir = f"{entry_dir}.tmp-{os.getpid()}"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    source = data_cache.file_fingerprint(path)
+    n_rows = n_dropped = 0
+    with sqlite3.connect(os.path.join(tmp_dir, DB_NAME)) as conn:
+        for chunk in iter_csv_chunks(path, chunksize=chunksize, sep=dialect['delimiter'], dtype=dtype):
+            # Une cible vide ou non numérique n'est pas une transaction exploitable
+            chunk, _, dropped = coerce_integer_columns(chunk, integer_dtypes, required=('Class',))
+            n_dropped += dropped
+            chunk.to_sql(TABLE_NAME, conn, if_exists='append', index=False)
+            n_rows += len(chunk)
+        for col in INDEXED_COLUMNS:
+            if col in dialect['columns']:
+                conn.execute(f'CREATE INDEX idx_{col.lower()} ON {TABLE_NAME} ("{col}")')
+        conn.execute('ANALYZE')
+    if n_dropped:
+        print(f"⚠️ {n_dropped:,} lignes ignorées : 'Class' vide ou non numérique")
+
+    data_cache.write_manifest(tmp_dir, {'source': source, 'n_rows': n_rows, 'format': 'sqlite'})
+    shutil.rmtree(entry_dir, ignore_errors=True)
+    os.replace(tmp_dir, entry_dir)
+    return db_path
+
+
+class TransactionStore:
+    """
+    Requêtes agrégées sur la table des transactions.
+
+    Les plages sont celles des curseurs du dashboard : `amount_range` en
+    dollars, `time_range` en heures (None = pas de filtre).
+    """
+
+    def __init__(self, db_path, target_col='Class'):
+        self.db_path = db_path
+        self.target_col = target_col
+        # Lecture seule, partageable entre les sessions Streamlit
+        self.conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True, check_same_thread=False)
+        self.columns = [row[1] for row in self.conn.execute(f'PRAGMA table_info({TABLE_NAME})')]
+
+    def _where(self, amount_range=None, time_range=None, extra=None):
+        clauses, params = [], []
+        if amount_range is not None:
+            clauses.append('Amount BETWEEN ? AND ?')
+            params += [float(amount_range[0]), float(amount_range[1])]
+        if time_range is not None and 'Time' in self.columns:
+            clauses.append('Time BETWEEN ? AND ?')
+            params += [float(time_range[0]) * 3600, float(time_range[1]) * 3600]
+        if extra:
+            clauses.append(extra)
+        return (' WHERE ' + ' AND '.join(clauses)) if clauses else '', params
+
+    def _sample_clause(self, where, params, limit, seed=42):
+        """
+        Clause d'échantillonnage systématique d'environ `limit` lignes filtrées : ('AND ...', paramètres).
+
+        Une ligne sur `pas` est retenue selon son rowid (décalage aléatoire) :
+        le filtre est évalué avec les index, sans clé aléatoire par ligne ni
+        tri, et la requête s'arrête après `limit` lignes. Le comptage
+        préalable parcourt la plage d'index filtrée, comme les KPIs. Les
+        lignes étant stockées dans l'ordre du fichier, l'échantillon couvre
+        toute la période.
+        """
+        n = self.conn.execute(f'SELECT COUNT(*) FROM {TABLE_NAME}{where}', params).fetchone()[0]
+        if n <= limit:
+            return '', []
+        stride = -(-n // int(limit))
+        offset = int(np.random.default_rng(seed).integers(stride))
+        return ' AND (rowid + ?) % ? = 0', [offset, stride]
+
+    def query(self, sql, params=()):
+        """Exécute une requête et retourne le résultat sous forme de DataFrame"""
+        return pd.read_sql_query(sql, self.conn, params=list(params))
+
+    def bounds(self):
+        """Bornes des curseurs : (montant min, montant max, durée couverte en heures)"""
+        max_time = 'MAX(Time)' if 'Time' in self.columns else 'NULL'
+        row = self.conn.execute(f'SELECT MIN(Amount), MAX(Amount), {max_time} FROM {TABLE_NAME}').fetchone()
+        return float(row[0]), float(row[1]), (float(row[2]) / 3600 if row[2] is not None else np.nan)
+
+    def kpis(self, amount_range=None, time_range=None):
+        """Nombre de transactions, de fraudes et montant moyen des lignes filtrées"""
+        where, params = self._where(amount_range, time_range)
+        total, frauds, avg_amount = self.conn.execute(
+            f'SELECT COUNT(*), SUM("{self.target_col}"), AVG(Amount) FROM {TABLE_NAME}{where}', params
+        ).fetchone()
+        return {
+            'total_transactions': int(total),
+            'fraud_count': int(frauds or 0),
+            'fraud_rate': (frauds / total * 100) if total else 0.0,
+            'avg_amount': avg_amount if avg_amount is not None else np.nan,
+        }
+
+    def class_counts(self, amount_range=None, time_range=None):
+        """Nombre de transactions par classe"""
+        where, params = self._where(amount_range, time_range)
+        counts = self.query(
+            f'SELECT "{self.target_col}" AS cls, COUNT(*) AS n FROM {TABLE_NAME}{where} GROUP BY cls ORDER BY cls',
+            params
+        )
+        return counts.set_index('cls')['n']
+
+    def hourly_stats(self, amount_range=None, time_range=None):
+        """Statistiques par heure (mêmes colonnes que le dashboard)"""
+        where, params = self._where(amount_range, time_range)
+        return self.query(
+            f'SELECT CAST(Time / 3600 AS INTEGER) % 24 AS Hour, COUNT(*) AS Total_Transactions, '
+            f'SUM("{self.target_col}") AS Fraudes, AVG("{self.target_col}") AS Taux_Fraude '
+            f'FROM {TABLE_NAME}{where} GROUP BY Hour ORDER BY Hour',
+            params
+        )
+
+    def day_hour_frauds(self, amount_range=None, time_range=None):
+        """Nombre de fraudes par jour et par heure (table pivotée Jour × Heure)"""
+        where, params = self._where(amount_range, time_range)
+        counts = self.query(
+            f'SELECT CAST(Time / 86400 AS INTEGER) AS Day, CAST(Time / 3600 AS INTEGER) % 24 AS Hour, '
+            f'SUM("{self.target_col}") AS Fraudes FROM {TABLE_NAME}{where} GROUP BY Day, Hour',
+            params
+        )
+        return counts.pivot(index='Day', columns='Hour', values='Fraudes').fillna(0)
+
+    def amount_quantiles(self, quantiles, amount_range=None, time_range=None, cls=None):
+        """
+        Quantiles exacts des montants (interpolation linéaire, comme pandas).
+
+        Chaque quantile est lu par un parcours ordonné de l'index sur Amount
+        (`ORDER BY Amount LIMIT 2 OFFSET k`) : aucune ligne n'est chargée,
+        mais SQLite parcourt les k entrées d'index qui précèdent, soit un
+        coût O(min(k, n - k)) par quantile (les quantiles hauts sont lus
+        depuis la fin de l'index), de l'ordre de n pour une médiane. Pour
+        des quantiles approchés en temps constant, voir `quantile_sketch`.
+        """
+        extra = f'"{self.target_col}" = {int(cls)}' if cls is not None else None
+        where, params = self._where(amount_range, time_range, extra)
+        n = self.conn.execute(f'SELECT COUNT(*) FROM {TABLE_NAME}{where}', params).fetchone()[0]
+        if n == 0:
+            return [np.nan] * len(quantiles)
+
+        values = []
+        for q in quantiles:
+            position = (n - 1) * q
+            offset = int(np.floor(position))
+            if offset <= (n - 1) // 2:
+                rows = self.conn.execute(
+                    f'SELECT Amount FROM {TABLE_NAME}{where} ORDER BY Amount LIMIT 2 OFFSET ?',
+                    params + [offset]
+                ).fetchall()
+                low = rows[0][0]
+                high = rows[1][0] if len(rows) > 1 else low
+            else:
+                # Rangs k et k + 1 comptés depuis le plus grand montant
+                rows = self.conn.execute(
+                    f'SELECT Amount FROM {TABLE_NAME}{where} ORDER BY Amount DESC LIMIT 2 OFFSET ?',
+                    params + [max(n - 2 - offset, 0)]
+                ).fetchall()
+                high = rows[0][0]
+                low = rows[1][0] if offset < n - 1 else high
+            values.append(low + (position - offset) * (high - low))
+        return values
+
+    def amount_describe(self, cls, amount_range=None, time_range=None):
+        """Équivalent de `Series.describe()` des montants d'une classe"""
+        where, params = self._where(amount_range, time_range, f'"{self.target_col}" = {int(cls)}')
+        count, mean, mean_sq, min_amount, max_amount = self.conn.execute(
+            f'SELECT COUNT(*), AVG(Amount), AVG(Amount * Amount), MIN(Amount), MAX(Amount) FROM {TABLE_NAME}{where}',
+            params
+        ).fetchone()
+        std = np.sqrt(max(mean_sq - mean ** 2, 0.0) * count / (count - 1)) if count > 1 else np.nan
+        quartiles = self.amount_quantiles([0.25, 0.5, 0.75], amount_range, time_range, cls=cls)
+        return pd.Series(
+            [count, mean, std, min_amount, *quartiles, max_amount],
+            index=['count', 'mean', 'std', 'min', '25%', '50%', '75%', 'max'],
+            name='Amount', dtype=float
+        )
+
+    @staticmethod
+    def _bucket(column, low, width, alias):
+        """
+        Tranche régulière d'une colonne en SQL : (expression interne, expression externe, paramètres).
+
+        La tranche est estimée par division dans la sous-requête, puis
+        corrigée par comparaison aux bornes `low + i × width` (comme
+        numpy.histogram) dans la requête externe.
+        """
+        inner = f'CAST(({column} - ?) / ? AS INTEGER) AS {alias}'
+        outer = f'{alias} - ({column} < ? + {alias} * ?) + ({column} >= ? + ({alias} + 1) * ?)'
+        return inner, outer, [low, width], [low, width] * 2
+
+    def amount_histogram(self, low, high, nbins, cls=None, amount_range=None, time_range=None):
+        """
+        Nombre de transactions par tranche régulière de montant.
+
+        Les bornes sont celles de `plot_summaries.histogram_edges(low, high, nbins)`,
+        évaluées avec la même arithmétique : les comptages sont identiques.
+        """
+        edges = histogram_edges(low, high, nbins)
+        inner, outer, inner_params, outer_params = self._bucket('Amount', *regular_bins(low, high, nbins), 'b')
+        extra = f'"{self.target_col}" = {int(cls)}' if cls is not None else None
+        where, params = self._where(amount_range, time_range, extra)
+        where += (' AND ' if where else ' WHERE ') + 'Amount BETWEEN ? AND ?'
+        rows = self.conn.execute(
+            f'SELECT {outer} AS bin, COUNT(*) FROM (SELECT Amount, {inner} FROM {TABLE_NAME}{where}) GROUP BY bin',
+            outer_params + inner_params + params + [float(edges[0]), float(edges[-1])]
+        ).fetchall()
+        counts = np.zeros(nbins, dtype=np.int64)
+        for position, n in rows:
+            # La dernière borne est incluse dans la dernière tranche
+            counts[min(max(position, 0), nbins - 1)] += n
+        return counts
+
+    def amount_time_raster(self, time_window, amount_window, shape):
+        """
+        Comptages 2D Temps (secondes) × Montant dans une fenêtre, agrégés en SQL.
+
+        Même résultat que `plot_summaries.density_raster` : (bornes x, bornes y,
+        comptages avec une ligne par tranche de montant).
+        """
+        x_edges = histogram_edges(*time_window, shape[0])
+        y_edges = histogram_edges(*amount_window, shape[1])
+        t_inner, t_outer, t_inner_params, t_outer_params = self._bucket(
+            'Time', *regular_bins(*time_window, shape[0]), 'bt')
+        a_inner, a_outer, a_inner_params, a_outer_params = self._bucket(
+            'Amount', *regular_bins(*amount_window, shape[1]), 'ba')
+        rows = self.conn.execute(
+            f'SELECT {t_outer} AS ix, {a_outer} AS iy, COUNT(*) '
+            f'FROM (SELECT Time, Amount, {t_inner}, {a_inner} FROM {TABLE_NAME} '
+            f'WHERE Time BETWEEN ? AND ? AND Amount BETWEEN ? AND ?) GROUP BY ix, iy',
+            t_outer_params + a_outer_params + t_inner_params + a_inner_params +
+            [float(x_edges[0]), float(x_edges[-1]), float(y_edges[0]), float(y_edges[-1])]
+        ).fetchall()
+        counts = np.zeros((shape[1], shape[0]), dtype=np.int64)
+        for ix, iy, n in rows:
+            counts[min(max(iy, 0), shape[1] - 1), min(max(ix, 0), shape[0] - 1)] += n
+        return x_edges, y_edges, counts
+
+    def amount_box(self, cls, amount_range=None, time_range=None, whisker=1.5, max_points=2000, describe=None):
+        """Statistiques de boîte à moustaches des montants d'une classe (clés de `plot_summaries.box_summary`)"""
+        describe = describe if describe is not None else self.amount_describe(cls, amount_range, time_range)
+        if not describe['count'] > 0:
+            return None
+        q1, q3 = describe['25%'], describe['75%']
+        low_limit, high_limit = q1 - whisker * (q3 - q1), q3 + whisker * (q3 - q1)
+        where, params = self._where(amount_range, time_range, f'"{self.target_col}" = {int(cls)}')
+        lowerfence, upperfence = self.conn.execute(
+            f'SELECT MIN(CASE WHEN Amount >= ? THEN Amount END), MAX(CASE WHEN Amount <= ? THEN Amount END) '
+            f'FROM {TABLE_NAME}{where}', [low_limit, high_limit] + params
+        ).fetchone()
+        # Échantillon borné des points atypiques (même tirage par rowid que `fetch`)
+        where += ' AND (Amount < ? OR Amount > ?)'
+        params = params + [low_limit, high_limit]
+        sample, sample_params = self._sample_clause(where, params, max_points)
+        outliers = np.array([row[0] for row in self.conn.execute(
+            f'SELECT Amount FROM {TABLE_NAME}{where}{sample} LIMIT ?', params + sample_params + [int(max_points)]
+        )], dtype=np.float64)
+        return {
+            'n': int(describe['count']),
+            'q1': q1, 'median': describe['50%'], 'q3': q3,
+            'mean': describe['mean'],
+            'lowerfence': lowerfence, 'upperfence': upperfence,
+            'outliers': np.sort(outliers),
+        }
+
+    def iqr_bounds(self, amount_range=None, time_range=None, factor=1.5):
+        """Q1, Q3 et seuils d'anomalie IQR des montants filtrés"""
+        q1, q3 = self.amount_quantiles([0.25, 0.75], amount_range, time_range)
+        iqr = q3 - q1
+        return q1, q3, q1 - factor * iqr, q3 + factor * iqr
+
+    def outlier_stats(self, lower, upper, amount_range=None, time_range=None):
+        """Nombre d'outliers et part de fraudes parmi eux"""
+        where, params = self._where(amount_range, time_range, '(Amount < ? OR Amount > ?)')
+        count, fraud_mean = self.conn.execute(
+            f'SELECT COUNT(*), AVG("{self.target_col}") FROM {TABLE_NAME}{where}', params + [lower, upper]
+        ).fetchone()
+        return int(count), (fraud_mean or 0.0)
+
+    def fetch(self, amount_range=None, time_range=None, limit=None, outliers=None, columns=None, cls=None):
+        """
+        Lignes filtrées (échantillon systématique d'au plus `limit` lignes si fourni).
+
+        `outliers=(lower, upper)` restreint aux montants hors des seuils,
+        `cls` à une classe.
+        """
+        clauses = []
+        if outliers is not None:
+            clauses.append('(Amount < ? OR Amount > ?)')
+        if cls is not None:
+            clauses.append(f'"{self.target_col}" = {int(cls)}')
+        where, params = self._where(amount_range, time_range, ' AND '.join(clauses))
+        if outliers is not None:
+            params += [float(outliers[0]), float(outliers[1])]
+        selected = ', '.join(f'"{col}"' for col in columns) if columns else '*'
+        if limit is not None:
+            sample, sample_params = self._sample_clause(where, params, limit)
+            if sample:
+                where = (where or ' WHERE 1') + sample
+            params = params + sample_params + [int(limit)]
+        sql = f'SELECT {selected} FROM {TABLE_NAME}{where}' + (' LIMIT ?' if limit is not None else '')
+        return self.query(sql, params)
+
+    def close(self):
+        self.conn.close()
+
+
+def open_store(path, cache_dir=None, target_col='Class'):
+    """Construit la base si nécessaire puis ouvre le moteur de requêtes"""
+    return TransactionStore(build_database(path, cache_dir=cache_dir), target_col=target_col)
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Échantillonnage Stratifié en Flux
+=================================
+
+Remplace l'échantillonnage aléatoire simple (`df.sample(n=50000)`) qui
+écartait la majorité des fraudes : le fichier est parcouru par blocs et
+- toutes les lignes de la classe minoritaire (fraudes) sont conservées ;
+- la classe majoritaire est échantillonnée uniformément dans un réservoir
+  de taille fixe (clés aléatoires, on garde les plus petites) ;
+- chaque ligne porte un poids (`Sample_Weight`) égal au nombre de lignes
+  du fichier qu'elle représente.
+
+Les comptages et taux de fraude pondérés de l'échantillon sont exacts, et
+la mémoire reste bornée par le budget plus un bloc.
+"""
+
+import numpy as np
+import pandas as pd
+
+from data_schema import coerce_integer_columns, schema_read_kwargs, split_integer_dtypes
+from streaming_profiler import DEFAULT_CHUNKSIZE, iter_csv_chunks
+
+DEFAULT_BUDGET = 50_000
+WEIGHT_COL = 'Sample_Weight'
+
+
+class StratifiedReservoir:
+    """
+    Réservoir stratifié alimenté bloc par bloc.
+
+    `budget` est la taille visée de l'échantillon final : les lignes
+    minoritaires sont toutes gardées, la classe majoritaire complète le
+    budget (au moins `min_majority` lignes).
+    """
+
+    def __init__(self, budget=DEFAULT_BUDGET, target_col='Class', minority_classes=(1,),
+                 min_majority=1000, seed=42):
+        self.budget = budget
+        self.target_col = target_col
+        self.minority_classes = list(minority_classes)
+        self.min_majority = min_majority
+        self.rng = np.random.default_rng(seed)
+        self.minority_chunks = []
+        self.n_minority = 0
+        self.majority = None
+        self.majority_keys = np.empty(0)
+        self.majority_seen = 0
+
+    def update(self, chunk):
+        """Intègre un bloc de lignes"""
+        is_minority = chunk[self.target_col].isin(self.minority_classes).to_numpy()
+        if is_minority.any():
+            self.minority_chunks.append(chunk[is_minority])
+            self.n_minority += int(is_minority.sum())
+
+        rest = chunk[~is_minority]
+        if len(rest) == 0:
+            return self
+        self.majority_seen += len(rest)
+
+        # Clés uniformes : les `budget` plus petites forment un échantillon uniforme
+        keys = self.rng.random(len(rest))
+        if self.majority is None:
+            candidates, candidate_keys = rest, keys
+        else:
+            candidates = pd.concat([self.majority, rest])
+            candidate_keys = np.concatenate([self.majority_keys, keys])
+
+        if len(candidates) > self.budget:
+            keep = np.argpartition(candidate_keys, self.budget)[:self.budget]
+            candidates, candidate_keys = candidates.iloc[keep], candidate_keys[keep]
+        self.majority, self.majority_keys = candidates, candidate_keys
+        return self
+
+    def sample(self):
+        """Échantillon final avec la colonne de poids (ordre d'origine des lignes)"""
+        frames = list(self.minority_chunks)
+        weights = [np.ones(self.n_minority)]
+
+        if self.majority is not None:
+            majority_budget = max(self.budget - self.n_minority, self.min_majority)
+            majority, keys = self.majority, self.majority_keys
+            if len(majority) > majority_budget:
+                keep = np.argpartition(keys, majority_budget)[:majority_budget]
+                majority = majority.iloc[keep]
+            frames.append(majority)
+            weights.append(np.full(len(majority), self.majority_seen / len(majority)))
+
+        if not frames:
+            return pd.DataFrame(columns=[WEIGHT_COL])
+        sample = pd.concat(frames)
+        sample[WEIGHT_COL] = np.concatenate(weights)
+        return sample.sort_index()
+
+
+def stratified_sample(df, budget=DEFAULT_BUDGET, target_col='Class', chunksize=DEFAULT_CHUNKSIZE, seed=42):
+    """Échantillon stratifié pondéré d'un DataFrame déjà chargé (parcouru par blocs)"""
+    reservoir = StratifiedReservoir(budget=budget, target_col=target_col, seed=seed)
+    for start in range(0, len(df), chunksize):
+        reservoir.update(df.iloc[start:start + chunksize])
+    return reservoir.sample()
+
+
+def sample_csv(path, budget=DEFAULT_BUDGET, target_col='Class', chunksize=DEFAULT_CHUNKSIZE, sep=',', seed=42):
+    """
+    Échantillon stratifié pondéré d'un CSV, sans jamais le charger en entier.
+
+    Les lignes dont la cible est vide ou non numérique sont ignorées (et
+    signalées) ; l'index de l'échantillon reste la position dans le fichier.
+    """
+    header = pd.read_csv(path, sep=sep, nrows=0).columns
+    dtype, integer_dtypes = split_integer_dtypes(schema_read_kwargs('fraud', list(header))['dtype'])
+
+    reservoir = StratifiedReservoir(budget=budget, target_col=target_col, seed=seed)
+    offset = n_dropped = 0
+    for chunk in iter_csv_chunks(path, chunksize=chunksize, sep=sep, dtype=dtype):
+        # Index global des lignes du fichier (les blocs repartent de 0)
+        chunk.index = pd.RangeIndex(offset, offset + len(chunk))
+        offset += len(chunk)
+        chunk, _, dropped = coerce_integer_columns(chunk, integer_dtypes, required=(target_col,))
+        n_dropped += dropped
+        reservoir.update(chunk)
+    if n_dropped:
+        print(f"⚠️ {n_dropped:,} lignes ignorées : '{target_col}' vide ou non numérique")
+    return reservoir.sample()
+
+
+def weighted_fraud_counts(df, target_col='Class'):
+    """Nombre de transactions et de fraudes représentées par un échantillon (poids pris en compte)"""
+    if WEIGHT_COL not in df.columns:
+        return len(df), int(df[target_col].sum())
+    weights = df[WEIGHT_COL].to_numpy()
+    total = weights.sum()
+    frauds = weights[df[target_col].to_numpy() == 1].sum()
+    return int(round(total)), int(round(frauds))
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Profilage en Flux des Transactions Bancaires
+============================================
+
+Lit un fichier de transactions (creditcard.csv ou export mensuel de
+plusieurs Go) par blocs de taille fixe, en une seule passe, et maintient
+des accumulateurs fusionnables :
+- comptages par classe,
+- moyenne/variance de Welford, min et max des montants par classe,
+- histogrammes horaires (transactions et fraudes),
+- esquisses de quantiles des montants par classe (`quantile_sketch`).
+
+Les KPIs de la barre latérale du dashboard (nombre de transactions, fraudes,
+taux, période couverte), les statistiques horaires et les tableaux
+`describe()` des montants sont produits avec une mémoire bornée, sans
+jamais charger le fichier entier.
+"""
+
+import numpy as np
+import pandas as pd
+
+from data_schema import FRAUD_DTYPES, coerce_integer_columns, split_integer_dtypes
+from quantile_sketch import QuantileSketch
+from time_aggregates import HOURS_PER_DAY, absolute_hours, hour_class_counts, hourly_stats_frame
+
+DEFAULT_CHUNKSIZE = 100_000
+
+
+class RunningStats:
+    """Moyenne, variance (Welford), min et max fusionnables d'une série de valeurs"""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+
+    def update(self, values):
+        """Intègre un bloc de valeurs (NaN ignorés)"""
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return self
+
+        batch = RunningStats()
+        batch.count = len(values)
+        batch.mean = float(values.mean())
+        batch.m2 = float(((values - batch.mean) ** 2).sum())
+        batch.min = float(values.min())
+        batch.max = float(values.max())
+        return self.merge(batch)
+
+    def merge(self, other):
+        """Fusionne un autre accumulateur (formule parallèle de Chan et al.)"""
+        if other.count == 0:
+            return self
+        if self.count == 0:
+            self.count, self.mean, self.m2 = other.count, other.mean, other.m2
+            self.min, self.max = other.min, other.max
+            return self
+
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / total
+        self.m2 += other.m2 + delta ** 2 * self.count * other.count / total
+        self.count = total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    @property
+    def var(self):
+        """Variance empirique (ddof=1, comme pandas)"""
+        return self.m2 / (self.count - 1) if self.count > 1 else np.nan
+
+    @property
+    def std(self):
+        """Écart-type empirique (ddof=1)"""
+        return float(np.sqrt(self.var)) if self.count > 1 else np.nan
+
+
+class FraudProfile:
+    """Accumulateurs fusionnables des KPIs de fraude (une instance par fichier ou partition)"""
+
+    def __init__(self, target_col='Class'):
+        self.target_col = target_col
+        self.class_counts = np.zeros(2, dtype=np.int64)
+        self.hour_counts = np.zeros(HOURS_PER_DAY, dtype=np.int64)
+        self.hour_frauds = np.zeros(HOURS_PER_DAY, dtype=np.int64)
+        self.amount_stats = {0: RunningStats(), 1: RunningStats()}
+        self.amount_sketches = {0: QuantileSketch(), 1: QuantileSketch()}
+        self.time_stats = RunningStats()
+
+    @property
+    def n_rows(self):
+        return int(self.class_counts.sum())
+
+    def update(self, chunk):
+        """Intègre un bloc de transactions (DataFrame avec Amount, Class et éventuellement Time)"""
+        labels = chunk[self.target_col].to_numpy().astype(np.int64)
+        self.class_counts += np.bincount(labels, minlength=2)[:2]
+
+        if 'Amount' in chunk.columns:
+            amounts = chunk['Amount'].to_numpy(dtype=np.float64)
+            for cls in (0, 1):
+                class_amounts = amounts[labels == cls]
+                self.amount_stats[cls].update(class_amounts)
+                self.amount_sketches[cls].update(class_amounts)
+
+        if 'Time' in chunk.columns:
+            times = chunk['Time'].to_numpy(dtype=np.float64)
+            self.time_stats.update(times)
+            hours = absolute_hours(times)
+            by_hour = hour_class_counts(np.where(hours >= 0, hours % HOURS_PER_DAY, -1), labels,
+                                        n_hours=HOURS_PER_DAY)
+            self.hour_counts += by_hour.sum(axis=1)
+            self.hour_frauds += by_hour[:, 1]
+
+        return self
+
+    def merge(self, other):
+        """Fusionne le profil d'une autre partition"""
+        self.class_counts += other.class_counts
+        self.hour_counts += other.hour_counts
+        self.hour_frauds += other.hour_frauds
+        for cls in (0, 1):
+            self.amount_stats[cls].merge(other.amount_stats[cls])
+            self.amount_sketches[cls].merge(other.amount_sketches[cls])
+        self.time_stats.merge(other.time_stats)
+        return self
+
+    def kpis(self):
+        """KPIs globaux affichés dans la barre latérale"""
+        n_rows = self.n_rows
+        fraud_count = int(self.class_counts[1])
+        return {
+            'total_transactions': n_rows,
+            'fraud_count': fraud_count,
+            'fraud_rate': (fraud_count / n_rows * 100) if n_rows > 0 else 0.0,
+            'period_hours': (self.time_stats.max / 3600) if self.time_stats.count else np.nan,
+        }
+
+    def hourly_stats(self):
+        """Statistiques par heure (mêmes colonnes que le dashboard)"""
+        return hourly_stats_frame(self.hour_counts, self.hour_frauds)
+
+    def amount_describe(self, cls):
+        """Équivalent de `Series.describe()` des montants d'une classe (quartiles estimés)"""
+        stats = self.amount_stats[cls]
+        quartiles = self.amount_sketches[cls].quantile([0.25, 0.5, 0.75])
+        return pd.Series(
+            [stats.count, stats.mean if stats.count else np.nan, stats.std,
+             stats.min if stats.count else np.nan, *quartiles,
+             stats.max if stats.count else np.nan],
+            index=['count', 'mean', 'std', 'min', '25%', '50%', '75%', 'max'],
+            name='Amount'
+        )
+
+
+def iter_csv_chunks(path, chunksize=DEFAULT_CHUNKSIZE, usecols=None, sep=',', dtype=None):
+    """Itère sur un CSV par blocs de `chunksize` lignes"""
+    return pd.read_csv(path, sep=sep, usecols=usecols, chunksize=chunksize, dtype=dtype)
+
+
+def profile_csv(path, target_col='Class', chunksize=DEFAULT_CHUNKSIZE, sep=','):
+    """
+    Profile un fichier de transactions en une passe, avec une mémoire bornée.
+
+    Les lignes dont la cible est vide ou non numérique sont ignorées (et
+    signalées) plutôt que d'interrompre la lecture.
+    """
+    header = pd.read_csv(path, sep=sep, nrows=0).columns
+    usecols = [col for col in ('Time', 'Amount', target_col) if col in header]
+    dtype, integer_dtypes = split_integer_dtypes(
+        {col: FRAUD_DTYPES[col] for col in usecols if col in FRAUD_DTYPES})
+
+    profile = FraudProfile(target_col=target_col)
+    n_dropped = 0
+    for chunk in iter_csv_chunks(path, chunksize=chunksize, usecols=usecols, sep=sep, dtype=dtype):
+        chunk, _, dropped = coerce_integer_columns(chunk, integer_dtypes, required=(target_col,))
+        n_dropped += dropped
+        profile.update(chunk)
+    if n_dropped:
+        print(f"⚠️ {n_dropped:,} lignes ignorées : '{target_col}' vide ou non numérique")
+    return profile
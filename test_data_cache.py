@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Script de test du cache colonnaire des fichiers CSV
+"""
+
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+import column_store
+import data_cache
+import data_schema
+import streaming_profiler
+import stratified_sampler
+
+
+def _write_sample_csv(path, n_rows=200, seed=42):
+    """Crée un petit CSV de transactions avec une colonne texte"""
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        'Time': np.arange(n_rows, dtype=float) * 60,
+        'Amount': rng.gamma(2.0, 50.0, n_rows).round(2),
+        'Category': rng.choice(['a', 'b', None], n_rows),
+        'Class': rng.choice([0, 1], n_rows, p=[0.95, 0.05])
+    })
+    df.to_csv(path, index=False)
+    return df
+
+
+def test_cache_roundtrip():
+    """Le second chargement relit la copie colonnaire à l'identique"""
+    print("🔍 Test aller-retour du cache...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "transactions.csv")
+        _write_sample_csv(path)
+
+        first = data_cache.read_csv_cached(path)
+        entry_dir = data_cache.cache_entry_dir(path)
+        assert data_cache.is_entry_valid(entry_dir, path)
+
+        second = data_cache.read_csv_cached(path)
+        pd.testing.assert_frame_equal(first, second, check_dtype=False)
+        print(f"✅ Cache relu: {second.shape}")
+
+
+def test_npy_fallback():
+    """Sans pyarrow, les colonnes sont stockées en .npy (texte et NaN compris)"""
+    print("\n🔍 Test du format .npy...")
+
+    previous = data_cache.PARQUET_AVAILABLE
+    data_cache.PARQUET_AVAILABLE = False
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "transactions.csv")
+            _write_sample_csv(path)
+
+            first = data_cache.read_csv_cached(path)
+            second = data_cache.read_csv_cached(path)
+
+            manifest = data_cache.read_manifest(data_cache.cache_entry_dir(path))
+            assert manifest['format'] == 'npy'
+            assert second['Category'].isna().sum() == first['Category'].isna().sum()
+            np.testing.assert_allclose(second['Amount'], first['Amount'])
+            print(f"✅ Format .npy relu: {second.shape}")
+    finally:
+        data_cache.PARQUET_AVAILABLE = previous
+
+
+def test_cache_invalidation():
+    """Une modification du fichier source invalide l'entrée ; un simple `touch` non"""
+    print("\n🔍 Test de l'invalidation du cache...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "transactions.csv")
+        _write_sample_csv(path, n_rows=100)
+        data_cache.read_csv_cached(path)
+        entry_dir = data_cache.cache_entry_dir(path)
+
+        # Même contenu, date différente : le cache reste valide
+        later = time.time() + 10
+        os.utime(path, (later, later))
+        assert data_cache.is_entry_valid(entry_dir, path)
+
+        # Contenu différent : le cache est reconstruit
+        _write_sample_csv(path, n_rows=150, seed=7)
+        assert not data_cache.is_entry_valid(entry_dir, path)
+        reloaded = data_cache.read_csv_cached(path)
+        assert len(reloaded) == 150
+        print("✅ Invalidation automatique vérifiée")
+
+
+def test_column_store_zero_copy():
+    """Le magasin projeté expose des colonnes numériques sans copie"""
+    print("\n🔍 Test du magasin de colonnes projetées...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "transactions.csv")
+        expected = _write_sample_csv(path)
+
+        df = column_store.open_column_store(path)
+        assert column_store.is_memory_mapped(df[['Time', 'Amount', 'Class']])
+        np.testing.assert_allclose(df['Amount'], expected['Amount'])
+        assert df['Category'].isna().sum() == expected['Category'].isna().sum()
+
+        attach_ms = column_store.time_attach(column_store.store_dir_for(path))
+        print(f"✅ Magasin projeté: {df.shape}, attachement en {attach_ms:.2f} ms")
+
+
+def test_schema_downcasting():
+    """Le schéma marketing lit des types compacts et réduit la mémoire"""
+    print("\n🔍 Test du schéma de types marketing...")
+
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "marketing_campaign.csv")
+    df = data_schema.read_csv_with_schema(path, 'marketing', sep=';')
+
+    assert df['MntWines'].dtype == np.int32
+    assert isinstance(df['Education'].dtype, pd.CategoricalDtype)
+    assert pd.api.types.is_datetime64_any_dtype(df['Dt_Customer'].dtype)
+
+    report = data_schema.memory_report(df)
+    assert report.iloc[-1]['Gain_%'] > 50
+    print(f"✅ {data_schema.memory_summary(df)}")
+
+
+def test_schema_malformed_integers():
+    """Une colonne entière avec des cellules vides ou du texte est convertie en mémoire, sans seconde lecture"""
+    print("\n🔍 Test des entiers hors schéma...")
+
+    calls = []
+
+    def reader(path, **kwargs):
+        calls.append(kwargs)
+        return pd.read_csv(path, **kwargs)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "creditcard.csv")
+        pd.DataFrame({
+            'Time': [0.0, 60.0, 120.0, 180.0],
+            'Amount': [10.5, 20.0, 5.25, 99.0],
+            'Class': ['0', '', 'inconnu', '1'],
+        }).to_csv(path, index=False)
+        df = data_schema.read_csv_with_schema(path, 'fraud', reader=reader)
+
+    assert len(calls) == 1
+    assert df['Amount'].dtype == np.float32 and df['Class'].dtype == np.float32
+    assert df['Class'].isna().tolist() == [False, True, True, False]
+    print(f"✅ Lecture unique, Class convertie en {df['Class'].dtype}")
+
+
+def test_chunked_readers_malformed_integers():
+    """Une cible vide ou non numérique n'interrompt ni le profil ni l'échantillon lus par blocs"""
+    print("\n🔍 Test des entiers hors schéma en lecture par blocs...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "creditcard.csv")
+        pd.DataFrame({
+            'Time': [0.0, 60.0, 120.0, 180.0, 240.0, 300.0],
+            'Amount': [10.5, 20.0, 5.25, 99.0, 1.0, 2.0],
+            'Class': ['0', '', 'inconnu', '1', '0', '0'],
+        }).to_csv(path, index=False)
+        profile = streaming_profiler.profile_csv(path, chunksize=2)
+        sample = stratified_sampler.sample_csv(path, chunksize=2)
+
+    # Seules les 4 lignes étiquetées sont comptées, où qu'elles tombent dans les blocs
+    assert profile.n_rows == 4 and profile.class_counts.tolist() == [3, 1]
+    assert sample.index.tolist() == [0, 3, 4, 5]
+    assert sample['Class'].dtype == np.int8
+    print(f"✅ {profile.n_rows} lignes profilées, échantillon aux positions {sample.index.tolist()}")
+
+
+def test_column_projection():
+    """Seules les colonnes demandées sont relues, depuis Parquet, .npy ou le magasin projeté"""
+    print("\n🔍 Test de la projection des colonnes...")
+
+    previous = data_cache.PARQUET_AVAILABLE
+    try:
+        for parquet in (previous, False):
+            data_cache.PARQUET_AVAILABLE = parquet
+            with tempfile.TemporaryDirectory() as tmp:
+                path = os.path.join(tmp, "transactions.csv")
+                full = _write_sample_csv(path)
+
+                cold = data_cache.read_csv_cached(path, usecols=['Class', 'Amount'])
+                warm = data_cache.read_csv_cached(path, usecols=['Class', 'Amount'])
+                mapped = column_store.open_column_store(path, usecols=['Amount'])
+                assert list(cold.columns) == list(warm.columns) == ['Amount', 'Class']
+                assert list(mapped.columns) == ['Amount']
+                np.testing.assert_allclose(warm['Amount'], full['Amount'])
+                # Une seule entrée de cache, quel que soit le sous-ensemble demandé
+                assert data_cache.read_csv_cached(path).shape == full.shape
+    finally:
+        data_cache.PARQUET_AVAILABLE = previous
+    print("✅ Projection vérifiée")
+
+
+def main():
+    """Fonction principale de test"""
+    print("🧪 TESTS DU CACHE COLONNAIRE")
+    print("=" * 30)
+
+    test_cache_roundtrip()
+    test_npy_fallback()
+    test_cache_invalidation()
+    test_column_store_zero_copy()
+    test_schema_downcasting()
+    test_schema_malformed_integers()
+    test_chunked_readers_malformed_integers()
+    test_column_projection()
+
+    print("\n" + "=" * 30)
+    print("✅ Tests terminés")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Script de test du chargeur unifié des datasets
+"""
+
+import os
+import tempfile
+import time
+
+import pandas as pd
+
+from data_loader import DatasetIndex, load_dataset, load_dataset_files, sniff_csv
+
+
+def test_sniff_marketing_bom():
+    """Le fichier marketing est détecté en UTF-8 avec BOM et point-virgule"""
+    print("🔍 Test de la détection du dialecte...")
+
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "marketing_campaign.csv")
+    dialect = sniff_csv(path)
+
+    assert dialect['has_bom']
+    assert dialect['encoding'] == 'utf-8-sig'
+    assert dialect['delimiter'] == ';'
+    assert dialect['columns'][0] == 'ID'
+    print(f"✅ Dialecte: {dialect['encoding']}, délimiteur '{dialect['delimiter']}'")
+
+
+def test_index_refresh():
+    """L'index ne relit le répertoire que lorsqu'il change"""
+    print("\n🔍 Test de l'index du répertoire...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pd.DataFrame({'Time': [0, 1], 'Amount': [1.0, 2.0], 'Class': [0, 1]}).to_csv(
+            os.path.join(tmp, "transactions_2024.csv"), index=False
+        )
+        index = DatasetIndex(tmp)
+        assert index.find('fraud') == ["transactions_2024.csv"]
+        assert index.find('marketing') == []
+
+        time.sleep(0.01)
+        pd.DataFrame({'Time': [2], 'Amount': [3.0], 'Class': [0]}).to_csv(
+            os.path.join(tmp, "creditcard.csv"), index=False
+        )
+        # Le nom canonique passe en tête dès que le répertoire a changé
+        assert index.find('fraud')[0] == "creditcard.csv"
+        print(f"✅ Fichiers indexés: {index.csv_files()}")
+
+
+def test_load_dataset_single_parse():
+    """Un fichier au point-virgule avec BOM est chargé directement dans le schéma"""
+    print("\n🔍 Test du chargement unifié...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "marketing_test.csv")
+        with open(path, 'w', encoding='utf-8-sig') as f:
+            f.write("ID;Education;Recency;MntWines\n1;Graduation;10;100\n2;PhD;20;200\n")
+
+        df, found, dialect = load_dataset('marketing', directory=tmp, reader=pd.read_csv)
+        assert os.path.basename(found) == "marketing_test.csv"
+        assert list(df.columns) == ['ID', 'Education', 'Recency', 'MntWines']
+        assert df['MntWines'].dtype == 'int32'
+        print(f"✅ Chargé: {df.shape}")
+
+
+def test_parallel_partitioned_files():
+    """Les fichiers journaliers sont chargés en parallèle puis concaténés ; un schéma différent est refusé"""
+    print("\n🔍 Test du chargement parallèle multi-fichiers...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = []
+        for day in range(3):
+            path = os.path.join(tmp, f"transactions_{day}.csv")
+            pd.DataFrame({
+                'Time': [day * 86400.0, day * 86400.0 + 60],
+                'Amount': [10.0 + day, 20.0],
+                'Class': [0, day % 2]
+            }).to_csv(path, index=False)
+            paths.append(path)
+
+        df = load_dataset_files('fraud', paths, max_workers=2, reader=pd.read_csv, add_source=True)
+        assert len(df) == 6
+        assert df['Class'].dtype == 'int8'
+        assert df['Source_File'].nunique() == 3
+
+        odd = os.path.join(tmp, "transactions_odd.csv")
+        pd.DataFrame({'Time': [0.0], 'Montant': [1.0], 'Class': [0]}).to_csv(odd, index=False)
+        try:
+            load_dataset_files('fraud', paths + [odd], reader=pd.read_csv)
+            raise AssertionError("Schéma incompatible non détecté")
+        except ValueError as e:
+            print(f"✅ Incompatibilité détectée: {e}")
+        print(f"✅ {len(paths)} fichiers fusionnés: {df.shape}")
+
+
+def main():
+    """Fonction principale de test"""
+    print("🧪 TESTS DU CHARGEUR UNIFIÉ")
+    print("=" * 30)
+
+    test_sniff_marketing_bom()
+    test_index_refresh()
+    test_load_dataset_single_parse()
+    test_parallel_partitioned_files()
+
+    print("\n" + "=" * 30)
+    print("✅ Tests terminés")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Script de test des exports à la demande
+"""
+
+import gzip
+import io
+
+import numpy as np
+import pandas as pd
+
+import data_cache
+import exports
+
+
+def test_exports_roundtrip():
+    """Les exports par blocs (CSV, gzip, colonnaire) redonnent les données"""
+    print("🔍 Test des exports à la demande...")
+
+    rng = np.random.default_rng(42)
+    df = pd.DataFrame({
+        'Time': np.arange(1234, dtype=float) * 60,
+        'Amount': rng.gamma(2.0, 50.0, 1234).round(2),
+        'Class': rng.choice([0, 1], 1234, p=[0.95, 0.05])
+    })
+
+    csv_bytes = exports.export_bytes(df, 'csv', chunksize=100)
+    assert csv_bytes == df.to_csv(index=False).encode('utf-8')
+    assert gzip.decompress(exports.export_bytes(df, 'csv.gz', chunksize=100)) == csv_bytes
+
+    columnar = io.BytesIO(exports.export_bytes(df, 'columnar'))
+    if data_cache.PARQUET_AVAILABLE:
+        restored = pd.read_parquet(columnar)
+    else:
+        with np.load(columnar) as arrays:
+            restored = pd.DataFrame({col: arrays[col] for col in arrays.files})
+    pd.testing.assert_frame_equal(restored, df, check_dtype=False)
+    assert exports.export_bytes(df.iloc[:0], 'csv') == df.iloc[:0].to_csv(index=False).encode('utf-8')
+    print(f"✅ {len(df)} lignes exportées en {len(exports.EXPORT_FORMATS)} formats")
+
+
+def main():
+    """Fonction principale de test"""
+    print("🧪 TESTS DES EXPORTS")
+    print("=" * 30)
+
+    test_exports_roundtrip()
+
+    print("\n" + "=" * 30)
+    print("✅ Tests terminés")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Script de test du mémo des filtres
+"""
+
+import numpy as np
+
+import filter_memo
+
+
+def test_filter_memo_budget():
+    """Le mémo des filtres réutilise les résultats et évince les plus anciens au-delà du budget"""
+    print("🔍 Test du mémo des filtres...")
+
+    calls = []
+
+    def compute(n):
+        calls.append(n)
+        return np.zeros(n, dtype=np.uint8)
+
+    memo = filter_memo.FilterMemo(budget_bytes=3000)
+    first = memo.get_or_compute(('rows', (0, 10)), lambda: compute(1000))
+    assert memo.get_or_compute(('rows', (0, 10)), lambda: compute(1000)) is first
+    memo.get_or_compute(('rows', (0, 20)), lambda: compute(1000))
+    # Le premier état redevient le plus récent : c'est le deuxième qui sera évincé
+    memo.get_or_compute(('rows', (0, 10)), lambda: compute(1000))
+    memo.get_or_compute(('rows', (0, 30)), lambda: compute(1500))
+    assert ('rows', (0, 10)) in memo and ('rows', (0, 20)) not in memo
+    assert memo.nbytes <= memo.budget_bytes and calls == [1000, 1000, 1500]
+
+    # Un résultat plus gros que le budget est renvoyé sans être conservé
+    assert len(memo.get_or_compute('big', lambda: compute(5000))) == 5000
+    assert 'big' not in memo
+    stats = memo.stats()
+    assert stats['hits'] == 2 and stats['misses'] == 4
+    print(f"✅ {stats['entries']} résultats conservés ({stats['nbytes']} octets), {stats['hits']} réutilisés")
+
+
+def main():
+    """Fonction principale de test"""
+    print("🧪 TESTS DU MÉMO DES FILTRES")
+    print("=" * 30)
+
+    test_filter_memo_budget()
+
+    print("\n" + "=" * 30)
+    print("✅ Tests terminés")
+
+
+if __name__ == "__main__":
+    main()
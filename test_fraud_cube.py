@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Script de test du cube pré-agrégé des fraudes
+"""
+
+import numpy as np
+import pandas as pd
+
+import fraud_cube
+
+
+def test_fraud_cube_exact():
+    """Le cube avec correction des bornes donne les mêmes agrégats qu'un filtrage des lignes"""
+    print("🔍 Test du cube pré-agrégé...")
+
+    rng = np.random.default_rng(5)
+    df = pd.DataFrame({
+        'Time': np.sort(rng.integers(0, 172800, 30000)).astype('float32'),
+        'Amount': rng.gamma(1.5, 60.0, 30000).astype('float32').round(2),
+        'Class': rng.choice([0, 1], 30000, p=[0.99, 0.01]).astype('int8')
+    })
+    cube = fraud_cube.FraudCube.from_frame(df)
+    hours = df['Time'] / 3600
+
+    for _ in range(40):
+        amount_range = tuple(sorted(float(x) for x in rng.choice(df['Amount'], 2)))
+        time_range = tuple(sorted(float(x) for x in rng.uniform(0, 48, 2)))
+        filtered = df[df['Amount'].between(*amount_range) & hours.between(*time_range)]
+
+        result = cube.query(amount_range, time_range)
+        kpis = result.kpis()
+        assert kpis['total_transactions'] == len(filtered)
+        assert kpis['fraud_count'] == int(filtered['Class'].sum())
+        if len(filtered) > 0:
+            assert np.isclose(kpis['avg_amount'], filtered['Amount'].astype(float).mean())
+
+        expected = filtered.groupby((filtered['Time'] / 3600).astype(int) % 24)['Class'].agg(['count', 'sum'])
+        hourly = result.hourly_stats()
+        assert (hourly['Total_Transactions'].to_numpy() == expected['count'].to_numpy()).all()
+        assert (hourly['Fraudes'].to_numpy() == expected['sum'].to_numpy()).all()
+    print("✅ Agrégats du cube identiques au filtrage")
+
+
+def main():
+    """Fonction principale de test"""
+    print("🧪 TESTS DU CUBE PRÉ-AGRÉGÉ")
+    print("=" * 30)
+
+    test_fraud_cube_exact()
+
+    print("\n" + "=" * 30)
+    print("✅ Tests terminés")
+
+
+if __name__ == "__main__":
+    main()
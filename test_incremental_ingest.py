@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Script de test de l'ingestion incrémentale des transactions
+"""
+
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from incremental_ingest import IncrementalIngestor
+from sample_data import sample_transactions
+
+
+def test_incremental_ingest():
+    """Seules les lignes ajoutées sont analysées et les agrégats suivent le fichier"""
+    print("🔍 Test de l'ingestion incrémentale...")
+
+    df = sample_transactions(3000)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "creditcard.csv")
+        df.iloc[:2000].to_csv(path, index=False)
+        ingestor = IncrementalIngestor(directory=tmp)
+        assert len(ingestor.load()) == 2000
+
+        # Ajout en fin de fichier, dernière ligne incomplète (écriture en cours)
+        tail = df.iloc[2000:].to_csv(index=False, header=False)
+        cut = tail.rfind('\n', 0, len(tail) - 1) + 5
+        with open(path, 'a') as f:
+            f.write(tail[:cut])
+        delta = ingestor.refresh()
+        assert len(delta) == 999 and ingestor.n_rows == 2999
+        with open(path, 'a') as f:
+            f.write(tail[cut:])
+        assert len(ingestor.refresh()) == 1
+
+        # Nouveau fichier d'un export partitionné
+        df.iloc[:500].to_csv(os.path.join(tmp, "transactions_2.csv"), index=False)
+        os.utime(tmp, ns=(0, 0))
+        assert len(ingestor.refresh()) == 500
+
+        expected = pd.concat([df, df.iloc[:500]], ignore_index=True)
+        kpis = ingestor.profile.kpis()
+        assert kpis['total_transactions'] == len(expected)
+        assert kpis['fraud_count'] == int(expected['Class'].sum())
+        assert np.allclose(ingestor.frame()['Amount'].to_numpy(), expected['Amount'].to_numpy(), rtol=1e-6)
+
+        # Fichier réécrit : reconstruction complète
+        df.iloc[:100].to_csv(path, index=False)
+        ingestor.refresh()
+        assert ingestor.n_rows == 600
+    print(f"✅ {kpis['total_transactions']} transactions suivies incrémentalement")
+
+
+def test_malformed_appended_rows():
+    """Une ligne ajoutée sans cible valide est ignorée sans perdre les lignes voisines du delta"""
+    print("\n🔍 Test des lignes ajoutées malformées...")
+
+    df = sample_transactions(100)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "creditcard.csv")
+        df.to_csv(path, index=False)
+        ingestor = IncrementalIngestor(directory=tmp)
+        ingestor.load()
+
+        with open(path, 'a') as f:
+            f.write("172800,0.5,12.5,\n172801,0.1,3.0,inconnu\n172802,-0.2,40.0,1\n")
+        delta = ingestor.refresh()
+        assert len(delta) == 1 and delta['Class'].tolist() == [1]
+        assert ingestor.n_rows == 101 and ingestor.frame()['Class'].dtype == np.int8
+        assert ingestor.profile.kpis()['fraud_count'] == int(df['Class'].sum()) + 1
+
+        # Le delta a été consommé : rien n'est relu à l'actualisation suivante
+        assert len(ingestor.refresh()) == 0 and ingestor.n_rows == 101
+    print(f"✅ {ingestor.n_rows} transactions après un delta malformé")
+
+
+def main():
+    """Fonction principale de test"""
+    print("🧪 TESTS DE L'INGESTION INCRÉMENTALE")
+    print("=" * 30)
+
+    test_incremental_ingest()
+    test_malformed_appended_rows()
+
+    print("\n" + "=" * 30)
+    print("✅ Tests terminés")
+
+
+if __name__ == "__main__":
+    main()
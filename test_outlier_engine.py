@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Script de test du moteur d'outliers
+"""
+
+import numpy as np
+
+from outlier_engine import OutlierScan
+from sample_data import sample_transactions
+
+
+def test_outlier_scan_matches_pandas():
+    """Les seuils et drapeaux de toutes les variables redonnent les calculs pandas colonne par colonne"""
+    print("🔍 Test du moteur d'outliers...")
+
+    df = sample_transactions(20000)
+    df.loc[5, 'V1'] = np.nan
+    features = df.drop(columns=['Class'])
+    for rule in ['iqr', 'zscore', 'mad']:
+        scan = OutlierScan.from_frame(features, rule=rule)
+        for i, col in enumerate(features.columns):
+            values = features[col]
+            if rule == 'iqr':
+                q1, q3 = values.quantile([0.25, 0.75])
+                lower, upper = q1 - 1.5 * (q3 - q1), q3 + 1.5 * (q3 - q1)
+            elif rule == 'zscore':
+                lower, upper = values.mean() - 3 * values.std(), values.mean() + 3 * values.std()
+            else:
+                mad = 1.4826 * (values - values.median()).abs().median()
+                lower, upper = values.median() - 3.5 * mad, values.median() + 3.5 * mad
+            expected = ((values < lower) | (values > upper)).to_numpy()
+            assert np.isclose(scan.bounds['lower'][i], lower) and np.isclose(scan.bounds['upper'][i], upper)
+            assert np.array_equal(scan.flag_matrix[:, i], expected)
+        assert np.array_equal(scan.row_counts, scan.flag_matrix.sum(axis=1))
+
+    # Lift : taux de fraude des outliers de la variable rapporté au taux global
+    lift = scan.fraud_lift(df['Class']).set_index('Variable')
+    amount_outliers = scan.column_flags('Amount')
+    expected_lift = df['Class'][amount_outliers].mean() / df['Class'].mean()
+    assert np.isclose(lift.loc['Amount', 'Lift'], expected_lift)
+    print(f"✅ 3 règles × {len(features.columns)} variables identiques à pandas")
+
+
+def main():
+    """Fonction principale de test"""
+    print("🧪 TESTS DU MOTEUR D'OUTLIERS")
+    print("=" * 30)
+
+    test_outlier_scan_matches_pandas()
+
+    print("\n" + "=" * 30)
+    print("✅ Tests terminés")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Script de test des résumés de distributions
+"""
+
+import numpy as np
+
+import plot_summaries
+
+
+def test_plot_summaries():
+    """Les résumés des graphiques sont bornés et fidèles aux données brutes"""
+    print("🔍 Test des résumés de distributions...")
+
+    rng = np.random.default_rng(5)
+    values = rng.gamma(1.5, 60.0, 100000)
+
+    box = plot_summaries.box_summary(values, max_points=500)
+    q1, q3 = np.quantile(values, [0.25, 0.75])
+    inside = values[(values >= q1 - 1.5 * (q3 - q1)) & (values <= q3 + 1.5 * (q3 - q1))]
+    assert np.isclose(box['q1'], q1) and np.isclose(box['upperfence'], inside.max())
+    assert len(box['outliers']) == 500 and box['outliers'][-1] == values.max()
+
+    # Densité par FFT ≈ densité gaussienne exacte avec la même largeur de bande
+    grid, density = plot_summaries.binned_kde(values)
+    bandwidth = plot_summaries.silverman_bandwidth(len(values), values.std(ddof=1), q3 - q1)
+    probe = grid[::64]
+    exact = np.exp(-0.5 * ((probe[:, None] - values[None, :5000]) / bandwidth) ** 2).sum(axis=1)
+    exact /= 5000 * np.sqrt(2 * np.pi) * bandwidth
+    assert len(density) == plot_summaries.KDE_GRID_SIZE
+    assert np.abs(density[::64] - exact).max() < 0.1 * density.max()
+    assert np.isclose(density.sum() * (grid[1] - grid[0]), 1.0, atol=1e-2)
+    print(f"✅ {len(values)} valeurs résumées en {len(density)} points de densité")
+
+
+def main():
+    """Fonction principale de test"""
+    print("🧪 TESTS DES RÉSUMÉS DE DISTRIBUTIONS")
+    print("=" * 30)
+
+    test_plot_summaries()
+
+    print("\n" + "=" * 30)
+    print("✅ Tests terminés")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Script de test des esquisses de quantiles
+"""
+
+import numpy as np
+
+from quantile_sketch import QuantileSketch, matrix_quantiles, quantiles
+
+
+def test_quantile_sketch_error_bound():
+    """Les esquisses, par blocs ou fusionnées, respectent l'erreur de rang demandée"""
+    print("🔍 Test des esquisses de quantiles...")
+
+    rng = np.random.default_rng(3)
+    values = rng.gamma(1.5, 60.0, 300_000)
+    ordered = np.sort(values)
+    probs = np.linspace(0.01, 0.99, 99)
+
+    streamed = QuantileSketch(error=0.01)
+    for chunk in np.array_split(values, 7):
+        streamed.update(chunk)
+    partitions = [QuantileSketch.from_values(part, error=0.01, seed=i)
+                  for i, part in enumerate(np.array_split(values, 5))]
+    merged = partitions[0]
+    for part in partitions[1:]:
+        merged.merge(part)
+
+    for sketch in (streamed, merged):
+        ranks = np.searchsorted(ordered, sketch.quantile(probs)) / len(values)
+        assert np.abs(ranks - probs).max() < 0.01
+        assert sketch.count == len(values) and sketch.size < 2000
+        assert sketch.quantile(0) == values.min() and sketch.quantile(1) == values.max()
+
+    # Peu de valeurs : aucune compaction, résultat exact ; seuil de bascule des helpers
+    small = values[:100]
+    assert np.allclose(QuantileSketch.from_values(small).quantile(probs), np.quantile(small, probs))
+    assert np.allclose(quantiles(values, probs), np.quantile(values, probs))
+    approx = quantiles(values, [0.25, 0.75], threshold=1000)
+    assert np.abs(np.searchsorted(ordered, approx) / len(values) - [0.25, 0.75]).max() < 0.01
+    matrix = np.vstack([values[:50_000], values[50_000:100_000]])
+    assert matrix_quantiles(matrix, [0.5], threshold=1000).shape == (1, 2)
+    print(f"✅ Erreur de rang < 1 % avec {streamed.size} valeurs conservées sur {len(values):,}")
+
+
+def main():
+    """Fonction principale de test"""
+    print("🧪 TESTS DES ESQUISSES DE QUANTILES")
+    print("=" * 30)
+
+    test_quantile_sketch_error_bound()
+
+    print("\n" + "=" * 30)
+    print("✅ Tests terminés")
+
+
+if __name__ == "__main__":
+    main()
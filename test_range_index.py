@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Script de test de l'index trié des filtres
+"""
+
+import numpy as np
+
+import range_index
+
+
+def test_range_index_matches_masks():
+    """Les plages résolues par recherche dichotomique donnent les lignes des masques booléens"""
+    print("🔍 Test de l'index trié des filtres...")
+
+    rng = np.random.default_rng(3)
+    amounts = rng.gamma(1.5, 60.0, 20000).astype('float32').round(2)
+    amounts[7] = np.nan
+    hours = (np.sort(rng.uniform(0, 172800, 20000)) / 3600).astype('float32')
+    index = range_index.RangeFilterIndex({'Amount': amounts, 'Time_Hours': hours})
+
+    for _ in range(50):
+        amount_range = tuple(sorted(rng.choice(amounts[~np.isnan(amounts)], 2).tolist()))
+        time_range = tuple(sorted(rng.uniform(0, 48, 2).tolist()))
+        expected = np.nonzero(
+            (amounts >= amount_range[0]) & (amounts <= amount_range[1]) &
+            (hours >= time_range[0]) & (hours <= time_range[1])
+        )[0]
+        rows = index.select({'Amount': amount_range, 'Time_Hours': time_range})
+        assert np.array_equal(rows, expected)
+
+    assert len(index.select({'Amount': None})) == len(amounts)
+    print("✅ Sélections identiques aux masques")
+
+
+def main():
+    """Fonction principale de test"""
+    print("🧪 TESTS DE L'INDEX DES FILTRES")
+    print("=" * 30)
+
+    test_range_index_matches_masks()
+
+    print("\n" + "=" * 30)
+    print("✅ Tests terminés")
+
+
+if __name__ == "__main__":
+    main()
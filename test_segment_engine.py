@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Script de test de la segmentation client
+"""
+
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+import segment_customers
+from segment_engine import (RFM_COLUMNS, SEGMENT_NAMES, SegmentModel, SegmentSweep, add_rfm_totals, assign_segments,
+                            customer_features, fit_segments, load_or_fit_model, load_snapshot, nearest_centers,
+                            optimal_k_search, refresh_segments, save_snapshot, snapshot_path, stratified_silhouette)
+
+
+def _sample_customers(n_rows=30_000, seed=7):
+    """Crée des clients synthétiques au format marketing_campaign.csv (quatre groupes)"""
+    rng = np.random.default_rng(seed)
+    group = rng.integers(4, size=n_rows)
+    customers = pd.DataFrame({
+        'ID': np.arange(n_rows),
+        'Recency': (np.array([10, 40, 70, 90])[group] + rng.normal(0, 8, n_rows)).clip(0, 99).round(),
+        'MntWines': rng.gamma(2.0, np.array([400, 150, 50, 20])[group]).round(),
+        'MntFruits': rng.gamma(2.0, 20, n_rows).round(),
+        'NumWebPurchases': rng.poisson(np.array([8, 5, 2, 1])[group]),
+        'NumStorePurchases': rng.poisson(np.array([10, 6, 3, 1])[group]),
+    })
+    customers.loc[rng.choice(n_rows, 50, replace=False), 'Recency'] = np.nan
+    return customers
+
+
+def test_minibatch_segmentation():
+    """Le K-Means par mini-lots d'un CSV lu par blocs reste proche du K-Means complet"""
+    print("🔍 Test de la segmentation par mini-lots...")
+
+    customers = _sample_customers()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "marketing_campaign.csv")
+        customers.to_csv(path, sep=';', index=False, encoding='utf-8-sig')
+        streamed, labels = fit_segments(path, RFM_COLUMNS, 4, threshold=10_000, chunksize=7000)
+        full, _ = fit_segments(path, RFM_COLUMNS, 4, method='kmeans')
+
+    assert streamed.method == 'minibatch' and full.method == 'kmeans'
+    assert streamed.n_rows == len(customers) and len(labels) == len(customers)
+    assert abs(streamed.inertia - full.inertia) / full.inertia < 0.02
+    assert abs(streamed.inertia_gap['gap']) < 0.02
+    # Mêmes statistiques de standardisation (médiane estimée par esquisse)
+    assert np.allclose(streamed.mean, full.mean, rtol=1e-3) and np.allclose(streamed.scale, full.scale, rtol=1e-3)
+    assert np.array_equal(streamed.predict(customers.assign(
+        Total_Spending=customers[['MntWines', 'MntFruits']].sum(axis=1),
+        Total_Purchases=customers[['NumWebPurchases', 'NumStorePurchases']].sum(axis=1))), labels)
+    print(f"✅ {len(labels):,} clients, inertie {streamed.inertia_gap['gap']:+.3%} par rapport au K-Means complet")
+
+
+def test_segment_sweep():
+    """Les segmentations précalculées en arrière-plan sont celles d'un calcul direct"""
+    print("\n🔍 Test des segmentations précalculées...")
+
+    customers = add_rfm_totals(_sample_customers(n_rows=3000))
+    sweep = SegmentSweep(customers, RFM_COLUMNS, k_values=range(2, 6), first_k=4, max_workers=2)
+    fit = sweep.result(4)
+    _, labels = fit_segments(customers, RFM_COLUMNS, 4)
+    assert np.array_equal(fit['labels'], labels) and fit['model'].n_clusters == 4
+
+    for k in range(2, 6):
+        sweep.result(k)
+    metrics = sweep.metrics()
+    assert list(metrics['Clusters']) == [2, 3, 4, 5] and metrics['Inertie'].is_monotonic_decreasing
+    assert metrics['Silhouette'].between(-1, 1).all() and (metrics['Calinski_Harabasz'] > 0).all()
+    print(f"✅ {len(metrics)} segmentations, silhouette max {metrics['Silhouette'].max():.3f}")
+
+
+def test_optimal_k_search():
+    """La silhouette stratifiée approche la silhouette exacte et désigne le meilleur k"""
+    print("\n🔍 Test de la recherche du nombre optimal de clusters...")
+
+    from sklearn.metrics import silhouette_score
+
+    customers = add_rfm_totals(_sample_customers(n_rows=6000))
+    model, labels = fit_segments(customers, RFM_COLUMNS, 4)
+    X_scaled = model.transform(customers)
+    estimate = stratified_silhouette(X_scaled, labels, sample_size=1500)
+    assert abs(estimate - silhouette_score(X_scaled, labels)) < 0.02
+
+    best_k, metrics, best_fit = optimal_k_search(customers, RFM_COLUMNS, k_values=range(2, 6), max_workers=2)
+    assert best_k == metrics.loc[metrics['Silhouette'].idxmax(), 'Clusters']
+    assert best_fit['k'] == best_k and len(best_fit['labels']) == len(customers)
+    assert (metrics['Duree_s'] > 0).all()
+    print(f"✅ k optimal = {best_k}, silhouette estimée {estimate:.3f}")
+
+
+def test_segment_model_persistence():
+    """Le modèle enregistré affecte de nouveaux clients par blocs avec des segments stables"""
+    print("\n🔍 Test du modèle de segmentation enregistré...")
+
+    customers = add_rfm_totals(_sample_customers(n_rows=5000))
+    model, labels = fit_segments(customers, RFM_COLUMNS, 4)
+    assert model.names == SEGMENT_NAMES
+    # Segments numérotés par valeur : l'ordre des lignes ne change ni les numéros ni les noms
+    shuffled = customers.sample(frac=1.0, random_state=1)
+    _, shuffled_labels = fit_segments(shuffled, RFM_COLUMNS, 4)
+    assert (pd.Series(shuffled_labels, index=shuffled.index).loc[customers.index].to_numpy() == labels).mean() > 0.99
+
+    with tempfile.TemporaryDirectory() as tmp:
+        model_path = os.path.join(tmp, "segment_model.json")
+        loaded = SegmentModel.load(model.save(model_path))
+        assert np.array_equal(loaded.predict(customers), labels) and loaded.names == model.names
+
+        # Modèle existant réutilisé sans réajustement
+        mtime = os.stat(model_path).st_mtime_ns
+        reused, reused_labels = load_or_fit_model(customers.head(100), RFM_COLUMNS, 4, model_path)
+        assert os.stat(model_path).st_mtime_ns == mtime and np.array_equal(reused_labels, labels[:100])
+
+        # Affectation en lot d'un CSV, bloc par bloc, et script en ligne de commande
+        path = os.path.join(tmp, "nouveaux_clients.csv")
+        _sample_customers(n_rows=5000).to_csv(path, sep=';', index=False)
+        assigned = pd.concat(assign_segments(loaded, path, chunksize=1200))
+        assert list(assigned['ID']) == list(customers['ID']) and np.array_equal(assigned['Segment'], labels)
+        output = os.path.join(tmp, "segments.csv")
+        assert segment_customers.main(['assign', path, '--model', model_path, '--output', output]) == 0
+        pd.testing.assert_frame_equal(pd.read_csv(output), assigned.reset_index(drop=True), check_dtype=False)
+    counts = {name: int(count) for name, count in assigned['Segment_Name'].value_counts().items()}
+    print(f"✅ {len(assigned):,} clients affectés : {counts}")
+
+
+def test_incremental_segmentation():
+    """Les clients ajoutés ou modifiés mettent à jour les centres ; une forte dérive déclenche un réajustement"""
+    print("\n🔍 Test de la mise à jour incrémentale des segments...")
+
+    customers = add_rfm_totals(_sample_customers(n_rows=10_000))
+    with tempfile.TemporaryDirectory() as tmp:
+        model_path = os.path.join(tmp, "segment_model.json")
+        model, labels = load_or_fit_model(customers, RFM_COLUMNS, 4, model_path)
+        snapshot = load_snapshot(snapshot_path(model_path))
+        assert snapshot is not None and np.array_equal(snapshot[2], labels)
+
+        # Quelques clients ajoutés et modifiés : centres mis à jour, segments stables
+        appended = _sample_customers(n_rows=300, seed=8).assign(ID=lambda d: d['ID'] + len(customers))
+        updated = pd.concat([customers, appended], ignore_index=True)
+        updated.loc[:49, 'MntWines'] += 100
+        updated = add_rfm_totals(updated)
+        ids, X = customer_features(updated, RFM_COLUMNS)
+        refreshed, new_labels, report = refresh_segments(model, ids, X, snapshot)
+        assert report['mode'] == 'incrémental' and (report['new'], report['changed'], report['removed']) == (300, 50, 0)
+        assert (new_labels[:len(customers)] == labels).mean() > 0.99 and refreshed.names == model.names
+        assert refresh_segments(model, *customer_features(customers, RFM_COLUMNS), snapshot)[2]['mode'] == 'inchangé'
+
+        # Nouvelle clientèle très différente : dérive détectée, réajustement complet
+        drifted = _sample_customers(n_rows=10_000, seed=9).assign(ID=lambda d: d['ID'] + len(customers))
+        drifted[['MntWines', 'NumStorePurchases']] *= 4
+        drifted = add_rfm_totals(pd.concat([customers, drifted], ignore_index=True))
+        _, _, drift_report = refresh_segments(model, *customer_features(drifted, RFM_COLUMNS), snapshot)
+        assert drift_report['mode'] == 'réajustement'
+
+        # Ligne de commande : mise à jour à partir du modèle et de l'instantané enregistrés
+        path = os.path.join(tmp, "marketing_campaign.csv")
+        updated.to_csv(path, sep=';', index=False)
+        assert segment_customers.main(['update', path, '--model', model_path]) == 0
+        assert len(load_snapshot(snapshot_path(model_path))[0]) == len(updated)
+    print(f"✅ Mise à jour en {report['seconds']:.3f}s, déplacement des centres {report['centroid_shift']:.3f}, "
+          f"dérive {drift_report['centroid_shift']:.2f}")
+
+
+def test_incremental_exact_sums():
+    """La mise à jour repart des moyennes exactes des segments, même après un K-Means par mini-lots"""
+    print("\n🔍 Test des sommes exactes de l'instantané...")
+
+    customers = add_rfm_totals(_sample_customers(n_rows=20_000))
+    model, labels = fit_segments(customers, RFM_COLUMNS, 4, method='minibatch')
+    ids, X = customer_features(customers, RFM_COLUMNS)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "segment_model.snapshot.npz")
+        save_snapshot(path, model, ids, X, labels)
+        snapshot = load_snapshot(path)
+
+        # Sommes et effectifs enregistrés = ceux des segments ; les centres par mini-lots s'en écartent
+        X_scaled = model.scale_matrix(X)
+        means = np.array([X_scaled[labels == i].mean(axis=0) for i in range(4)])
+        assert np.allclose(snapshot[3] / snapshot[4][:, None], means)
+        assert np.array_equal(snapshot[4], np.bincount(labels, minlength=4))
+        assert not np.allclose(model.centers, means)
+
+        # Un client ajouté : nouveaux centres = moyennes exactes des membres, client compris
+        extra = add_rfm_totals(_sample_customers(n_rows=100, seed=11).head(1).assign(ID=len(customers)))
+        new_ids, new_X = customer_features(pd.concat([customers, extra], ignore_index=True), RFM_COLUMNS)
+        refreshed, _, report = refresh_segments(model, new_ids, new_X, snapshot)
+        assert report['mode'] == 'incrémental' and report['new'] == 1
+        extra_label = nearest_centers(model.scale_matrix(new_X[-1:]), means)[0]
+        members = np.concatenate((labels, extra_label))
+        expected = np.array([model.scale_matrix(new_X)[members == i].mean(axis=0) for i in range(4)])
+        assert np.allclose(refreshed.centers, expected)
+    print(f"✅ Centres mis à jour exacts (écart des centres par mini-lots : "
+          f"{np.abs(model.centers - means).max():.3f})")
+
+
+def test_snapshot_text_ids():
+    """Des identifiants texte sont enregistrés et relus sans pickle ; un instantané corrompu lève une erreur"""
+    print("\n🔍 Test des identifiants texte...")
+
+    customers = _sample_customers(n_rows=3000)
+    customers['ID'] = [f"C{i:06d}" for i in range(len(customers))]
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "marketing_campaign.csv")
+        model_path = os.path.join(tmp, "segment_model.json")
+        customers.to_csv(path, sep=';', index=False)
+        assert segment_customers.main(['fit', path, '--model', model_path]) == 0
+        snapshot = load_snapshot(snapshot_path(model_path))
+        assert snapshot[0].dtype.kind == 'U' and snapshot[0][0] == "C000000"
+
+        customers.loc[3000 - 1, 'MntWines'] += 500
+        customers.to_csv(path, sep=';', index=False)
+        assert segment_customers.main(['update', path, '--model', model_path]) == 0
+
+        with open(snapshot_path(model_path), 'wb') as f:
+            f.write(b"corrompu")
+        try:
+            load_snapshot(snapshot_path(model_path))
+        except (OSError, ValueError):
+            pass
+        else:
+            raise AssertionError("Un instantané corrompu doit lever une erreur")
+        assert load_snapshot(os.path.join(tmp, "absent.npz")) is None
+    print(f"✅ {len(snapshot[0]):,} identifiants texte relus")
+
+
+def main():
+    """Fonction principale de test"""
+    print("🧪 TESTS DE LA SEGMENTATION CLIENT")
+    print("=" * 30)
+
+    test_minibatch_segmentation()
+    test_segment_sweep()
+    test_optimal_k_search()
+    test_segment_model_persistence()
+    test_incremental_segmentation()
+    test_incremental_exact_sums()
+    test_snapshot_text_ids()
+
+    print("\n" + "=" * 30)
+    print("✅ Tests terminés")
+
+
+if __name__ == "__main__":
+    main()
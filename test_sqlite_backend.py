@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Script de test du moteur de requêtes SQLite
+"""
+
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+import plot_summaries
+import sqlite_backend
+
+
+def _write_sample_csv(path, n_rows=2000, seed=42):
+    """Crée un petit CSV de transactions au format creditcard.csv"""
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        'Time': np.arange(n_rows, dtype=float) * 60,
+        'Amount': rng.gamma(2.0, 50.0, n_rows).round(2),
+        'Class': rng.choice([0, 1], n_rows, p=[0.95, 0.05])
+    })
+    df.to_csv(path, index=False)
+    return df
+
+
+def test_sqlite_backend():
+    """Les requêtes SQL indexées donnent les mêmes agrégats que pandas"""
+    print("🔍 Test du moteur SQLite...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "creditcard.csv")
+        df = _write_sample_csv(path)
+        store = sqlite_backend.open_store(path, cache_dir=os.path.join(tmp, "cache"))
+
+        amount_range, time_range = (20.0, 150.0), (1.0, 20.0)
+        hours = df['Time'] / 3600
+        filtered = df[df['Amount'].between(*amount_range) & hours.between(*time_range)]
+
+        kpis = store.kpis(amount_range, time_range)
+        assert kpis['total_transactions'] == len(filtered)
+        assert kpis['fraud_count'] == int(filtered['Class'].sum())
+
+        describe = store.amount_describe(0, amount_range, time_range)
+        expected = filtered.loc[filtered['Class'] == 0, 'Amount'].describe()
+        assert np.allclose(describe.to_numpy(), expected.to_numpy())
+        levels = [0.0, 0.1, 0.5, 0.9, 0.99, 1.0]
+        assert np.allclose(store.amount_quantiles(levels, amount_range, time_range),
+                           filtered['Amount'].astype(np.float32).quantile(levels))
+
+        hourly = store.hourly_stats(amount_range, time_range)
+        assert hourly['Fraudes'].sum() == kpis['fraud_count']
+        assert store.day_hour_frauds(amount_range, time_range).to_numpy().sum() == kpis['fraud_count']
+        # Échantillon systématique : environ `limit` lignes, jamais plus
+        assert 40 <= len(store.fetch(amount_range, time_range, limit=50)) <= 50
+
+        # Résumés des graphiques calculés en SQL = résumés NumPy des lignes filtrées
+        normal = filtered.loc[filtered['Class'] == 0, 'Amount'].to_numpy()
+        edges = plot_summaries.histogram_edges(*amount_range)
+        assert np.array_equal(store.amount_histogram(*amount_range, 50, 0, amount_range, time_range),
+                              plot_summaries.bin_counts(normal, edges))
+        box, expected_box = store.amount_box(0, amount_range, time_range), plot_summaries.box_summary(normal)
+        for key in ['q1', 'median', 'q3', 'lowerfence', 'upperfence']:
+            assert np.isclose(box[key], expected_box[key])
+
+        # Image de densité Temps × Montant : SQL = NumPy, points hors fenêtre ignorés
+        windows = ((3600.0, 50000.0), (10.0, 400.0))
+        raster = store.amount_time_raster(*windows, shape=(60, 30))
+        expected_raster = plot_summaries.density_raster(df['Time'], df['Amount'], *windows, shape=(60, 30))
+        assert np.array_equal(raster[2], expected_raster[2])
+        in_window = df['Time'].between(*windows[0]) & df['Amount'].between(*windows[1])
+        assert raster[2].sum() == in_window.sum() and raster[2].shape == (30, 60)
+        store.close()
+    print(f"✅ {kpis['total_transactions']} transactions filtrées en SQL")
+
+
+def test_sqlite_fetch_sample():
+    """L'échantillon borné des lignes filtrées est tiré par rowid, sans tri aléatoire de toute la sélection"""
+    print("\n🔍 Test de l'échantillon SQLite...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "creditcard.csv")
+        df = _write_sample_csv(path, n_rows=20000)
+        store = sqlite_backend.open_store(path, cache_dir=os.path.join(tmp, "cache"))
+        statements = []
+        store.conn.set_trace_callback(statements.append)
+
+        amount_range, time_range = (20.0, 150.0), (10.0, 300.0)
+        hours = df['Time'] / 3600
+        filtered = df[df['Amount'].between(*amount_range) & hours.between(*time_range)]
+        sample = store.fetch(amount_range, time_range, limit=500, columns=['Time', 'Amount', 'Class'])
+        assert 400 <= len(sample) <= 500
+        assert sample['Amount'].between(*amount_range).all() and (sample['Time'] / 3600).between(*time_range).all()
+        # Échantillon réparti sur toute la période filtrée
+        assert sample['Time'].min() < filtered['Time'].quantile(0.05) < filtered['Time'].quantile(0.95) < sample['Time'].max()
+        assert not any('RANDOM()' in sql for sql in statements)
+
+        # Moins de lignes que la limite : toutes les lignes filtrées
+        few = store.fetch((20.0, 21.0), time_range, limit=500)
+        assert len(few) == int((filtered['Amount'] <= 21.0).sum())
+
+        # Points atypiques des boîtes à moustaches : même tirage borné
+        box = store.amount_box(0, time_range=time_range, max_points=50)
+        normal = df[(df['Class'] == 0) & hours.between(*time_range)]
+        outside = normal[(normal['Amount'] < box['lowerfence']) | (normal['Amount'] > box['upperfence'])]
+        assert len(outside) > 50 and 40 <= len(box['outliers']) <= 50
+        assert np.isin(box['outliers'].astype(np.float32), outside['Amount'].to_numpy(np.float32)).all()
+        assert not any('RANDOM()' in sql for sql in statements)
+        store.close()
+    print(f"✅ {len(sample)} lignes échantillonnées sur {len(filtered)}")
+
+
+def main():
+    """Fonction principale de test"""
+    print("🧪 TESTS DU MOTEUR SQLITE")
+    print("=" * 30)
+
+    test_sqlite_backend()
+    test_sqlite_fetch_sample()
+
+    print("\n" + "=" * 30)
+    print("✅ Tests terminés")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Script de test de l'échantillonnage stratifié
+"""
+
+import os
+import tempfile
+
+import numpy as np
+
+from sample_data import sample_transactions
+from stratified_sampler import WEIGHT_COL, sample_csv, stratified_sample, weighted_fraud_counts
+
+
+def test_stratified_sample():
+    """Toutes les fraudes sont conservées et les comptages pondérés sont exacts"""
+    print("🔍 Test de l'échantillonnage stratifié...")
+
+    df = sample_transactions(20000)
+    n_frauds = int(df['Class'].sum())
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "creditcard.csv")
+        df.to_csv(path, index=False)
+        from_csv = sample_csv(path, budget=3000, chunksize=1500)
+    from_frame = stratified_sample(df, budget=3000, chunksize=1500)
+
+    for sample in (from_csv, from_frame):
+        assert len(sample) == 3000
+        assert int(sample['Class'].sum()) == n_frauds
+        assert np.isclose(sample[WEIGHT_COL].sum(), len(df))
+        weighted_frauds = sample.loc[sample['Class'] == 1, WEIGHT_COL].sum()
+        assert weighted_frauds == n_frauds
+        # Même colonne cible par défaut que l'échantillonneur
+        assert weighted_fraud_counts(sample) == (len(df), n_frauds)
+
+    # Les lignes conservées sont bien celles du fichier
+    assert np.allclose(from_csv['Amount'], df.loc[from_csv.index, 'Amount'], rtol=1e-6)
+    print(f"✅ {n_frauds} fraudes conservées sur {len(from_csv)} lignes échantillonnées")
+
+
+def main():
+    """Fonction principale de test"""
+    print("🧪 TESTS DE L'ÉCHANTILLONNAGE STRATIFIÉ")
+    print("=" * 30)
+
+    test_stratified_sample()
+
+    print("\n" + "=" * 30)
+    print("✅ Tests terminés")
+
+
+if __name__ == "__main__":
+    main()
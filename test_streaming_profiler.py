@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Script de test du profilage en flux des transactions
+"""
+
+import os
+import tempfile
+
+import numpy as np
+
+from sample_data import sample_transactions
+from streaming_profiler import FraudProfile, RunningStats, profile_csv
+
+
+def test_running_stats_merge():
+    """La fusion de deux accumulateurs équivaut au calcul sur l'ensemble"""
+    print("🔍 Test des accumulateurs de Welford...")
+
+    rng = np.random.default_rng(0)
+    values = rng.normal(100, 15, 10000)
+    left = RunningStats().update(values[:3000])
+    right = RunningStats().update(values[3000:])
+    left.merge(right)
+
+    assert left.count == len(values)
+    assert np.isclose(left.mean, values.mean())
+    assert np.isclose(left.std, values.std(ddof=1))
+    assert left.min == values.min() and left.max == values.max()
+    print(f"✅ Moyenne {left.mean:.3f}, écart-type {left.std:.3f}")
+
+
+def test_profile_matches_pandas():
+    """Les KPIs en flux correspondent aux calculs pandas sur le fichier complet"""
+    print("\n🔍 Test du profil en flux...")
+
+    df = sample_transactions()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "creditcard.csv")
+        df.to_csv(path, index=False)
+        profile = profile_csv(path, chunksize=700)
+
+    kpis = profile.kpis()
+    assert kpis['total_transactions'] == len(df)
+    assert kpis['fraud_count'] == int(df['Class'].sum())
+    assert np.isclose(kpis['period_hours'], df['Time'].max() / 3600)
+
+    hours = (df['Time'] / 3600).astype(int) % 24
+    expected = df.groupby(hours)['Class'].agg(['count', 'sum'])
+    hourly = profile.hourly_stats().set_index('Hour')
+    assert (hourly['Total_Transactions'].to_numpy() == expected['count'].to_numpy()).all()
+    assert (hourly['Fraudes'].to_numpy() == expected['sum'].to_numpy()).all()
+
+    describe = profile.amount_describe(0)
+    exact = df.loc[df['Class'] == 0, 'Amount'].describe()
+    assert np.isclose(describe['mean'], exact['mean'])
+    assert np.isclose(describe['std'], exact['std'])
+    assert abs(describe['50%'] - exact['50%']) / exact['50%'] < 0.02
+    print(f"✅ {kpis['total_transactions']} transactions, {kpis['fraud_count']} fraudes")
+
+
+def test_profile_merge():
+    """Deux partitions profilées séparément puis fusionnées donnent le profil global"""
+    print("\n🔍 Test de la fusion de profils...")
+
+    df = sample_transactions(2000)
+    full = FraudProfile().update(df)
+    merged = FraudProfile().update(df.iloc[:800]).merge(FraudProfile().update(df.iloc[800:]))
+
+    assert (full.hour_counts == merged.hour_counts).all()
+    assert merged.amount_sketches[0].count == full.amount_sketches[0].count
+    assert np.allclose(merged.amount_describe(1)[['min', '25%', '50%', '75%', 'max']],
+                       full.amount_describe(1)[['min', '25%', '50%', '75%', 'max']])
+    assert np.isclose(full.amount_stats[1].mean, merged.amount_stats[1].mean)
+    print("✅ Fusion vérifiée")
+
+
+def main():
+    """Fonction principale de test"""
+    print("🧪 TESTS DU PROFILAGE EN FLUX")
+    print("=" * 30)
+
+    test_running_stats_merge()
+    test_profile_matches_pandas()
+    test_profile_merge()
+
+    print("\n" + "=" * 30)
+    print("✅ Tests terminés")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Script de test des agrégats temporels
+"""
+
+import numpy as np
+
+from sample_data import sample_transactions
+from time_aggregates import TimeAggregates
+
+
+def test_time_aggregates_match_groupby():
+    """Le comptage par heure absolue redonne les groupby/pivot horaires, pondérés ou non"""
+    print("🔍 Test des agrégats temporels...")
+
+    df = sample_transactions(20000)
+    aggregates = TimeAggregates.from_frame(df)
+    hour = (df['Time'] // 3600).astype(int) % 24
+    day = (df['Time'] // 86400).astype(int)
+
+    expected = df.groupby(hour)['Class'].agg(['count', 'sum', 'mean'])
+    hourly = aggregates.hourly_stats()
+    assert hourly['Hour'].tolist() == expected.index.tolist()
+    assert np.array_equal(hourly['Total_Transactions'], expected['count'])
+    assert np.array_equal(hourly['Fraudes'], expected['sum'])
+    assert np.allclose(hourly['Taux_Fraude'], expected['mean'])
+
+    pivot = df.groupby([day, hour])['Class'].sum().unstack(fill_value=0)
+    assert np.array_equal(aggregates.day_hour_frauds().to_numpy(), pivot.to_numpy())
+    assert aggregates.day_hour_matrix().shape == (2, 24, 2)
+
+    # Pondération : chaque ligne compte pour son poids
+    weights = np.full(len(df), 2.5)
+    weighted = TimeAggregates.from_arrays(df['Time'], df['Class'], weights).hourly_stats()
+    assert np.allclose(weighted['Total_Transactions'], expected['count'] * 2.5)
+    assert np.allclose(weighted['Taux_Fraude'], expected['mean'])
+    print(f"✅ {len(hourly)} heures et {pivot.size} cellules jour × heure identiques")
+
+
+def main():
+    """Fonction principale de test"""
+    print("🧪 TESTS DES AGRÉGATS TEMPORELS")
+    print("=" * 30)
+
+    test_time_aggregates_match_groupby()
+
+    print("\n" + "=" * 30)
+    print("✅ Tests terminés")
+
+
+if __name__ == "__main__":
+    main()
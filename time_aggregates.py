@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Agrégats Temporels des Transactions
+===================================
+
+Noyau commun des statistiques horaires et de la heatmap jour × heure des
+dashboards de fraude, qui utilisaient `groupby` puis `pivot` (et, dans
+le dashboard unifié, une heure non entière créant un groupe par horodatage).
+
+Les temps sont convertis en codes entiers d'heure absolue
+(`Time // 3600`), combinés à la classe, puis comptés en un seul
+`np.bincount` (pondéré si l'échantillon porte des poids). Toutes les vues
+en dérivent sans repasser sur les lignes :
+- transactions et fraudes par heure de la journée ;
+- matrice dense jour × heure × classe ;
+- tables au format attendu par les graphiques (`hourly_stats`,
+  `day_hour_frauds`).
+"""
+
+import numpy as np
+import pandas as pd
+
+HOURS_PER_DAY = 24
+SECONDS_PER_HOUR = 3600
+
+
+def absolute_hours(time_seconds):
+    """Heure absolue entière depuis la première transaction (-1 pour les valeurs manquantes ou négatives)"""
+    time_seconds = np.asarray(time_seconds, dtype=np.float64)
+    known = time_seconds >= 0
+    if not known.all():
+        time_seconds = np.where(known, time_seconds, -SECONDS_PER_HOUR)
+    # Troncature du quotient, corrigée d'une unité quand l'arrondi a franchi une heure pleine
+    hours = (time_seconds / SECONDS_PER_HOUR).astype(np.int64)
+    hours -= hours * SECONDS_PER_HOUR > time_seconds
+    return hours
+
+
+def hour_class_counts(hours, labels, weights=None, n_hours=None):
+    """
+    Transactions par heure absolue et par classe en un seul passage : tableau (n_heures, 2).
+
+    `labels` est binaire (non nul = fraude) ; avec `weights`, chaque ligne
+    compte pour son poids. Les heures négatives (inconnues) sont ignorées.
+    """
+    hours = np.asarray(hours)
+    labels = np.asarray(labels)
+    valid = hours >= 0
+    if not valid.all():
+        hours, labels = hours[valid], labels[valid]
+        weights = np.asarray(weights)[valid] if weights is not None else None
+    if n_hours is None:
+        n_hours = int(hours.max()) + 1 if len(hours) > 0 else 0
+    codes = hours * 2 + (labels != 0)
+    counts = np.bincount(codes, weights=weights, minlength=n_hours * 2)
+    return counts[:n_hours * 2].reshape(n_hours, 2)
+
+
+def hourly_stats_frame(counts, frauds):
+    """Table par heure de la journée (heures sans transaction omises), colonnes des graphiques"""
+    hours = np.nonzero(counts)[0]
+    return pd.DataFrame({
+        'Hour': hours,
+        'Total_Transactions': counts[hours],
+        'Fraudes': frauds[hours],
+        'Taux_Fraude': frauds[hours] / counts[hours]
+    })
+
+
+class TimeAggregates:
+    """Comptages par heure absolue × classe (`hour_counts`, tableau (n_heures, 2)) et vues dérivées"""
+
+    def __init__(self, hour_counts):
+        self.hour_counts = hour_counts
+
+    @classmethod
+    def from_arrays(cls, time_seconds, labels, weights=None):
+        """Agrégats de tableaux de temps (secondes) et de classes, éventuellement pondérés"""
+        return cls(hour_class_counts(absolute_hours(time_seconds), labels, weights))
+
+    @classmethod
+    def from_frame(cls, df, target_col='Class', weight_col=None):
+        """Agrégats d'un DataFrame (colonne Time en secondes)"""
+        weights = df[weight_col].to_numpy() if weight_col is not None and weight_col in df.columns else None
+        return cls.from_arrays(df['Time'].to_numpy(), df[target_col].to_numpy(), weights)
+
+    def day_hour_matrix(self):
+        """Matrice dense (jours, 24, 2) des transactions par jour, heure et classe"""
+        n_days = -(-len(self.hour_counts) // HOURS_PER_DAY)
+        padded = np.zeros((n_days * HOURS_PER_DAY, 2), dtype=self.hour_counts.dtype)
+        padded[:len(self.hour_counts)] = self.hour_counts
+        return padded.reshape(n_days, HOURS_PER_DAY, 2)
+
+    def by_hour_of_day(self):
+        """Transactions par heure de la journée et par classe : tableau (24, 2)"""
+        return self.day_hour_matrix().sum(axis=0)
+
+    def hourly_stats(self):
+        """Statistiques par heure de la journée (heures sans transaction omises)"""
+        by_hour = self.by_hour_of_day()
+        return hourly_stats_frame(by_hour.sum(axis=1), by_hour[:, 1])
+
+    def day_hour_frauds(self):
+        """Fraudes par jour et par heure (table pivotée Jour × Heure, jours et heures observés)"""
+        matrix = self.day_hour_matrix()
+        observed = matrix.sum(axis=2) > 0
+        days = np.nonzero(observed.any(axis=1))[0]
+        hours = np.nonzero(observed.any(axis=0))[0]
+        table = pd.DataFrame(matrix[np.ix_(days, hours, [1])][:, :, 0], index=days, columns=hours)
+        table.index.name, table.columns.name = 'Day', 'Hour'
+        return table.astype(float)